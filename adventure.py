@@ -19,12 +19,16 @@ This file is Copyright (c) 2026 CSC111 Teaching Team
 """
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass, field
-from typing import Optional
+from array import array
+from dataclasses import dataclass, field, replace
+from typing import Container, Iterable, Iterator, Optional, Union
 
 from event_logger import Event, EventList
-from game_entities import Item, Location
+from game_entities import GameWorld, Item, Location, RewardEffect
+from progress import ProgressTracker
+from restrictions import Restriction
+from world_loader import load_world
+from zobrist import zobrist_key
 
 DEFAULT_MIN_SCORE = 60
 DEFAULT_MAX_SCORE = 100
@@ -34,8 +38,11 @@ DEFAULT_START_LOCATION = 2
 EXTENSION_BONUS_TURNS = 30
 USB_EQUIVALENT_ITEMS = {"usb drive", "spare usb cable"}
 REQUIRED_RETURN_ITEMS = {"lucky mug", "laptop charger"}
-MENU_COMMANDS = {"look", "inventory", "score", "log", "submit early", "quit"}
+MENU_COMMANDS = {"look", "inventory", "score", "log", "undo", "submit early", "quit"}
 ITEM_COMMAND_PREFIXES = ("take ", "drop ", "inspect ")
+TRAVEL_PREFIX = "travel to "
+REWIND_PREFIX = "rewind to "
+INVALID_COMMAND_MESSAGE = "That was an invalid option; try again."
 
 
 @dataclass
@@ -48,18 +55,313 @@ class SessionFlags:
     extension_granted: bool = False
 
 
+class Inventory:
+    """The items a player is carrying, in pickup order, indexed by name.
+
+    Membership tests accept either an Item or a case-insensitive item name, and
+    adding or removing an item takes constant time. The inventory also keeps a
+    bitset of carried items, using the bit indices given at construction, so
+    entry restrictions can be checked with a single mask test, and a Zobrist
+    fingerprint of the carried items.
+
+    Instance Attributes:
+        - mask: bitset of the carried items that have a bit index.
+        - fingerprint: the xor of the Zobrist keys of the carried items.
+
+    >>> mug = Item("lucky mug", "A mug.", "Home.", "Done.", 5, 1, 30)
+    >>> inventory = Inventory([mug], {"lucky mug": 3})
+    >>> "Lucky Mug" in inventory and mug in inventory, inventory.mask
+    (True, 8)
+    >>> inventory.remove(mug)
+    >>> len(inventory), "lucky mug" in inventory, inventory.mask
+    (0, False, 0)
+    """
+    mask: int
+    fingerprint: int
+    # Private Instance Attributes:
+    #   - _items: a mapping from lower-cased item name to Item, in insertion order.
+    #   - _bits: a mapping from lower-cased item name to that item's bit index.
+    _items: dict[str, Item]
+    _bits: dict[str, int]
+
+    def __init__(self, items: Iterable[Item] = (), bits: Optional[dict[str, int]] = None) -> None:
+        self.mask = 0
+        self.fingerprint = 0
+        self._items = {}
+        self._bits = {} if bits is None else bits
+        for item in items:
+            self.add(item)
+
+    def __iter__(self) -> Iterator[Item]:
+        return iter(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: Union[Item, str]) -> bool:
+        name = item.name if isinstance(item, Item) else item
+        return name.strip().lower() in self._items
+
+    def __repr__(self) -> str:
+        return f"Inventory({list(self._items.values())!r})"
+
+    def add(self, item: Item) -> bool:
+        """Add item to the end of the inventory and return whether it was not already carried."""
+        key = item.name.lower()
+        if key in self._items:
+            return False
+        self._items[key] = item
+        self.fingerprint ^= zobrist_key("carried", key)
+        if key in self._bits:
+            self.mask |= 1 << self._bits[key]
+        return True
+
+    def remove(self, item: Item) -> None:
+        """Remove item from the inventory.
+
+        Raise KeyError if item is not carried.
+        """
+        key = item.name.lower()
+        del self._items[key]
+        self.fingerprint ^= zobrist_key("carried", key)
+        if key in self._bits:
+            self.mask &= ~(1 << self._bits[key])
+
+    def position(self, item: Item) -> int:
+        """Return the index of carried item in pickup order.
+
+        Raise ValueError if item is not carried.
+        """
+        return list(self._items).index(item.name.lower())
+
+    def insert(self, position: int, item: Item) -> None:
+        """Put item back at index position in pickup order, as if it had never been removed."""
+        key = item.name.lower()
+        entries = list(self._items.items())
+        entries.insert(position, (key, item))
+        self._items = dict(entries)
+        self.fingerprint ^= zobrist_key("carried", key)
+        if key in self._bits:
+            self.mask |= 1 << self._bits[key]
+
+    def with_items(self, items: Iterable[Item]) -> Inventory:
+        """Return a new inventory holding items that uses the same bit indices as this one."""
+        return Inventory(items, self._bits)
+
+    def get(self, item_name: str) -> Optional[Item]:
+        """Return the carried item with the given case-insensitive name, or None."""
+        return self._items.get(item_name.strip().lower())
+
+
+@dataclass(frozen=True)
+class GameRules:
+    """The tunable rules of a game session.
+
+    Instance Attributes:
+        - max_turns: the moves a player starts with.
+        - extension_bonus_turns: the moves a deadline extension adds.
+        - min_score: the score needed to win.
+    """
+    max_turns: int = DEFAULT_MAX_TURNS
+    extension_bonus_turns: int = EXTENSION_BONUS_TURNS
+    min_score: int = DEFAULT_MIN_SCORE
+
+
 @dataclass
 class PlayerState:
     """Mutable player progress grouped into one structure."""
-    inventory: list[Item] = field(default_factory=list)
+    inventory: Inventory = field(default_factory=Inventory)
     score: int = 0
     turn: int = 0
     max_turns: int = DEFAULT_MAX_TURNS
     flags: SessionFlags = field(default_factory=SessionFlags)
-    rewards_claimed: set[str] = field(default_factory=set)
+    rewards_claimed: set[int] = field(default_factory=set)
     returned: set[str] = field(default_factory=set)
 
 
+@dataclass
+class CommandResult:
+    """The outcome of one player command, as returned by AdventureGame.execute.
+
+    Instance Attributes:
+        - command: the normalized command text.
+        - kind: one of 'move', 'travel', 'take', 'drop', 'inspect', 'look', 'inventory',
+          'score', 'log', 'undo', 'rewind', 'submit', 'quit' or 'invalid'.
+        - success: whether the command did what it asked for.
+        - moved: whether the player changed location.
+        - steps: the (movement command, arrived location id) pairs of every move made.
+        - location_id: the player's location after the command.
+        - blocked_reason: why a move was refused by an entry restriction, if it was.
+        - item_name: the canonical name of the item a take/drop/inspect command refers to.
+        - quest_completed: whether a dropped item completed its quest.
+        - points: the score gained by this command.
+        - messages: player-facing output lines, in display order.
+        - reward_messages: the subset of messages produced by location rewards.
+        - game_over: whether the game is no longer ongoing after this command.
+        - undone_moves: the number of moves taken back by an undo or rewind command, so a
+          frontend can drop the same number of entries from its event log.
+    """
+    command: str
+    kind: str
+    success: bool = False
+    moved: bool = False
+    steps: list[tuple[str, int]] = field(default_factory=list)
+    location_id: int = -1
+    blocked_reason: Optional[str] = None
+    item_name: Optional[str] = None
+    quest_completed: bool = False
+    points: int = 0
+    messages: list[str] = field(default_factory=list)
+    reward_messages: list[str] = field(default_factory=list)
+    game_over: bool = False
+    undone_moves: int = 0
+
+
+@dataclass
+class JournalEntry:
+    """The inverse of one state-changing command, recorded by AdventureGame so it can be undone.
+
+    Instance Attributes:
+        - command: the normalized command.
+        - location_id: the player's location before the command.
+        - turn_delta: how many moves the command spent.
+        - score_delta: how many points the command scored.
+        - max_turns_delta: how much the command raised the move limit.
+        - was_ongoing: whether the game was ongoing before the command.
+        - changes: what the command changed besides the values above, oldest first. Each
+          change is a tuple naming its kind ('move', 'take', 'drop', 'grant', 'returned',
+          'claimed', 'visited' or 'flag') followed by what is needed to reverse it.
+        - previous: the entry of the state-changing command before this one, or None. Entries
+          are never changed once made, so saving the latest one saves the whole journal.
+    """
+    command: str
+    location_id: int
+    turn_delta: int
+    score_delta: int
+    max_turns_delta: int
+    was_ongoing: bool
+    changes: list[tuple] = field(default_factory=list)
+    previous: Optional[JournalEntry] = field(default=None, repr=False, compare=False)
+
+    @property
+    def moves(self) -> int:
+        """The number of locations the command entered."""
+        return sum(1 for change in self.changes if change[0] == "move")
+
+
+@dataclass(frozen=True)
+class GameCheckpoint:
+    """A copy of one session's state, taken by AdventureGame.checkpoint.
+
+    Instance Attributes:
+        - location_id: the player's location.
+        - ongoing: whether the session was ongoing.
+        - state: the player's progress.
+        - overlay: the session's changes to the world.
+        - progress: the session's win-progress tracker.
+        - fingerprint: the session's Zobrist fingerprint, less the parts state_hash adds itself.
+        - journal: the session's latest undo journal entry, or None.
+    """
+    location_id: int
+    ongoing: bool
+    state: PlayerState
+    overlay: WorldOverlay
+    progress: ProgressTracker
+    fingerprint: int
+    journal: Optional[JournalEntry]
+
+
+@dataclass
+class BatchResult:
+    """The game state after each command of AdventureGame.run_batch.
+
+    Entry i of each array describes the state right after the i-th command.
+
+    Instance Attributes:
+        - location_ids: the player's location id.
+        - scores: the player's score.
+        - turns: the number of moves made so far.
+    """
+    location_ids: array
+    scores: array
+    turns: array
+
+
+class WorldOverlay:
+    """One session's changes layered over a shared, read-only world.
+
+    Only the item lists of locations whose items differ from the world, and the ids of
+    visited locations, are stored. Memory therefore grows with what the player changed,
+    not with the size of the world. Views hold their items as tuples, like the world's
+    own locations, so a caller cannot change a session's or the world's items through them.
+
+    Instance Attributes:
+        - placements: item lists for locations whose items differ from the world.
+        - visited: ids of locations the player has visited.
+    """
+    placements: dict[int, list[str]]
+    visited: set[int]
+    # Private Instance Attributes:
+    #   - _views: cached merged Location objects for locations that appear in the overlay.
+    _views: dict[int, Location]
+
+    def __init__(self) -> None:
+        self.placements = {}
+        self.visited = set()
+        self._views = {}
+
+    def view(self, base: Location) -> Location:
+        """Return base as this session sees it."""
+        loc_id = base.id_num
+        if loc_id not in self.placements and loc_id not in self.visited:
+            return base
+        view = self._views.get(loc_id)
+        if view is None:
+            items = self.placements.get(loc_id)
+            view = replace(base, items=base.items if items is None else tuple(items), visited=loc_id in self.visited)
+            self._views[loc_id] = view
+        return view
+
+    def items_for_update(self, base: Location) -> list[str]:
+        """Return this session's own item list for base, copying it from the world on first write.
+
+        The cached view of base is dropped, since the caller is about to change its items.
+        """
+        items = self.placements.get(base.id_num)
+        if items is None:
+            items = list(base.items)
+            self.placements[base.id_num] = items
+        self._views.pop(base.id_num, None)
+        return items
+
+    def settle(self, base: Location) -> None:
+        """Forget the item list for base if it is back to matching the world."""
+        items = self.placements.get(base.id_num)
+        if items is not None and tuple(items) == base.items:
+            del self.placements[base.id_num]
+            self._views.pop(base.id_num, None)
+
+    def mark_visited(self, loc_id: int) -> bool:
+        """Record loc_id as visited and return whether it was already visited."""
+        if loc_id in self.visited:
+            return True
+        self.visited.add(loc_id)
+        self._views.pop(loc_id, None)
+        return False
+
+    def unmark_visited(self, loc_id: int) -> None:
+        """Record loc_id as not visited."""
+        self.visited.discard(loc_id)
+        self._views.pop(loc_id, None)
+
+    def copy(self) -> WorldOverlay:
+        """Return an overlay with the same changes that can change independently of this one."""
+        other = WorldOverlay()
+        other.placements = {loc_id: list(items) for loc_id, items in self.placements.items()}
+        other.visited = set(self.visited)
+        return other
+
+
 class AdventureGame:
     """A text adventure game class storing all location, item and map data.
 
@@ -69,35 +371,83 @@ class AdventureGame:
 
     Representation Invariants:
         - self.current_location_id in self._locations
+        - all(loc_id in self._locations for loc_id in self._overlay.placements)
     """
 
     # Private Instance Attributes (do NOT remove these two attributes):
     #   - _locations: a mapping from location id to Location object.
-    #                 This represents all the locations in the game.
+    #                 This represents all the locations in the game, as loaded. It is shared
+    #                 with other sessions on the same world and is never mutated.
     #   - _items: a list of Item objects, representing all items in the game.
+    #   - _world: the world this game was loaded from, possibly shared with other sessions.
+    #   - _overlay: this session's item placements and visited flags that differ from _world.
+    #   - _start_location_id: the location id a fresh or reset game starts at.
+    #   - _item_index: a mapping from lower-cased item names and aliases to Item objects.
+    #   - _rewards: compiled reward effects keyed by (location id, lower-cased trigger item name).
+    #   - _item_bits: a mapping from lower-cased item names and aliases to item bit indices.
+    #   - _restrictions: compiled entry rules keyed by location id, for restricted locations only.
+    #   - _rules: the turn limits and minimum score this session is played with.
     #   - _state: structure containing all the player progress
+    #   - _progress: lower bound on the moves still needed to win, kept up to date by item changes
+    #   - _fingerprint: the xor of the Zobrist keys of every item placement, visited flag, returned item
+    #                   and claimed reward that differs from a fresh game; see state_hash
+    #   - _journal: the journal entry of the last state-changing command, or None if there is nothing to undo.
+    #   - _changes: the changes made so far by the command being journaled, or None between commands.
+    #   - _before: (location id, turn, score, move limit, ongoing) before the command being journaled.
 
     _locations: dict[int, Location]
     _items: list[Item]
+    _world: GameWorld
+    _overlay: WorldOverlay
+    _start_location_id: int
+    _item_index: dict[str, Item]
+    _rewards: dict[tuple[int, str], tuple[RewardEffect, ...]]
+    _item_bits: dict[str, int]
+    _restrictions: dict[int, Restriction]
+    _rules: GameRules
     _state: PlayerState
+    _progress: ProgressTracker
+    _fingerprint: int
+    _journal: Optional[JournalEntry]
+    _changes: Optional[list[tuple]]
+    _before: tuple[int, int, int, int, bool]
     current_location_id: int
     ongoing: bool
 
-    def __init__(self, game_data_file: str, initial_location_id: int) -> None:
+    def __init__(self, game_data_file: str, initial_location_id: int, rules: Optional[GameRules] = None) -> None:
         """Initialize a game from a data file and starting location id.
 
+        rules defaults to the standard turn limits and minimum score.
+
         Preconditions:
             - game_data_file is the filename of a valid game data JSON file
         """
-        self._locations, self._items = self._load_game_data(game_data_file)
+        self._setup(self._load_game_data(game_data_file), initial_location_id, rules)
+
+    @classmethod
+    def from_world(cls, world: GameWorld, initial_location_id: int, rules: Optional[GameRules] = None) -> AdventureGame:
+        """Return a game on an already compiled world, such as one built by world_loader.build_world."""
+        game = cls.__new__(cls)
+        game._setup(world, initial_location_id, rules)
+        return game
+
+    def _setup(self, world: GameWorld, initial_location_id: int, rules: Optional[GameRules]) -> None:
+        """Start a fresh session on world."""
+        self._use_world(world)
+        self._rules = GameRules() if rules is None else rules
+        self._start_location_id = initial_location_id
         self.current_location_id = initial_location_id
         self.ongoing = True
-        self._state = PlayerState()
+        self._state = self._new_player_state()
+        self._progress = self._new_progress_tracker()
+        self._fingerprint = 0
+        self._journal = None
+        self._changes = None
 
     def __getattr__(self, name: str) -> int:
         """Provide access for constant attribute names."""
         if name == "MIN_SCORE":
-            return DEFAULT_MIN_SCORE
+            return self._rules.min_score
         if name == "MAX_SCORE":
             return DEFAULT_MAX_SCORE
         if name == "MAX_TURNS":
@@ -105,54 +455,49 @@ class AdventureGame:
         raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
     @staticmethod
-    def _load_game_data(filename: str) -> tuple[dict[int, Location], list[Item]]:
-        """Load locations/items from a JSON file and return game data objects."""
-        with open(filename, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-
-        locations = {}
-        for loc_data in data['locations']:
-            location_obj = Location(
-                loc_data['id'],
-                {
-                    'name': loc_data['name'],
-                    'brief_description': loc_data['brief_description'],
-                    'long_description': loc_data['long_description']
-                },
-                loc_data['available_commands'],
-                loc_data['items'],
-                loc_data['restrictions'] if 'restrictions' in loc_data else {},
-                loc_data['rewards'] if 'rewards' in loc_data else {}
-            )
-            locations[loc_data['id']] = location_obj
-
-        items = []
-        for item_data in data['items']:
-            item_obj = Item(
-                item_data['name'],
-                item_data['description'],
-                item_data['hint'],
-                item_data['completion_text'],
-                item_data['start_position'],
-                item_data['target_position'],
-                item_data['target_points']
-            )
-            items.append(item_obj)
-        return locations, items
+    def _load_game_data(filename: str) -> GameWorld:
+        """Load locations/items from a JSON file and return game data objects.
+
+        Compiled worlds are cached next to the JSON file (see world_loader.load_world).
+        """
+        return load_world(filename)
+
+    def _use_world(self, world: GameWorld) -> None:
+        """Point this game at the locations, items and compiled tables of world."""
+        self._world = world
+        self._overlay = WorldOverlay()
+        self._locations = world.locations
+        self._items = world.items
+        self._item_index = world.item_index
+        self._rewards = world.rewards
+        self._item_bits = world.item_bits
+        self._restrictions = world.restrictions
+
+    def _new_player_state(self) -> PlayerState:
+        """Return fresh player progress whose inventory tracks this world's item bits."""
+        return PlayerState(inventory=Inventory(bits=self._item_bits), max_turns=self._rules.max_turns)
+
+    def _new_progress_tracker(self) -> ProgressTracker:
+        """Return a win-progress tracker for a fresh game on this world."""
+        return ProgressTracker(self._world, REQUIRED_RETURN_ITEMS, (USB_EQUIVALENT_ITEMS,), self._rules.min_score,
+                               lambda item: quest_points(item, (), self._item_index))
 
     def location_dict(self) -> dict[int, Location]:
-        """Return a dictionary of all available location IDs."""
-        return self._locations.copy()
+        """Return a dictionary of all available location IDs.
+
+        The locations are read-only views, as returned by get_location.
+        """
+        return {loc_id: self._overlay.view(location) for loc_id, location in self._locations.items()}
 
     @property
-    def inventory(self) -> list[Item]:
+    def inventory(self) -> Inventory:
         """Return the player's current inventory."""
         return self._state.inventory
 
     @inventory.setter
-    def inventory(self, value: list[Item]) -> None:
+    def inventory(self, value: Iterable[Item]) -> None:
         """Replace the player's inventory."""
-        self._state.inventory = value
+        self._state.inventory = value if isinstance(value, Inventory) else self._state.inventory.with_items(value)
 
     @property
     def score(self) -> int:
@@ -182,157 +527,159 @@ class AdventureGame:
     @returned.setter
     def returned(self, value: set[str]) -> None:
         """Replace returned item names."""
+        for item_name in self._state.returned ^ value:
+            self._fingerprint ^= zobrist_key("returned", item_name)
         self._state.returned = value
 
     def get_location(self, loc_id: Optional[int] = None) -> Location:
-        """Return location object for loc_id, or current location when loc_id is None."""
-        if loc_id is None:
-            return self._locations[self.current_location_id]
-        return self._locations[loc_id]
+        """Return location object for loc_id, or current location when loc_id is None.
 
-    def get_item(self, item_name: str) -> Optional[Item]:
-        """Return the item object with the given name, or None if not found."""
-        for item in self._items:
-            if item.name == item_name:
-                return item
-        return None
-
-    def _inventory_names(self) -> set[str]:
-        """Return lowercase names of all items currently in inventory."""
-        return {item.name.lower() for item in self.inventory}
+        The returned object is a read-only view shared with the world: its items are a tuple,
+        and mark_visited, pick_up and drop are the way to change locations.
+        """
+        if loc_id is None:
+            loc_id = self.current_location_id
+        return self._overlay.view(self._locations[loc_id])
 
-    def _required_items(self, restrictions: str) -> set[str]:
-        """Extract required item names from a location restriction payload."""
-        if restrictions in ({}, None, ""):
-            return set()
+    def mark_visited(self, loc_id: Optional[int] = None) -> bool:
+        """Mark loc_id (or the current location) as visited and return whether it was visited before."""
+        loc_id = self.current_location_id if loc_id is None else loc_id
+        if self._overlay.mark_visited(loc_id):
+            return True
+        self._fingerprint ^= zobrist_key("visited", loc_id)
+        if self._changes is not None:
+            self._changes.append(("visited", loc_id))
+        return False
 
-        if isinstance(restrictions, str):
-            required = restrictions.strip().lower()
-            return {required} if required else set()
+    def get_item(self, item_name: str) -> Optional[Item]:
+        """Return the item object with the given name or alias, or None if not found.
 
-        return set()
+        Lookup is case-insensitive and ignores surrounding whitespace.
+        """
+        return self._item_index.get(item_name.strip().lower())
 
     def can_enter_location(self, location_id: int) -> tuple[bool, Optional[str]]:
         """Return whether the player can enter a location, with a failure message if blocked."""
-        destination = self.get_location(location_id)
-        required_items = self._required_items(destination.restrictions)
-        if not required_items:
-            return True, None
-
-        missing = sorted(item for item in required_items if item not in self._inventory_names())
-        if not missing:
+        rule = self._restrictions.get(location_id)
+        if rule is None or rule.allows(self.inventory.mask, self.score, self.turn):
             return True, None
 
-        if len(missing) == 1:
-            return False, f"You need {missing[0]} to enter {destination.description['name']}."
-        return False, f"You need {', '.join(missing)} to enter {destination.description['name']}."
-
-    def _merge_string_mapping(self, target: dict[str, str], source: dict[str, str] | None) -> None:
-        """Merge string-to-string pairs from source into target, lower-casing keys/values."""
-        if source is None:
-            return
-
-        for key, value in source.items():
-            target[key.lower()] = value.lower()
-
-    def _extract_item_rewards(self, rewards_data: dict[str, object] | None) -> dict[str, str]:
-        """Extract item-trade rewards from a location reward payload."""
-        rewards: dict[str, str] = {}
-        if not isinstance(rewards_data, dict):
-            return rewards
-
-        self._merge_string_mapping(rewards, rewards_data.get("items"))
-        nested = rewards_data.get("rewards")
-        if isinstance(nested, dict):
-            self._merge_string_mapping(rewards, nested.get("items"))
-
-        return rewards
-
-    def _extract_attribute_rewards(self, rewards_data: dict[str, object] | None) -> dict[str, str]:
-        """Extract attribute-trigger rewards from a location reward payload."""
-        rewards: dict[str, str] = {}
-        if not isinstance(rewards_data, dict):
-            return rewards
+        unmet = rule.unmet(self.inventory.mask, self.score, self.turn, self._items)
+        destination = self.get_location(location_id)
+        return False, f"You need {', '.join(unmet)} to enter {destination.description['name']}."
 
-        self._merge_string_mapping(rewards, rewards_data.get("attributes"))
-        nested = rewards_data.get("rewards")
-        if isinstance(nested, dict):
-            self._merge_string_mapping(rewards, nested.get("attributes"))
+    def distance_to(self, location_id: int) -> Optional[int]:
+        """Return the fewest moves from the current location to location_id, or None if it cannot be reached.
 
-        return rewards
+        Entry restrictions are checked against the player's current items, score and move count.
+        """
+        return self._world.routes.distance(self.current_location_id, location_id,
+                                           self.inventory.mask, self.score, self.turn)
+
+    def find_location(self, name_or_id: str) -> Optional[int]:
+        """Return the id of the location with the given case-insensitive name or numeric id, or None."""
+        key = name_or_id.strip().lower()
+        if key.isdigit():
+            return int(key) if int(key) in self._locations else None
+        return self._world.location_ids.get(key)
+
+    def travel(self, location_id: int) -> tuple[list[tuple[str, int]], Optional[str]]:
+        """Move along a shortest legal route to location_id, spending one turn per move.
+
+        If entry restrictions leave no legal route, walk a shortest route that ignores them
+        as far as the first location the player may not enter. Return the (command, arrived
+        location id) pairs of the moves made and, if an entry restriction stopped the walk
+        early, the reason. The walk also stops when the game ends. Every location passed
+        through is marked visited, but location_id is not.
+
+        >>> game = AdventureGame('game_data.json', 4)
+        >>> game.travel(1)
+        ([('go east', 3), ('go east', 2)], 'You need dorm key to enter Dorm Room.')
+        """
+        steps: list[tuple[str, int]] = []
+        routes = self._world.routes
+        route = routes.path(self.current_location_id, location_id, self.inventory.mask, self.score, self.turn)
+        if not route:
+            route = routes.open_path(self.current_location_id, location_id)
+        for command in route:
+            destination_id = self._locations[self.current_location_id].available_commands[command]
+            can_enter, reason = self.can_enter_location(destination_id)
+            if not can_enter:
+                return steps, reason
+            steps.append((command, destination_id))
+            if not self._enter(destination_id):
+                break
+            if destination_id != location_id:
+                self.mark_visited(destination_id)
+        return steps, None
 
     def apply_location_rewards(self, trigger_item_name: str) -> list[str]:
         """Apply location-specific rewards from dropping an item.
 
         Return user-facing messages describing any reward that was applied.
         """
-        location = self.get_location()
-        trigger = trigger_item_name.lower()
-        messages = []
-
-        self._apply_item_reward(location.id_num, trigger, location.rewards, messages)
-
-        attribute_rewards = self._extract_attribute_rewards(location.rewards)
-        if trigger in attribute_rewards:
-            reward_effect = attribute_rewards[trigger]
-            candidate_trigger = trigger
-            marker = f"attribute:{location.id_num}:{candidate_trigger}->{reward_effect}"
-            if marker in self._state.rewards_claimed:
-                return messages
-
-            if reward_effect == "extra time granted":
-                if not self._state.flags.extension_granted:
-                    self._state.max_turns += EXTENSION_BONUS_TURNS
-                    self._state.flags.extension_granted = True
-                    messages.append(f"Extension approved: +{EXTENSION_BONUS_TURNS} moves.")
-                else:
-                    messages.append("Extension already approved.")
+        key = (self.current_location_id, trigger_item_name.strip().lower())
+        messages: list[str] = []
+        for effect in self._rewards.get(key, ()):
+            if effect.reward_id in self._state.rewards_claimed:
+                continue
+            if effect.kind == "item":
+                self._apply_item_reward(effect, messages)
             else:
-                messages.append(reward_effect)
-
-            self._state.rewards_claimed.add(marker)
-
+                self._apply_attribute_reward(effect, messages)
+            self._state.rewards_claimed.add(effect.reward_id)
+            self._fingerprint ^= zobrist_key("claimed", effect.reward_id)
+            if self._changes is not None:
+                self._changes.append(("claimed", effect.reward_id))
         return messages
 
-    def _apply_item_reward(
-        self,
-        location_id: int,
-        trigger: str,
-        rewards_data: dict[str, object] | None,
-        messages: list[str]
-    ) -> None:
-        """Apply one item-based reward for a trigger at a location, if configured."""
-        item_rewards = self._extract_item_rewards(rewards_data)
-        if trigger not in item_rewards:
-            return
-
-        granted_name = item_rewards[trigger]
-        marker = f"item:{location_id}:{trigger}->{granted_name}"
-        if marker in self._state.rewards_claimed:
+    def _apply_item_reward(self, effect: RewardEffect, messages: list[str]) -> None:
+        """Grant the item named by an item-trade reward effect."""
+        granted_item = self.get_item(effect.value)
+        if granted_item is None:
             return
-
-        granted_item = self.get_item(granted_name)
-        if granted_item is not None:
-            if granted_item not in self.inventory:
-                self.inventory.append(granted_item)
-                messages.append(f"You received {granted_name}.")
-            else:
-                messages.append(f"You already have {granted_name}.")
-
-        self._state.rewards_claimed.add(marker)
+        position = self._progress.position(granted_item)
+        if self.inventory.add(granted_item):
+            self._progress.item_moved(granted_item, None)
+            if self._changes is not None:
+                self._changes.append(("grant", granted_item, position))
+            messages.append(f"You received {effect.value}.")
+        else:
+            messages.append(f"You already have {effect.value}.")
+
+    def _apply_attribute_reward(self, effect: RewardEffect, messages: list[str]) -> None:
+        """Apply an attribute reward effect such as a deadline extension."""
+        if effect.value != "extra time granted":
+            messages.append(effect.value)
+        elif not self._state.flags.extension_granted:
+            self._state.max_turns += self._rules.extension_bonus_turns
+            self._set_flag("extension_granted")
+            messages.append(f"Extension approved: +{self._rules.extension_bonus_turns} moves.")
+        else:
+            messages.append("Extension already approved.")
 
     def pick_up(self, item_name: str) -> bool:
-        """Pick up item_name from the current location."""
+        """Pick up item_name from the current location.
+
+        Return False if the item is not here or is already being carried.
+        """
         curr_item = self.get_item(item_name)
         if curr_item is None:
             return False
 
-        curr_location = self.get_location()
-        if item_name not in curr_location.items:
+        if curr_item.name not in self.get_location().items or curr_item in self.inventory:
             return False
 
-        self.inventory.append(curr_item)
-        curr_location.items.remove(item_name)
+        self.inventory.add(curr_item)
+        self._progress.item_moved(curr_item, None)
+        base = self._locations[self.current_location_id]
+        items = self._overlay.items_for_update(base)
+        self._recount(base.id_num, items, curr_item.name, -1)
+        index = items.index(curr_item.name)
+        del items[index]
+        self._overlay.settle(base)
+        if self._changes is not None:
+            self._changes.append(("take", curr_item, base.id_num, index))
         return True
 
     def drop(self, item_name: str) -> bool:
@@ -341,51 +688,118 @@ class AdventureGame:
         if curr_item is None or curr_item not in self.inventory:
             return False
 
-        curr_location = self.get_location()
+        if self._changes is not None:
+            self._changes.append(("drop", curr_item, self.current_location_id, self.inventory.position(curr_item)))
         self.inventory.remove(curr_item)
-        curr_location.items.append(item_name)
+        self._progress.item_moved(curr_item, self.current_location_id)
+        base = self._locations[self.current_location_id]
+        items = self._overlay.items_for_update(base)
+        self._recount(base.id_num, items, curr_item.name, 1)
+        items.append(curr_item.name)
+        self._overlay.settle(base)
         return True
 
-    def inspect(self, item_name: str) -> None:
-        """Print a hint for item_name if it is in the player's inventory."""
+    def _recount(self, loc_id: int, items: list[str], item_name: str, change: int) -> None:
+        """Update the fingerprint for the number of item_name in items, at loc_id, changing by change.
+
+        A placement key covers the number of copies, so a second copy of an item in one
+        place does not cancel out the first.
+        """
+        count = items.count(item_name)
+        if count:
+            self._fingerprint ^= zobrist_key("lying", loc_id, item_name, count)
+        if count + change:
+            self._fingerprint ^= zobrist_key("lying", loc_id, item_name, count + change)
+
+    def inspect(self, item_name: str) -> list[str]:
+        """Return hint lines for item_name, or an empty list if it is not in the player's inventory."""
         curr_item = self.get_item(item_name)
-        if curr_item is not None and curr_item in self.inventory:
-            print(curr_item.hint)
-            target_location = self.get_location(curr_item.target_position).description['name']
-            print(f"..... It needs to go to {target_location}")
+        if curr_item is None or curr_item not in self.inventory:
+            return []
+        target_location = self.get_location(curr_item.target_position).description['name']
+        return [curr_item.hint, f"..... It needs to go to {target_location}"]
 
     def check_quest(self, item_name: str) -> bool:
-        """Check whether dropped item_name has reached its target location."""
+        """Check whether dropped item_name has reached its target location.
+
+        Return whether the item was newly returned. Points are only added while the score
+        is not locked.
+        """
         curr_item = self.get_item(item_name)
         curr_location = self.get_location()
 
         if curr_item is None:
             return False
 
+        item_name = curr_item.name
         if curr_item.target_position != curr_location.id_num or item_name not in curr_location.items:
             return False
 
         if item_name in self.returned:
             return False
 
-        print(curr_item.completion_text)
         self.returned.add(item_name)
+        self._fingerprint ^= zobrist_key("returned", item_name)
+        if self._changes is not None:
+            self._changes.append(("returned", curr_item))
+        self._progress.item_returned(curr_item)
 
         if self._state.flags.score_locked:
-            print("Score is locked after submission.")
             return True
 
-        points_earned = curr_item.target_points
+        self.score += quest_points(curr_item, self.returned, self._item_index)
+        return True
 
-        # Allow spare USB cable to substitute for the USB drive scoring objective.
-        if item_name == "spare usb cable" and "usb drive" not in self.returned:
-            usb_drive = self.get_item("usb drive")
-            if usb_drive is not None and usb_drive.target_points > curr_item.target_points:
-                points_earned = usb_drive.target_points
+    def state_hash(self) -> int:
+        """Return a 64-bit fingerprint of the whole game state.
+
+        Two sessions on the same world with equal fingerprints are, with overwhelming
+        probability, in the same state: same location, move count, move limit, score,
+        flags, carried and returned items, claimed rewards, item placements and visited
+        locations. The fingerprint is kept up to date as items move, rewards are claimed
+        and locations are visited, so this takes constant time. Changes made by mutating
+        the returned set directly, rather than through this class, are not seen.
+
+        >>> first, second = AdventureGame('game_data.json', 2), AdventureGame('game_data.json', 2)
+        >>> _ = first.run_batch(["take tcard", "take cookie", "go west"])
+        >>> _ = second.run_batch(["take cookie", "take tcard", "go west"])
+        >>> first.state_hash() == second.state_hash()
+        True
+        >>> _ = second.run_batch(["drop cookie"])
+        >>> first.state_hash() == second.state_hash()
+        False
+        """
+        state = self._state
+        flags = state.flags
+        return (self._fingerprint ^ state.inventory.fingerprint
+                ^ zobrist_key("location", self.current_location_id, self.ongoing)
+                ^ zobrist_key("turn", state.turn, state.max_turns)
+                ^ zobrist_key("score", state.score)
+                ^ zobrist_key("flags", flags.unlimited_moves, flags.score_locked, flags.submitted_once,
+                              flags.quit_requested, flags.extension_granted))
+
+    def moves_to_win(self) -> Optional[int]:
+        """Return a lower bound on the moves still needed to win, or None if winning is impossible.
+
+        The bound ignores entry restrictions and the turn limit.
+        """
+        return self._progress.moves_needed(self.current_location_id, self.score)
 
-        self.score += points_earned
-        print("Your score is now " + str(self.score))
-        return True
+    def can_still_win(self) -> bool:
+        """Return whether the win conditions may still be met before the moves run out.
+
+        A False result is certain; a True result is optimistic, since an unclaimed deadline
+        extension is assumed to be obtainable.
+        """
+        needed = self.moves_to_win()
+        if needed is None:
+            return False
+        if self.is_unlimited_moves():
+            return True
+        limit = self.MAX_TURNS
+        if not self._state.flags.extension_granted:
+            limit += self._rules.extension_bonus_turns
+        return self.turn + needed < limit
 
     def has_storage_solution(self) -> bool:
         """Return whether at least one USB-equivalent item has been returned."""
@@ -405,6 +819,12 @@ class AdventureGame:
             missing.append("usb drive or spare usb cable")
         return missing
 
+    def can_win_now(self) -> bool:
+        """Return whether submitting now would win the game."""
+        if not self.is_unlimited_moves() and self.turn >= self.MAX_TURNS:
+            return False
+        return self.score >= self.MIN_SCORE and self.has_required_returns()
+
     def submit_early(self) -> bool:
         """End the current game session early.
 
@@ -412,13 +832,13 @@ class AdventureGame:
         """
         if self._state.flags.submitted_once:
             return False
-        self._state.flags.submitted_once = True
+        self._set_flag("submitted_once")
         self.ongoing = False
         return True
 
     def enable_unlimited_moves(self) -> None:
         """Enable effectively unlimited moves for post-win free exploration."""
-        self._state.flags.unlimited_moves = True
+        self._set_flag("unlimited_moves")
         self._state.max_turns = UNLIMITED_TURNS
         if self.turn < 0:
             self.turn = 0
@@ -429,7 +849,7 @@ class AdventureGame:
 
     def lock_score(self) -> None:
         """Prevent any future score changes."""
-        self._state.flags.score_locked = True
+        self._set_flag("score_locked")
 
     def can_submit_early(self) -> bool:
         """Return whether the player can still use submit-early."""
@@ -437,19 +857,451 @@ class AdventureGame:
 
     def request_quit(self) -> None:
         """Mark the current session as an explicit quit action."""
-        self._state.flags.quit_requested = True
+        self._set_flag("quit_requested")
         self.ongoing = False
 
     def is_quit_requested(self) -> bool:
         """Return whether the current session ended by explicit quit."""
         return self._state.flags.quit_requested
 
+    def _set_flag(self, name: str) -> None:
+        """Set the session flag called name, journaling its old value."""
+        if self._changes is not None:
+            self._changes.append(("flag", name, getattr(self._state.flags, name)))
+        setattr(self._state.flags, name, True)
+
+    def _begin_entry(self) -> None:
+        """Start journaling the changes made by the next command."""
+        state = self._state
+        self._changes = []
+        self._before = (self.current_location_id, state.turn, state.score, state.max_turns, self.ongoing)
+
+    def _end_entry(self, command: str) -> None:
+        """Stop journaling and record the inverse of command, if it changed anything.
+
+        Every change to the turn, score, move limit or ongoing status comes with a recorded
+        move, return, claim or flag, so a command that recorded nothing changed nothing.
+        """
+        changes, self._changes = self._changes, None
+        if changes:
+            location_id, turn, score, max_turns, was_ongoing = self._before
+            state = self._state
+            self._journal = JournalEntry(command, location_id, state.turn - turn, state.score - score,
+                                         state.max_turns - max_turns, was_ongoing, changes, self._journal)
+
+    def undo(self) -> Optional[JournalEntry]:
+        """Take back the last command that changed the game state and return its journal entry.
+
+        Return None if there is nothing to undo. The cost is proportional to what the command
+        changed, not to the length of the game.
+
+        >>> game = AdventureGame('game_data.json', 2)
+        >>> _ = game.run_batch(["take tcard", "go west", "look"], record_undo=True)
+        >>> before = AdventureGame('game_data.json', 2)
+        >>> _ = before.run_batch(["take tcard"])
+        >>> game.undo().command, game.current_location_id, game.turn
+        ('go west', 2, 0)
+        >>> game.state_hash() == before.state_hash()
+        True
+        """
+        entry = self._journal
+        if entry is None:
+            return None
+        self._journal = entry.previous
+        for change in reversed(entry.changes):
+            self._revert(change)
+        state = self._state
+        self.current_location_id = entry.location_id
+        state.turn -= entry.turn_delta
+        state.score -= entry.score_delta
+        state.max_turns -= entry.max_turns_delta
+        self.ongoing = entry.was_ongoing
+        return entry
+
+    def can_undo(self) -> bool:
+        """Return whether there is a command to undo."""
+        return self._journal is not None
+
+    def rewind(self, turn: int) -> list[JournalEntry]:
+        """Undo commands until no more than turn moves have been spent, and return their entries, latest first."""
+        undone = []
+        while self._journal is not None and self.turn > turn:
+            undone.append(self.undo())
+        return undone
+
+    def _revert(self, change: tuple) -> None:
+        """Reverse one change recorded in a journal entry."""
+        kind = change[0]
+        if kind == "take":
+            item, loc_id, index = change[1:]
+            base = self._locations[loc_id]
+            items = self._overlay.items_for_update(base)
+            self._recount(loc_id, items, item.name, 1)
+            items.insert(index, item.name)
+            self._overlay.settle(base)
+            self.inventory.remove(item)
+            self._progress.item_moved(item, loc_id)
+        elif kind == "drop":
+            item, loc_id, position = change[1:]
+            base = self._locations[loc_id]
+            items = self._overlay.items_for_update(base)
+            self._recount(loc_id, items, item.name, -1)
+            items.pop()
+            self._overlay.settle(base)
+            self.inventory.insert(position, item)
+            self._progress.item_moved(item, None)
+        elif kind == "grant":
+            self.inventory.remove(change[1])
+            self._progress.item_moved(change[1], change[2])
+        elif kind == "returned":
+            self.returned.discard(change[1].name)
+            self._fingerprint ^= zobrist_key("returned", change[1].name)
+            self._progress.item_unreturned(change[1])
+        elif kind == "claimed":
+            self._state.rewards_claimed.discard(change[1])
+            self._fingerprint ^= zobrist_key("claimed", change[1])
+        elif kind == "visited":
+            self._overlay.unmark_visited(change[1])
+            self._fingerprint ^= zobrist_key("visited", change[1])
+        elif kind == "flag":
+            setattr(self._state.flags, change[1], change[2])
+
+    def execute(self, command: str) -> CommandResult:
+        """Run one player command and return its outcome. Nothing is printed.
+
+        command is matched case-insensitively against the current location's movement
+        commands, the menu commands, take/drop/inspect <item>, travel to <location name
+        or id> and rewind to <turn>. The 'log' command only
+        reports its kind, since event logs belong to the frontend.
+        """
+        choice = command.strip().lower()
+        result = CommandResult(choice, "invalid", location_id=self.current_location_id)
+        if not self.ongoing:
+            result.messages.append("The game is over.")
+            result.game_over = True
+            return result
+
+        location = self.get_location()
+        if choice == "undo" or choice.startswith(REWIND_PREFIX):
+            self._execute_undo(choice, result)
+            result.location_id = self.current_location_id
+            return result
+
+        self._begin_entry()
+        if choice in location.available_commands:
+            self._execute_move(location.available_commands[choice], result)
+        elif choice in MENU_COMMANDS:
+            self._execute_menu_command(location, result)
+        elif choice.startswith(TRAVEL_PREFIX):
+            self._execute_travel(choice[len(TRAVEL_PREFIX):], result)
+        else:
+            parsed = _parse_item_command(choice)
+            if parsed is None:
+                result.messages.append(INVALID_COMMAND_MESSAGE)
+            else:
+                self._execute_item_command(parsed[0], parsed[1], result)
+        self._end_entry(choice)
+
+        result.location_id = self.current_location_id
+        result.game_over = not self.ongoing
+        return result
+
+    def _execute_move(self, destination_id: int, result: CommandResult) -> None:
+        """Move to destination_id if its entry restriction allows it, spending a turn."""
+        result.kind = "move"
+        can_enter, reason = self.can_enter_location(destination_id)
+        if not can_enter:
+            result.blocked_reason = reason
+            result.messages.append(reason)
+            return
+
+        result.success = result.moved = True
+        result.steps.append((result.command, destination_id))
+        if not self._enter(destination_id):
+            return
+
+        description = self.get_location().description
+        if self.mark_visited(destination_id):
+            result.messages.append(description['brief_description'])
+        else:
+            result.messages.append(description['long_description'])
+
+    def _execute_undo(self, choice: str, result: CommandResult) -> None:
+        """Take back the last command, or every command after a turn for rewind to <turn>."""
+        if choice == "undo":
+            result.kind = "undo"
+            entry = self.undo()
+            undone = [] if entry is None else [entry]
+        else:
+            result.kind = "rewind"
+            target = choice[len(REWIND_PREFIX):].strip()
+            if not target.isdigit():
+                result.messages.append(f"{target} is not a turn number.")
+                return
+            undone = self.rewind(int(target))
+
+        if not undone:
+            result.messages.append("Nothing to undo.")
+            return
+        result.success = True
+        result.undone_moves = sum(entry.moves for entry in undone)
+        if len(undone) == 1:
+            result.messages.append(f"Undid: {undone[0].command}.")
+        else:
+            result.messages.append(f"Undid {len(undone)} commands, back to turn {self.turn}.")
+        result.messages.append(self.get_location().description['brief_description'])
+
+    def _execute_travel(self, target: str, result: CommandResult) -> None:
+        """Walk a shortest legal route to the location named or numbered target."""
+        result.kind = "travel"
+        location_id = self.find_location(target)
+        if location_id is None:
+            result.messages.append(f"There is no location called {target.strip()}.")
+            return
+
+        name = self._locations[location_id].description['name']
+        if location_id == self.current_location_id:
+            result.messages.append(f"You are already at {name}.")
+            return
+        if self._world.routes.open_distance(self.current_location_id, location_id) is None:
+            result.messages.append(f"You can't reach {name} from here.")
+            return
+
+        result.steps, result.blocked_reason = self.travel(location_id)
+        result.moved = bool(result.steps)
+        result.success = self.current_location_id == location_id
+        if result.moved:
+            moves = len(result.steps)
+            result.messages.append(f"You travel {moves} move{'' if moves == 1 else 's'} towards {name}.")
+        if result.blocked_reason is not None:
+            result.messages.append(result.blocked_reason)
+        if result.moved and self.ongoing:
+            description = self.get_location().description
+            if self.mark_visited():
+                result.messages.append(description['brief_description'])
+            else:
+                result.messages.append(description['long_description'])
+
+    def _enter(self, destination_id: int) -> bool:
+        """Move to destination_id, spending a turn, and return whether the game is still ongoing."""
+        if self._changes is not None:
+            self._changes.append(("move", self.current_location_id))
+        self.current_location_id = destination_id
+        if not self.is_unlimited_moves():
+            self.turn += 1
+            if self.turn >= self.MAX_TURNS:
+                self.ongoing = False
+        return self.ongoing
+
+    def _execute_menu_command(self, location: Location, result: CommandResult) -> None:
+        """Run a command from MENU_COMMANDS at location."""
+        choice = result.command
+        result.kind = "submit" if choice == "submit early" else choice
+        result.success = True
+        if choice == "look":
+            result.messages.append(location.description['long_description'])
+            if location.items:
+                result.messages.append("Items In " + location.description['name'])
+                for item_name in location.items:
+                    item = self.get_item(item_name)
+                    result.messages.append(str(item) if item is not None else item_name)
+            else:
+                result.messages.append("No Items In " + location.description['name'])
+        elif choice == "inventory":
+            result.messages.extend(str(item) for item in self.inventory)
+            if not self.inventory:
+                result.messages.append("No Items In Your Inventory")
+        elif choice == "score":
+            result.messages.append(f"{self.score} / {self.MAX_SCORE}")
+        elif choice == "quit":
+            self.request_quit()
+        elif choice == "submit early":
+            result.success = self.submit_early()
+            result.messages.append("Submission sent." if result.success else "Submission is already finalized.")
+
+    def _execute_item_command(self, verb: str, item_name: str, result: CommandResult) -> None:
+        """Run a take, drop or inspect command for item_name."""
+        result.kind = verb
+        item = self.get_item(item_name)
+        if item is not None:
+            item_name = item.name
+        result.item_name = item_name
+
+        if verb == "take":
+            result.success = self.pick_up(item_name)
+            if result.success:
+                result.messages.append(f"You picked up {item_name}")
+            else:
+                result.messages.append(f"No such item {item_name} here.")
+        elif verb == "drop":
+            result.success = self.drop(item_name)
+            if not result.success:
+                result.messages.append(f"No such item {item_name} in inventory.")
+                return
+            result.messages.append(f"You dropped {item_name}")
+            score_before = self.score
+            result.quest_completed = self.check_quest(item_name)
+            if result.quest_completed:
+                result.messages.append(item.completion_text)
+                if self._state.flags.score_locked:
+                    result.messages.append("Score is locked after submission.")
+                else:
+                    result.messages.append(f"Your score is now {self.score}")
+            result.points = self.score - score_before
+            result.reward_messages = self.apply_location_rewards(item_name)
+            result.messages.extend(result.reward_messages)
+        else:
+            hint_lines = self.inspect(item_name)
+            result.success = bool(hint_lines)
+            result.messages.extend(hint_lines or [f"No such item {item_name} in inventory."])
+
+    def run_batch(self, commands: Iterable[str], record_undo: bool = False) -> BatchResult:
+        """Run commands in order and return the location, score and turn after each one.
+
+        The game rules are the same as for execute, but no result objects or messages are
+        built, so long scripted runs stay cheap. Commands given after the game has ended
+        change nothing. Unless record_undo is True, commands are not journaled and the undo
+        history is discarded, so later undo and rewind commands cannot take them back.
+
+        >>> game = AdventureGame('game_data.json', 2)
+        >>> result = game.run_batch(["take tcard", "go west", "score", "go east"])
+        >>> list(result.location_ids), list(result.turns)
+        ([2, 3, 3, 2], [0, 1, 1, 2])
+        """
+        location_ids, scores, turns = array('i'), array('i'), array('i')
+        for command in commands:
+            if self.ongoing:
+                self._step(command.strip().lower(), record_undo)
+            location_ids.append(self.current_location_id)
+            scores.append(self._state.score)
+            turns.append(self._state.turn)
+        return BatchResult(location_ids, scores, turns)
+
+    def step(self, command: str, record_undo: bool = False) -> None:
+        """Apply one command with the rules of run_batch, building no output.
+
+        This is the cheapest way to drive the game from a program, such as a bot player.
+        """
+        if self.ongoing:
+            self._step(command.strip().lower(), record_undo)
+
+    def _step(self, choice: str, record_undo: bool) -> None:
+        """Apply one normalized command quietly.
+
+        The command is journaled if record_undo is True; otherwise the undo history is dropped,
+        since it no longer leads back from the state the command leaves behind.
+        """
+        if choice == "undo":
+            self.undo()
+        elif choice.startswith(REWIND_PREFIX):
+            target = choice[len(REWIND_PREFIX):].strip()
+            if target.isdigit():
+                self.rewind(int(target))
+        elif record_undo:
+            self._begin_entry()
+            self._run_quietly(choice)
+            self._end_entry(choice)
+        else:
+            self._journal = None
+            self._run_quietly(choice)
+
+    def _run_quietly(self, choice: str) -> None:
+        """Apply the state changes of one normalized command without building any output."""
+        destinations = self._locations[self.current_location_id].available_commands
+        if choice in destinations:
+            destination_id = destinations[choice]
+            rule = self._restrictions.get(destination_id)
+            state = self._state
+            if rule is not None and not rule.allows(state.inventory.mask, state.score, state.turn):
+                return
+            if self._enter(destination_id):
+                self.mark_visited(destination_id)
+        elif choice.startswith(TRAVEL_PREFIX):
+            location_id = self.find_location(choice[len(TRAVEL_PREFIX):])
+            if location_id is not None and location_id != self.current_location_id:
+                self.travel(location_id)
+                if self.ongoing:
+                    self.mark_visited()
+        elif choice.startswith("take "):
+            self.pick_up(choice[5:])
+        elif choice.startswith("drop "):
+            item_name = choice[5:]
+            if self.drop(item_name):
+                self.check_quest(item_name)
+                self.apply_location_rewards(item_name)
+        elif choice == "submit early":
+            self.submit_early()
+        elif choice == "quit":
+            self.request_quit()
+
+    def checkpoint(self) -> GameCheckpoint:
+        """Return a copy of this session's state that restore can return to later.
+
+        The cost grows with what the player has changed, not with the size of the world.
+        """
+        return GameCheckpoint(self.current_location_id, self.ongoing, _copy_player_state(self._state),
+                              self._overlay.copy(), self._progress.copy(), self._fingerprint, self._journal)
+
+    def restore(self, checkpoint: GameCheckpoint) -> None:
+        """Put this session back in the state saved in checkpoint, including what can be undone.
+
+        The checkpoint is left unchanged, so it can be restored again.
+
+        Preconditions:
+            - checkpoint was taken from a game on the same world as this one
+
+        >>> game = AdventureGame('game_data.json', 2)
+        >>> _ = game.run_batch(["take tcard", "go west"])
+        >>> saved, saved_hash = game.checkpoint(), game.state_hash()
+        >>> _ = game.run_batch(["take signed extension request", "go east"])
+        >>> game.restore(saved)
+        >>> game.current_location_id, game.turn, game.state_hash() == saved_hash
+        (3, 1, True)
+        """
+        self.current_location_id = checkpoint.location_id
+        self.ongoing = checkpoint.ongoing
+        self._state = _copy_player_state(checkpoint.state)
+        self._overlay = checkpoint.overlay.copy()
+        self._progress = checkpoint.progress.copy()
+        self._fingerprint = checkpoint.fingerprint
+        self._journal = checkpoint.journal
+        self._changes = None
+
     def reset(self) -> None:
-        """Reset all items and player progress to a fresh game state."""
-        self._locations, self._items = self._load_game_data("game_data.json")
-        self.current_location_id = DEFAULT_START_LOCATION
+        """Reset all items and player progress to a fresh game state.
+
+        The pristine world loaded at construction is reused, so no file is read and the
+        cost is independent of world size.
+        """
+        self._overlay = WorldOverlay()
+        self.current_location_id = self._start_location_id
         self.ongoing = True
-        self._state = PlayerState()
+        self._state = self._new_player_state()
+        self._progress = self._new_progress_tracker()
+        self._fingerprint = 0
+        self._journal = None
+        self._changes = None
+
+
+def _copy_player_state(state: PlayerState) -> PlayerState:
+    """Return a copy of state that shares no mutable parts with it."""
+    return replace(state, inventory=state.inventory.with_items(state.inventory), flags=replace(state.flags),
+                   rewards_claimed=set(state.rewards_claimed), returned=set(state.returned))
+
+
+def quest_points(item: Item, returned: Container[str], item_index: dict[str, Item]) -> int:
+    """Return the points for returning item, given the names of the items already returned.
+
+    item_index maps lower-cased item names to items.
+    """
+    points = item.target_points
+
+    # Allow spare USB cable to substitute for the USB drive scoring objective.
+    if item.name == "spare usb cable" and "usb drive" not in returned:
+        usb_drive = item_index.get("usb drive")
+        if usb_drive is not None and usb_drive.target_points > points:
+            points = usb_drive.target_points
+    return points
 
 
 def _ask_play_again() -> bool:
@@ -476,24 +1328,22 @@ def lose() -> bool:
 
 def _did_player_win(game: AdventureGame) -> bool:
     """Return whether the player has met all win requirements."""
-    if not game.is_unlimited_moves() and game.turn >= game.MAX_TURNS:
-        return False
-    return game.score >= game.MIN_SCORE and game.has_required_returns()
+    return game.can_win_now()
 
 
-def _show_location(location: Location) -> None:
-    """Print either the long or brief location description."""
-    if location.visited:
+def _show_location(game: AdventureGame, location: Location) -> None:
+    """Print either the long or brief location description, marking the location visited."""
+    if game.mark_visited(location.id_num):
         print(location.description['brief_description'])
     else:
-        location.visited = True
         print(location.description['long_description'])
 
 
 def _show_available_actions(location: Location, turns_left: int, menu_commands: set[str]) -> None:
     """Print base commands, movement commands, and remaining turns."""
     base_menu = sorted(menu_commands)
-    print(f"What to do? Choose from: {', '.join(base_menu)}, take <item>, drop <item>, inspect <item>")
+    print(f"What to do? Choose from: {', '.join(base_menu)}, take <item>, drop <item>, inspect <item>, "
+          "travel to <location>, rewind to <turn>")
     print("At this location, you can also:")
     for action in location.available_commands:
         print("-", action)
@@ -512,7 +1362,8 @@ def _is_valid_choice(choice: str, location: Location, menu_commands: set[str]) -
     """Return whether choice can be processed at this location."""
     if choice in location.available_commands or choice in menu_commands:
         return True
-    return _is_item_command(choice)
+    return _is_item_command(choice) or any(choice.startswith(prefix) and len(choice) > len(prefix)
+                                           for prefix in (TRAVEL_PREFIX, REWIND_PREFIX))
 
 
 def _available_menu_commands(game: AdventureGame) -> set[str]:
@@ -549,139 +1400,28 @@ def _parse_item_command(choice: str) -> Optional[tuple[str, str]]:
     return verb, item_name
 
 
-def _show_location_items(game: AdventureGame, location: Location) -> None:
-    """Print all items currently available in location."""
-    if location.items:
-        print("Items In " + location.description['name'])
-        for item_name in location.items:
-            item = game.get_item(item_name)
-            print(item if item is not None else item_name)
-    else:
-        print("No Items In " + location.description['name'])
-
-
-def _show_inventory(game: AdventureGame) -> None:
-    """Print all items currently held by the player."""
-    if game.inventory:
-        for item in game.inventory:
-            print(item)
-    else:
-        print("No Items In Your Inventory")
-
-
-def _handle_item_command(game: AdventureGame, choice: str) -> None:
-    """Process take/drop/inspect commands."""
-    parsed = _parse_item_command(choice)
-    if parsed is None:
-        print("That was an invalid option; try again.")
-        return
-
-    verb, item_name = parsed
-    if verb == "take":
-        if game.pick_up(item_name):
-            print("You picked up " + item_name)
-        else:
-            print("No such item " + item_name + " here.")
-    elif verb == "drop":
-        if game.drop(item_name):
-            print("You dropped " + item_name)
-            game.check_quest(item_name)
-            for reward_message in game.apply_location_rewards(item_name):
-                print(reward_message)
-        else:
-            print("No such item " + item_name + " in inventory.")
-    else:
-        game.inspect(item_name)
-
-
-def _handle_non_movement_command(
-    game: AdventureGame,
-    game_log: EventList,
-    location: Location,
-    choice: str
-) -> None:
-    """Process a command that does not move the player."""
-    if choice == "log":
-        game_log.display_events()
-    elif choice == "look":
-        print(location.description['long_description'])
-        _show_location_items(game, location)
-    elif choice == "inventory":
-        _show_inventory(game)
-    elif choice == "score":
-        print(f"{game.score} / {game.MAX_SCORE}")
-    elif choice == "quit":
-        game.request_quit()
-    elif choice == "submit early":
-        submitted = game.submit_early()
-        if not submitted:
-            print("Submission is already finalized.")
-    else:
-        _handle_item_command(game, choice)
-
-
-def _apply_movement(game: AdventureGame, location: Location, choice: str) -> bool:
-    """Apply a movement command and update turn count.
-
-    Return whether movement succeeded (it can fail if entry restrictions are not met).
-    """
-    next_location_id = location.available_commands[choice]
-    can_enter, reason = game.can_enter_location(next_location_id)
-    if not can_enter:
-        if reason is not None:
-            print(reason)
-        return False
-
-    game.current_location_id = next_location_id
-    if not game.is_unlimited_moves():
-        game.turn += 1
-        if game.turn >= game.MAX_TURNS:
-            game.ongoing = False
-    return True
-
-
-def _resolve_turn(
-    game: AdventureGame,
-    game_log: EventList,
-    location: Location
-) -> tuple[Optional[str], bool]:
-    """Process commands until move/submit/quit and return (move_command, quit_requested)."""
-    choice = _prompt_choice(location, game)
+def _run_single_game(game: AdventureGame) -> bool:
+    """Run one game session from game's current state and return whether the player wants replay."""
+    game_log = EventList()  # Required baseline feature
+    location = game.get_location()
+    game_log.add_event(Event(location.id_num, location.description['brief_description']))
+    _show_location(game, location)
 
     while game.ongoing:
+        choice = _prompt_choice(game.get_location(), game)
         print("========")
         print("You decided to:", choice)
 
-        if choice in location.available_commands:
-            moved = _apply_movement(game, location, choice)
-            if moved:
-                return choice, False
-            choice = _prompt_choice(location, game)
-            continue
-
-        _handle_non_movement_command(game, game_log, location, choice)
-        if not game.ongoing:
-            return None, choice == "quit"
-
-        choice = _prompt_choice(location, game)
-
-    return None, False
-
-
-def _run_single_game() -> bool:
-    """Run one game session and return whether the player wants replay."""
-    game_log = EventList()  # Required baseline feature
-    game = AdventureGame('game_data.json', DEFAULT_START_LOCATION)
-    previous_choice = None
-
-    while game.ongoing:
-        location = game.get_location()
-        game_log.add_event(Event(location.id_num, location.description['brief_description']), previous_choice)
-
-        _show_location(location)
-        previous_choice, quit_requested = _resolve_turn(game, game_log, location)
-        if quit_requested:
-            return False
+        result = game.execute(choice)
+        if result.kind == "log":
+            game_log.display_events()
+        for message in result.messages:
+            print(message)
+        for _ in range(result.undone_moves):
+            game_log.remove_last_event()
+        for command, loc_id in result.steps:
+            arrived = game.get_location(loc_id)
+            game_log.add_event(Event(loc_id, arrived.description['brief_description']), command)
 
     if game.is_quit_requested():
         return False
@@ -693,9 +1433,11 @@ def _run_single_game() -> bool:
 
 def run() -> None:
     """Run the game and support replay loops."""
-    play_again = True
+    game = AdventureGame('game_data.json', DEFAULT_START_LOCATION)
+    play_again = _run_single_game(game)
     while play_again:
-        play_again = _run_single_game()
+        game.reset()
+        play_again = _run_single_game(game)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,563 @@
+"""Monte Carlo balance analysis for the CSC111 adventure game.
+
+Bot players play many games headlessly against AdventureGame, and the outcomes
+are collected into NumPy histograms, so the turn limit, the deadline extension
+and the item points can be tuned from data instead of by feel. Three policies
+are available:
+
+- ``random`` picks uniformly among the moves, takes and drops open to it;
+- ``greedy`` heads for the nearest item it has not yet delivered, or the target
+  of an item it carries, and drops items as soon as it reaches their target.
+  Once it has the minimum score, or the moves left come close to the moves
+  still needed to win, it heads for the required items first;
+- ``solver`` follows the optimal walkthrough found by solver.solve, finding its
+  way back after a slip and playing greedily once the plan runs out.
+
+Every bot submits as soon as submitting would win. The greedy and solver bots
+make a random move with probability ``slip``, which stands in for player error.
+
+Run a sweep with, for example::
+
+    python3 balance.py --games 100000 --policies greedy solver --max-turns 55 60 67 --points-scale 0.8 1
+
+Games are split into chunks and spread over a process pool. Solver plans are
+found once per configuration, also in the pool, and handed to every chunk that
+needs them. Each worker builds each world variant once and reuses it.
+"""
+
+from __future__ import annotations
+
+import abc
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import numpy as np
+
+from adventure import (DEFAULT_MAX_TURNS, DEFAULT_MIN_SCORE, DEFAULT_START_LOCATION, EXTENSION_BONUS_TURNS,
+                       REQUIRED_RETURN_ITEMS, USB_EQUIVALENT_ITEMS, AdventureGame, GameRules)
+from game_entities import GameWorld, Item
+from solver import solve
+from world_loader import build_world
+
+DEFAULT_SLIP = 0.05
+CHUNK_GAMES = 2_000
+MAX_ACTIONS_PER_TURN = 20
+HURRY_MARGIN = 10
+
+# The parsed game data and world variants of this worker process, set up by _init_worker.
+_worker_data: dict[str, Any] = {}
+_worker_worlds: dict[float, GameWorld] = {}
+
+
+@dataclass(frozen=True)
+class BalanceConfig:
+    """One combination of tunable game parameters.
+
+    Instance Attributes:
+        - max_turns: the moves a player starts with.
+        - extension_bonus_turns: the moves a deadline extension adds.
+        - points_scale: the factor every item's target_points is multiplied by, rounded.
+        - min_score: the score needed to win.
+    """
+    max_turns: int = DEFAULT_MAX_TURNS
+    extension_bonus_turns: int = EXTENSION_BONUS_TURNS
+    points_scale: float = 1.0
+    min_score: int = DEFAULT_MIN_SCORE
+
+    def rules(self) -> GameRules:
+        """Return the game rules of this configuration."""
+        return GameRules(self.max_turns, self.extension_bonus_turns, self.min_score)
+
+
+@dataclass
+class BalanceReport:
+    """The outcomes of many bot games played under one configuration.
+
+    Instance Attributes:
+        - config: the parameters the games were played with.
+        - policy: the name of the bot policy that played.
+        - games: the number of games played.
+        - score_counts: the number of games that ended with each final score, indexed by score.
+        - win_turn_counts: the number of won games submitted after each number of moves.
+    """
+    config: BalanceConfig
+    policy: str
+    games: int
+    score_counts: np.ndarray
+    win_turn_counts: np.ndarray
+
+    @property
+    def wins(self) -> int:
+        """Return the number of games won."""
+        return int(self.win_turn_counts.sum())
+
+    @property
+    def win_rate(self) -> float:
+        """Return the fraction of games won."""
+        return self.wins / self.games if self.games else 0.0
+
+    def merge(self, score_counts: np.ndarray, win_turn_counts: np.ndarray, games: int) -> None:
+        """Add the outcomes of games more games to this report."""
+        self.games += games
+        self.score_counts = _add_counts(self.score_counts, score_counts)
+        self.win_turn_counts = _add_counts(self.win_turn_counts, win_turn_counts)
+
+    def summary(self) -> dict[str, Any]:
+        """Return the headline numbers of this report."""
+        return {
+            "policy": self.policy,
+            "max_turns": self.config.max_turns,
+            "extension_bonus_turns": self.config.extension_bonus_turns,
+            "points_scale": self.config.points_scale,
+            "min_score": self.config.min_score,
+            "games": self.games,
+            "win_rate": round(self.win_rate, 4),
+            "mean_score": round(_mean(self.score_counts), 2),
+            "score_p10_p50_p90": [_quantile(self.score_counts, q) for q in (0.1, 0.5, 0.9)],
+            "mean_turns_to_win": round(_mean(self.win_turn_counts), 2) if self.wins else None,
+            "turns_to_win_p10_p50_p90": [_quantile(self.win_turn_counts, q) for q in (0.1, 0.5, 0.9)]
+            if self.wins else None,
+        }
+
+
+class BotPolicy(abc.ABC):
+    """A bot player that chooses one command at a time."""
+    # Private Instance Attributes:
+    #   - _world: the world being played.
+    #   - _rng: the source of random choices.
+    #   - _slip: the probability of making a random move instead of a planned command.
+    _world: GameWorld
+    _rng: random.Random
+    _slip: float
+
+    def __init__(self, world: GameWorld, rng: random.Random, slip: float = DEFAULT_SLIP) -> None:
+        self._world = world
+        self._rng = rng
+        self._slip = slip
+
+    def new_game(self, game: AdventureGame) -> None:
+        """Prepare to play the fresh game session game."""
+
+    @abc.abstractmethod
+    def choose(self, game: AdventureGame) -> str:
+        """Return the next command to play in game."""
+
+    def _random_move(self, game: AdventureGame) -> str:
+        """Return a uniformly random movement command from the current location."""
+        return self._rng.choice(list(game.get_location().available_commands))
+
+
+class RandomPolicy(BotPolicy):
+    """Picks uniformly among every move, take and drop available."""
+
+    def choose(self, game: AdventureGame) -> str:
+        """Return a uniformly random command."""
+        location = game.get_location()
+        options = list(location.available_commands)
+        options.extend("take " + name for name in location.items if name not in game.inventory)
+        options.extend("drop " + item.name for item in game.inventory)
+        return self._rng.choice(options)
+
+
+class GreedyPolicy(BotPolicy):
+    """Collects every undelivered item it can reach, nearest first, and delivers what it carries.
+
+    Items that an entry restriction needs are kept rather than delivered, so the bot
+    never locks itself out. Item positions are remembered from the start of the game and
+    from the bot's own actions, as a player would remember them. Once the score is high
+    enough, or fewer than HURRY_MARGIN spare moves are left over the moves still needed to
+    win, the bot heads for the items the win requires before anything else. While none of
+    those can be reached, it heads for the keys, and the items whose rewards lead to a
+    required item, instead.
+
+    >>> from world_loader import load_world
+    >>> world = load_world('game_data.json')
+    >>> game = AdventureGame.from_world(world, DEFAULT_START_LOCATION)
+    >>> scores, win_turns = play_games(game, GreedyPolicy(world, random.Random(0), slip=0.0), 20)
+    >>> bool((win_turns >= 0).all())
+    True
+    """
+    # Private Instance Attributes:
+    #   - _keys: the item bits that some entry restriction mentions.
+    #   - _helpers: the names of the items that some entry restriction mentions, and of the items
+    #               whose rewards hand out, directly or through further rewards, an item the win requires.
+    #   - _lying: the remembered location of each item the bot has not picked up.
+    #   - _goal: the location the bot is heading for, kept until it arrives or finds no way there.
+    _keys: int
+    _helpers: set[str]
+    _lying: dict[str, int]
+    _goal: Optional[int]
+
+    def __init__(self, world: GameWorld, rng: random.Random, slip: float = DEFAULT_SLIP) -> None:
+        super().__init__(world, rng, slip)
+        self._lying = {}
+        self._goal = None
+        self._keys = 0
+        pending = list(world.restrictions.values())
+        while pending:
+            rule = pending.pop()
+            self._keys |= rule.mask
+            pending.extend(rule.children)
+        self._helpers = {item.name for bit, item in enumerate(world.items) if self._keys >> bit & 1}
+        leads_to_win = set(REQUIRED_RETURN_ITEMS | USB_EQUIVALENT_ITEMS)
+        grown = True
+        while grown:
+            grown = False
+            for (_, trigger), effects in world.rewards.items():
+                item = world.item_index.get(trigger)
+                if (item is not None and item.name not in leads_to_win
+                        and any(effect.kind == "item" and effect.value in leads_to_win for effect in effects)):
+                    leads_to_win.add(item.name)
+                    self._helpers.add(item.name)
+                    grown = True
+
+    def new_game(self, game: AdventureGame) -> None:
+        """Remember where every item starts."""
+        self._lying = {item.name: item.start_position for item in self._world.items
+                       if item.start_position in self._world.locations}
+        self._goal = None
+
+    def choose(self, game: AdventureGame) -> str:
+        """Return a drop or take available here, or the first move towards the nearest goal."""
+        if self._rng.random() < self._slip:
+            return self._random_move(game)
+        here = game.current_location_id
+        returned = game.returned
+        for item in self._deliverable(game):
+            if item.target_position == here:
+                return "drop " + item.name
+        for name in game.get_location().items:
+            if name not in returned and name not in game.inventory:
+                self._lying.pop(name, None)
+                return "take " + name
+        if self._goal == here:
+            self._goal = None
+        if self._hurrying(game):
+            for urgent in self._urgent_goals(game):
+                if self._goal in urgent:
+                    break
+                target = self._nearest(game, urgent)
+                if target is not None:
+                    self._goal = target
+                    break
+        if self._goal is None:
+            self._goal = self._nearest(game, self._goals(game))
+        return self._step_towards(game, self._goal)
+
+    def _hurrying(self, game: AdventureGame) -> bool:
+        """Return whether the bot should head for the items the win requires before any others."""
+        if game.score >= game.MIN_SCORE:
+            return True
+        needed = game.moves_to_win()
+        return needed is not None and needed + HURRY_MARGIN >= game.MAX_TURNS - game.turn
+
+    def _urgent_goals(self, game: AdventureGame) -> tuple[set[int], set[int]]:
+        """Return the other locations with an item the win requires to collect or deliver, and those
+        with a helper item to collect or deliver.
+        """
+        wanted = [name for name in REQUIRED_RETURN_ITEMS if name not in game.returned]
+        if not game.has_storage_solution():
+            wanted.extend(USB_EQUIVALENT_ITEMS)
+        deliverable = {item.name for item in self._deliverable(game)}
+        return self._item_goals(game, wanted, deliverable), self._item_goals(game, self._helpers, deliverable)
+
+    def _item_goals(self, game: AdventureGame, names: Iterable[str], deliverable: set[str]) -> set[int]:
+        """Return the other locations where an item in names lies, or must be delivered if carried."""
+        goals = set()
+        for name in names:
+            item = self._world.item_index.get(name)
+            if item is None or item.name in game.returned:
+                continue
+            if item.name in deliverable:
+                goals.add(item.target_position)
+            elif item not in game.inventory and item.name in self._lying:
+                goals.add(self._lying[item.name])
+        goals.discard(game.current_location_id)
+        return goals
+
+    def _goals(self, game: AdventureGame) -> set[int]:
+        """Return the other locations with an item to collect or deliver."""
+        returned = game.returned
+        goals = {item.target_position for item in self._deliverable(game)}
+        for name, location_id in list(self._lying.items()):
+            if name in returned or name in game.inventory:
+                del self._lying[name]
+            elif location_id == game.current_location_id:
+                del self._lying[name]
+            else:
+                goals.add(location_id)
+        goals.discard(game.current_location_id)
+        return goals
+
+    def _deliverable(self, game: AdventureGame) -> list[Item]:
+        """Return the carried items the bot means to deliver."""
+        bits = self._world.item_bits
+        return [item for item in game.inventory
+                if item.name not in game.returned and not self._keys >> bits[item.name] & 1]
+
+    def _nearest(self, game: AdventureGame, goals: set[int]) -> Optional[int]:
+        """Return the nearest reachable location in goals, or None. Ties are broken at random."""
+        mask, score, turn = game.inventory.mask, game.score, game.turn
+        best, nearest = None, []
+        for goal in goals:
+            moves = self._world.routes.distance(game.current_location_id, goal, mask, score, turn)
+            if moves is None or (best is not None and moves > best):
+                continue
+            if best is None or moves < best:
+                best, nearest = moves, []
+            nearest.append(goal)
+        return self._rng.choice(nearest) if nearest else None
+
+    def _step_towards(self, game: AdventureGame, location_id: Optional[int]) -> str:
+        """Return the first move of a shortest route to location_id, or a random move if there is none."""
+        if location_id is not None:
+            command = self._world.routes.next_command(game.current_location_id, location_id, game.inventory.mask,
+                                                      game.score, game.turn)
+            if command is not None:
+                return command
+        self._goal = None
+        return self._random_move(game)
+
+
+class SolverPolicy(GreedyPolicy):
+    """Follows an optimal walkthrough, returning to it after slips and playing greedily afterwards."""
+    # Private Instance Attributes:
+    #   - _plan: the walkthrough's non-movement commands, with the location each is entered at.
+    #   - _next: the index in _plan of the next command to play.
+    _plan: list[tuple[int, str]]
+    _next: int
+
+    def __init__(self, world: GameWorld, rng: random.Random, plan: list[tuple[int, str]],
+                 slip: float = DEFAULT_SLIP) -> None:
+        super().__init__(world, rng, slip)
+        self._plan = plan
+        self._next = 0
+
+    def new_game(self, game: AdventureGame) -> None:
+        """Start again from the beginning of the plan."""
+        super().new_game(game)
+        self._next = 0
+
+    def choose(self, game: AdventureGame) -> str:
+        """Return the next planned command, or the next move towards where it is played."""
+        if self._next >= len(self._plan):
+            return super().choose(game)
+        if self._rng.random() < self._slip:
+            return self._random_move(game)
+        location_id, command = self._plan[self._next]
+        if location_id != game.current_location_id:
+            return self._step_towards(game, location_id)
+        self._next += 1
+        if command.startswith("take "):
+            self._lying.pop(command[5:], None)
+        return command
+
+
+def plan_waypoints(world: GameWorld, start_location_id: int, commands: list[str]) -> list[tuple[int, str]]:
+    """Return the non-movement commands of a walkthrough, each with the location it is entered at.
+
+    'submit early' is left out.
+
+    >>> from world_loader import load_world
+    >>> plan_waypoints(load_world('game_data.json'), 2, ["take tcard", "go west", "take dorm key", "submit early"])
+    [(2, 'take tcard'), (3, 'take dorm key')]
+    """
+    waypoints = []
+    location_id = start_location_id
+    for command in commands:
+        destinations = world.locations[location_id].available_commands
+        if command in destinations:
+            location_id = destinations[command]
+        elif command != "submit early":
+            waypoints.append((location_id, command))
+    return waypoints
+
+
+def scaled_world(data: dict[str, Any], points_scale: float) -> GameWorld:
+    """Return the world described by parsed game data with every item's points multiplied by points_scale."""
+    items = [dict(item, target_points=round(item["target_points"] * points_scale)) for item in data["items"]]
+    return build_world(dict(data, items=items))
+
+
+def play_games(game: AdventureGame, policy: BotPolicy, games: int) -> tuple[np.ndarray, np.ndarray]:
+    """Play games games of game with policy and return per-game final scores and moves at a win.
+
+    The moves entry of a lost game is -1. A game is abandoned, and lost, after
+    MAX_ACTIONS_PER_TURN commands per available move without ending.
+    """
+    scores = np.zeros(games, dtype=np.int32)
+    win_turns = np.full(games, -1, dtype=np.int32)
+    for index in range(games):
+        game.reset()
+        policy.new_game(game)
+        actions = MAX_ACTIONS_PER_TURN * max(1, game.MAX_TURNS)
+        while game.ongoing and actions > 0:
+            if game.can_win_now():
+                win_turns[index] = game.turn
+                game.step("submit early")
+                break
+            game.step(policy.choose(game))
+            actions -= 1
+        scores[index] = game.score
+    return scores, win_turns
+
+
+def _init_worker(data_file: str) -> None:
+    """Parse the game data once in a new worker process."""
+    with open(data_file, encoding='utf-8') as file:
+        _worker_data.update(json.load(file))
+
+
+def _world_for(config: BalanceConfig) -> GameWorld:
+    """Return this worker's world for the points of config, building it on first use."""
+    if config.points_scale not in _worker_worlds:
+        _worker_worlds[config.points_scale] = scaled_world(_worker_data, config.points_scale)
+    return _worker_worlds[config.points_scale]
+
+
+def _plan(task: tuple[BalanceConfig, int]) -> list[tuple[int, str]]:
+    """Return the solver plan for a configuration and start location in a worker process.
+
+    The plan is empty if the game cannot be won.
+    """
+    config, start_location_id = task
+    world = _world_for(config)
+    solution = solve(world, start_location_id, config.max_turns, config.min_score,
+                     extension_bonus_turns=config.extension_bonus_turns)
+    return [] if solution is None else plan_waypoints(world, start_location_id, solution.commands)
+
+
+def _run_chunk(task: tuple[int, BalanceConfig, str, list[tuple[int, str]], int, int, float, int]
+               ) -> tuple[int, np.ndarray, np.ndarray, int]:
+    """Play one chunk of games in a worker process.
+
+    Return the task's report index, its score and win-turn counts, and the number of games played.
+    """
+    report_index, config, policy_name, plan, games, start_location_id, slip, seed = task
+    world = _world_for(config)
+    rng = random.Random(seed)
+    if policy_name == "random":
+        policy: BotPolicy = RandomPolicy(world, rng, slip)
+    elif policy_name == "greedy":
+        policy = GreedyPolicy(world, rng, slip)
+    else:
+        policy = SolverPolicy(world, rng, plan, slip)
+
+    game = AdventureGame.from_world(world, start_location_id, config.rules())
+    scores, win_turns = play_games(game, policy, games)
+    return report_index, np.bincount(scores), np.bincount(win_turns[win_turns >= 0]), games
+
+
+def analyze(
+    configs: list[BalanceConfig],
+    policies: list[str],
+    games: int,
+    data_file: str = "game_data.json",
+    start_location_id: int = DEFAULT_START_LOCATION,
+    slip: float = DEFAULT_SLIP,
+    workers: Optional[int] = None,
+    seed: int = 0
+) -> list[BalanceReport]:
+    """Play games games for every combination of configs and policies over a process pool.
+
+    Return one report per combination, in the order configs and policies are given.
+    Results are reproducible for a given seed and chunking.
+    """
+    workers = workers or os.cpu_count() or 1
+    reports = [BalanceReport(config, policy, 0, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+               for config, policy in itertools.product(configs, policies)]
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data_file,)) as executor:
+        planned = configs if "solver" in policies else []
+        plans = dict(zip(planned, executor.map(_plan, [(config, start_location_id) for config in planned])))
+        tasks = []
+        for report_index, report in enumerate(reports):
+            plan = plans[report.config] if report.policy == "solver" else []
+            for first in range(0, games, CHUNK_GAMES):
+                tasks.append((report_index, report.config, report.policy, plan, min(CHUNK_GAMES, games - first),
+                              start_location_id, slip, seed * 1_000_003 + len(tasks)))
+        for report_index, score_counts, win_turn_counts, played in executor.map(_run_chunk, tasks):
+            reports[report_index].merge(score_counts, win_turn_counts, played)
+    return reports
+
+
+def _add_counts(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Return the sum of two histograms, padding the shorter one with zeros."""
+    total = np.zeros(max(len(first), len(second)), dtype=np.int64)
+    total[:len(first)] += first
+    total[:len(second)] += second
+    return total
+
+
+def _mean(counts: np.ndarray) -> float:
+    """Return the mean value of a histogram indexed by value."""
+    total = counts.sum()
+    return float(np.dot(np.arange(len(counts)), counts) / total) if total else 0.0
+
+
+def _quantile(counts: np.ndarray, q: float) -> int:
+    """Return the smallest value with at least a fraction q of a histogram at or below it.
+
+    >>> _quantile(np.array([1, 0, 3]), 0.5)
+    2
+    """
+    cumulative = np.cumsum(counts)
+    return int(np.searchsorted(cumulative, q * cumulative[-1])) if len(counts) and cumulative[-1] else 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the command-line interface and return the process exit status."""
+    parser = argparse.ArgumentParser(description="Estimate win rates and score distributions with bot players.")
+    parser.add_argument("--data", default="game_data.json", help="game data JSON file")
+    parser.add_argument("--games", type=int, default=10_000, help="games per configuration and policy")
+    parser.add_argument("--policies", nargs="+", choices=("random", "greedy", "solver"), default=["greedy", "solver"])
+    parser.add_argument("--max-turns", nargs="+", type=int, default=[DEFAULT_MAX_TURNS])
+    parser.add_argument("--extension-bonus", nargs="+", type=int, default=[EXTENSION_BONUS_TURNS])
+    parser.add_argument("--points-scale", nargs="+", type=float, default=[1.0])
+    parser.add_argument("--min-score", nargs="+", type=int, default=[DEFAULT_MIN_SCORE])
+    parser.add_argument("--start", type=int, default=DEFAULT_START_LOCATION, help="starting location id")
+    parser.add_argument("--slip", type=float, default=DEFAULT_SLIP, help="chance of a random move per command")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", default=None, help="write every histogram to this .npz file")
+    args = parser.parse_args(argv)
+
+    configs = [BalanceConfig(*values) for values in itertools.product(args.max_turns, args.extension_bonus,
+                                                                      args.points_scale, args.min_score)]
+    start = time.perf_counter()
+    reports = analyze(configs, args.policies, args.games, args.data, args.start, args.slip, args.workers, args.seed)
+    seconds = time.perf_counter() - start
+
+    for report in reports:
+        print(json.dumps(report.summary()))
+    if args.save is not None:
+        arrays = {}
+        for index, report in enumerate(reports):
+            arrays[f"scores_{index}"] = report.score_counts
+            arrays[f"win_turns_{index}"] = report.win_turn_counts
+        np.savez(args.save, summaries=np.array([json.dumps(report.summary()) for report in reports]), **arrays)
+    total = sum(report.games for report in reports)
+    print(f"{total} games in {seconds:.2f}s ({total / seconds:.0f} games/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    # import python_ta
+    #
+    # python_ta.check_all(config={
+    #     'max-line-length': 120,
+    #     'disable': [
+    #         'R1705',
+    #         'E9998',
+    #         'E9999',
+    #         'static_type_checker',
+    #     ]
+    # })
+    sys.exit(main())
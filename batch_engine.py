@@ -0,0 +1,409 @@
+"""Vectorized multi-session engine for the CSC111 adventure game.
+
+GameBatch plays K independent game sessions on one world at once, for bot
+training and balance sweeps. The sessions are kept as a structure of NumPy
+arrays rather than K AdventureGame objects:
+
+- the current location (as a dense location index), turn, move limit and score of each game;
+- the carried, returned and claimed-reward flags of each game, as bitsets of 64-bit words;
+- an item-location table holding, for every game and item, the bitset of locations
+  where the item lies. An item can lie in more than one place, because a reward may
+  hand out an item that also lies somewhere else.
+
+Commands are encoded once into integer actions. Each call to step applies one
+action to every game, using a (location, action) -> destination table compiled from
+``available_commands``, entry restrictions evaluated over whole groups of games at
+once, and reward effects compiled per (location, item). The rules are those of
+AdventureGame.run_batch; ``travel to`` commands are not supported and must be
+expanded with RouteIndex.path first, and ``undo`` and ``rewind to`` commands are
+not supported at all, since the batch keeps no history to take back. Encoding
+any of these raises ValueError. matches_scalar checks a set of command scripts
+against AdventureGame.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import numpy as np
+
+from adventure import (REQUIRED_RETURN_ITEMS, REWIND_PREFIX, TRAVEL_PREFIX, USB_EQUIVALENT_ITEMS, AdventureGame,
+                       GameRules, quest_points)
+from game_entities import GameWorld
+from restrictions import Restriction, mask_bits
+from world_loader import load_world
+
+NOOP = 0
+EXTENSION_EFFECT = "extra time granted"
+
+
+class GameBatch:
+    """K independent game sessions on one world, stepped together.
+
+    Travel, undo and rewind commands cannot be encoded; see encode.
+
+    Instance Attributes:
+        - location: the dense location index of each game; location_ids gives location ids.
+        - turns: the moves made in each game.
+        - max_turns: the move limit of each game, including any deadline extension.
+        - scores: the score of each game.
+        - ongoing: whether each game is still being played.
+        - actions: the command each action id stands for, indexed by action id.
+
+    >>> batch = GameBatch(load_world('game_data.json'), 3, 2)
+    >>> batch.step(batch.encode_all(["take tcard", "go west", "go west"]))
+    >>> batch.step(batch.encode_all(["go east", "take dorm key", "go west"]))
+    >>> batch.location_ids.tolist(), batch.turns.tolist()
+    ([2, 3, 4], [0, 1, 2])
+    """
+    # Private Instance Attributes:
+    #   - _world: the world being played.
+    #   - _rules: the turn limits and minimum score of every game.
+    #   - _start: the dense index of the starting location.
+    #   - _ids: location ids, indexed by dense location index.
+    #   - _action_ids: action ids keyed by lower-cased command, including item aliases.
+    #   - _moves: the destination index of each (location index, action id), or -1 if the action is not a move.
+    #   - _rules_at: the entry rule of each location index that has one.
+    #   - _take_base, _drop_base: the action ids of taking and dropping item 0.
+    #   - _submit, _quit: the action ids of 'submit early' and 'quit'.
+    #   - _targets: the target location index of each item, or -1 if it has none.
+    #   - _points_before, _points_after: each item's points before and after the usb drive is returned.
+    #   - _usb_bit: the item bit of the usb drive, or -1 if the world has none.
+    #   - _rewards: (claim id, granted item bit or -1, is deadline extension) effects keyed by
+    #               location index * item count + item bit.
+    #   - _start_placed: the item-location table of a fresh game.
+    #   - _carried, _returned: (games, item words) bitsets.
+    #   - _claimed: (games, reward ids) flags of claimed rewards.
+    #   - _placed: (games, items, location words) item-location table.
+    #   - _extended: whether each game has had its deadline extension.
+    _world: GameWorld
+    _rules: GameRules
+    _start: int
+    _ids: np.ndarray
+    _action_ids: dict[str, int]
+    _moves: np.ndarray
+    _rules_at: dict[int, Restriction]
+    _take_base: int
+    _drop_base: int
+    _submit: int
+    _quit: int
+    _targets: np.ndarray
+    _points_before: np.ndarray
+    _points_after: np.ndarray
+    _usb_bit: int
+    _rewards: dict[int, list[tuple[int, int, bool]]]
+    _start_placed: np.ndarray
+    _carried: np.ndarray
+    _returned: np.ndarray
+    _claimed: np.ndarray
+    _placed: np.ndarray
+    _extended: np.ndarray
+    location: np.ndarray
+    turns: np.ndarray
+    max_turns: np.ndarray
+    scores: np.ndarray
+    ongoing: np.ndarray
+    actions: list[str]
+
+    def __init__(self, world: GameWorld, size: int, start_location_id: int, rules: Optional[GameRules] = None) -> None:
+        self._world = world
+        self._rules = GameRules() if rules is None else rules
+        self._ids = np.array(list(world.locations), dtype=np.int64)
+        index = {loc_id: position for position, loc_id in enumerate(world.locations)}
+        self._start = index[start_location_id]
+        self._compile_actions(index)
+        self._compile_items(index)
+        self.reset(size)
+
+    def _compile_actions(self, index: dict[int, int]) -> None:
+        """Build the action vocabulary and the movement table."""
+        world = self._world
+        self.actions = ["noop"]
+        for location in world.locations.values():
+            for command in location.available_commands:
+                if command not in self.actions:
+                    self.actions.append(command)
+        move_count = len(self.actions)
+        self._take_base = move_count
+        self._drop_base = move_count + len(world.items)
+        self.actions.extend("take " + item.name for item in world.items)
+        self.actions.extend("drop " + item.name for item in world.items)
+        self._submit = len(self.actions)
+        self._quit = self._submit + 1
+        self.actions.extend(["submit early", "quit"])
+        self._action_ids = {command: action for action, command in enumerate(self.actions)}
+        for name, bit in world.item_bits.items():
+            self._action_ids["take " + name] = self._take_base + bit
+            self._action_ids["drop " + name] = self._drop_base + bit
+
+        self._moves = np.full((len(index), len(self.actions)), -1, dtype=np.int64)
+        for loc_id, location in world.locations.items():
+            for command, dest in location.available_commands.items():
+                if dest in index:
+                    self._moves[index[loc_id], self._action_ids[command]] = index[dest]
+        self._rules_at = {index[loc_id]: rule for loc_id, rule in world.restrictions.items() if loc_id in index}
+
+    def _compile_items(self, index: dict[int, int]) -> None:
+        """Build the item targets, points, reward effects and starting item-location table."""
+        world = self._world
+        items = world.items
+        self._targets = np.array([index.get(item.target_position, -1) for item in items], dtype=np.int64)
+        # quest_points depends on the returned items only through the usb drive.
+        self._points_before = np.array([quest_points(item, (), world.item_index) for item in items], dtype=np.int64)
+        self._points_after = np.array([quest_points(item, {"usb drive"}, world.item_index) for item in items],
+                                      dtype=np.int64)
+        self._usb_bit = world.item_bits.get("usb drive", -1)
+
+        self._rewards = {}
+        claim_ids: dict[int, int] = {}
+        for (loc_id, trigger), effects in world.rewards.items():
+            trigger_item = world.item_index.get(trigger)
+            if trigger_item is None or loc_id not in index:
+                continue
+            key = index[loc_id] * len(items) + world.item_bits[trigger_item.name]
+            if key in self._rewards:
+                continue
+            self._rewards[key] = [
+                (claim_ids.setdefault(effect.reward_id, len(claim_ids)),
+                 world.item_bits.get(effect.value, -1) if effect.kind == "item" else -1,
+                 effect.kind == "attribute" and effect.value == EXTENSION_EFFECT)
+                for effect in effects
+            ]
+        self._claimed = np.zeros((0, len(claim_ids)), dtype=bool)
+
+        self._start_placed = np.zeros((len(items), _word_count(len(index))), dtype=np.uint64)
+        for loc_id, location in world.locations.items():
+            for name in location.items:
+                bit = world.item_bits.get(name.strip().lower())
+                if bit is not None:
+                    self._start_placed[bit, index[loc_id] >> 6] |= np.uint64(1 << (index[loc_id] & 63))
+
+    def reset(self, size: Optional[int] = None) -> None:
+        """Start every game afresh, with size games if size is given."""
+        size = len(self.location) if size is None else size
+        item_words = _word_count(len(self._world.items))
+        self.location = np.full(size, self._start, dtype=np.int64)
+        self.turns = np.zeros(size, dtype=np.int64)
+        self.max_turns = np.full(size, self._rules.max_turns, dtype=np.int64)
+        self.scores = np.zeros(size, dtype=np.int64)
+        self.ongoing = np.ones(size, dtype=bool)
+        self._carried = np.zeros((size, item_words), dtype=np.uint64)
+        self._returned = np.zeros((size, item_words), dtype=np.uint64)
+        self._claimed = np.zeros((size, self._claimed.shape[1]), dtype=bool)
+        self._placed = np.repeat(self._start_placed[np.newaxis], size, axis=0)
+        self._extended = np.zeros(size, dtype=bool)
+
+    @property
+    def location_ids(self) -> np.ndarray:
+        """Return the location id of each game."""
+        return self._ids[self.location]
+
+    def encode(self, command: str) -> int:
+        """Return the action id of command, or NOOP if it does nothing in any game.
+
+        Raise ValueError for travel, undo and rewind commands, which this engine does not support.
+
+        >>> GameBatch(load_world('game_data.json'), 1, 2).encode("undo")
+        Traceback (most recent call last):
+        ...
+        ValueError: Undo and rewind commands are not supported by GameBatch: 'undo'
+        """
+        choice = command.strip().lower()
+        if choice in self._action_ids:
+            return self._action_ids[choice]
+        if choice.startswith(TRAVEL_PREFIX):
+            raise ValueError(f"Travel commands are not supported by GameBatch: {command!r}")
+        if choice == "undo" or choice.startswith(REWIND_PREFIX):
+            raise ValueError(f"Undo and rewind commands are not supported by GameBatch: {command!r}")
+        if choice.startswith(("take ", "drop ")):
+            return self._action_ids.get(choice[:5] + choice[5:].strip(), NOOP)
+        return NOOP
+
+    def encode_all(self, commands: Iterable[str]) -> np.ndarray:
+        """Return the action ids of commands, one per game."""
+        return np.array([self.encode(command) for command in commands], dtype=np.int64)
+
+    def step(self, actions: np.ndarray) -> None:
+        """Apply actions[k] to game k for every game, with the rules of AdventureGame.run_batch.
+
+        Games that have ended are left unchanged.
+        """
+        item_count = len(self._world.items)
+        dest = self._moves[self.location, actions]
+        self._move(np.flatnonzero(self.ongoing & (dest >= 0)), dest)
+
+        takes = actions - self._take_base
+        rows = np.flatnonzero(self.ongoing & (takes >= 0) & (takes < item_count))
+        self._take(rows, takes[rows])
+
+        drops = actions - self._drop_base
+        rows = np.flatnonzero(self.ongoing & (drops >= 0) & (drops < item_count))
+        self._drop(rows, drops[rows])
+
+        self.ongoing &= (actions != self._submit) & (actions != self._quit)
+
+    def run(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Apply each row of a (steps, games) action array in turn.
+
+        Return (steps, games) arrays of the location id, score and turn after each step,
+        matching the columns AdventureGame.run_batch returns for one game.
+        """
+        shape = (len(actions), len(self.location))
+        location_ids = np.zeros(shape, dtype=np.int64)
+        scores = np.zeros(shape, dtype=np.int64)
+        turns = np.zeros(shape, dtype=np.int64)
+        for index, row in enumerate(actions):
+            self.step(row)
+            location_ids[index] = self.location_ids
+            scores[index] = self.scores
+            turns[index] = self.turns
+        return location_ids, scores, turns
+
+    def can_win_now(self) -> np.ndarray:
+        """Return whether submitting now would win, for each game."""
+        returned = self._has(self._returned, [self._world.item_bits[name] for name in REQUIRED_RETURN_ITEMS
+                                              if name in self._world.item_bits])
+        storage = np.zeros(len(self.location), dtype=bool)
+        for name in USB_EQUIVALENT_ITEMS:
+            if name in self._world.item_bits:
+                storage |= self._has(self._returned, [self._world.item_bits[name]])
+        return (self.ongoing & (self.turns < self.max_turns) & (self.scores >= self._rules.min_score)
+                & returned & storage)
+
+    def _move(self, rows: np.ndarray, dest: np.ndarray) -> None:
+        """Move the games in rows to their destinations in dest, where their entry rules allow."""
+        targets = dest[rows]
+        allowed = np.ones(len(rows), dtype=bool)
+        for target in np.unique(targets):
+            rule = self._rules_at.get(int(target))
+            if rule is not None:
+                group = targets == target
+                chosen = rows[group]
+                allowed[group] = self._allows(rule, self._carried[chosen], self.scores[chosen], self.turns[chosen])
+        rows = rows[allowed]
+        self.location[rows] = targets[allowed]
+        self.turns[rows] += 1
+        self.ongoing[rows] = self.turns[rows] < self.max_turns[rows]
+
+    def _take(self, rows: np.ndarray, bits: np.ndarray) -> None:
+        """Pick up item bits[i] in game rows[i] where it lies here and is not already carried."""
+        here = self.location[rows]
+        lying = self._placed[rows, bits, here >> 6] >> (here & 63).astype(np.uint64) & np.uint64(1) != 0
+        carried = self._carried[rows, bits >> 6] >> (bits & 63).astype(np.uint64) & np.uint64(1) != 0
+        ok = lying & ~carried
+        rows, bits, here = rows[ok], bits[ok], here[ok]
+        self._placed[rows, bits, here >> 6] &= ~(np.uint64(1) << (here & 63).astype(np.uint64))
+        self._carried[rows, bits >> 6] |= np.uint64(1) << (bits & 63).astype(np.uint64)
+
+    def _drop(self, rows: np.ndarray, bits: np.ndarray) -> None:
+        """Drop carried item bits[i] in game rows[i], then score it and apply any location reward."""
+        carried = self._carried[rows, bits >> 6] >> (bits & 63).astype(np.uint64) & np.uint64(1) != 0
+        rows, bits = rows[carried], bits[carried]
+        here = self.location[rows]
+        item_flags = np.uint64(1) << (bits & 63).astype(np.uint64)
+        self._carried[rows, bits >> 6] &= ~item_flags
+        self._placed[rows, bits, here >> 6] |= np.uint64(1) << (here & 63).astype(np.uint64)
+
+        returned = self._returned[rows, bits >> 6] & item_flags != 0
+        quest = (self._targets[bits] == here) & ~returned
+        scored, scored_bits = rows[quest], bits[quest]
+        self._returned[scored, scored_bits >> 6] |= item_flags[quest]
+        points = self._points_before[scored_bits]
+        if self._usb_bit >= 0:
+            usb_returned = self._has(self._returned[scored], [self._usb_bit])
+            points = np.where(usb_returned, self._points_after[scored_bits], points)
+        self.scores[scored] += points
+
+        keys = here * len(self._world.items) + bits
+        for key in np.unique(keys):
+            effects = self._rewards.get(int(key))
+            if effects is not None:
+                self._claim(rows[keys == key], effects)
+
+    def _claim(self, rows: np.ndarray, effects: list[tuple[int, int, bool]]) -> None:
+        """Apply reward effects to the games in rows, skipping effects a game has already claimed."""
+        for claim, granted, is_extension in effects:
+            fresh = rows[~self._claimed[rows, claim]]
+            if granted >= 0:
+                self._carried[fresh, granted >> 6] |= np.uint64(1 << (granted & 63))
+            elif is_extension:
+                extend = fresh[~self._extended[fresh]]
+                self.max_turns[extend] += self._rules.extension_bonus_turns
+                self._extended[extend] = True
+            self._claimed[fresh, claim] = True
+
+    def _allows(self, rule: Restriction, carried: np.ndarray, scores: np.ndarray, turns: np.ndarray) -> np.ndarray:
+        """Return Restriction.allows for each row of carried item bitsets, scores and turns."""
+        if rule.op in ("all", "any"):
+            needed = mask_bits(rule.mask)
+            if rule.op == "all":
+                result = self._has(carried, needed)
+                for child in rule.children:
+                    result &= self._allows(child, carried, scores, turns)
+            else:
+                result = np.zeros(len(carried), dtype=bool)
+                for bit in needed:
+                    result |= self._has(carried, [bit])
+                for child in rule.children:
+                    result |= self._allows(child, carried, scores, turns)
+            return result
+        if rule.op == "not":
+            return ~self._allows(rule.children[0], carried, scores, turns)
+        if rule.op == "min_score":
+            return scores >= rule.threshold
+        if rule.op == "min_turn":
+            return turns >= rule.threshold
+        return turns <= rule.threshold
+
+    @staticmethod
+    def _has(bitsets: np.ndarray, bits: list[int]) -> np.ndarray:
+        """Return whether every bit in bits is set, for each row of a (rows, words) bitset array."""
+        result = np.ones(len(bitsets), dtype=bool)
+        for bit in bits:
+            result &= bitsets[:, bit >> 6] & np.uint64(1 << (bit & 63)) != 0
+        return result
+
+
+def _word_count(bits: int) -> int:
+    """Return the number of 64-bit words needed to hold bits bits."""
+    return max(1, (bits + 63) // 64)
+
+
+def matches_scalar(data_file: str, start_location_id: int, scripts: list[list[str]]) -> bool:
+    """Return whether GameBatch and AdventureGame.run_batch agree on every script.
+
+    All scripts are played side by side in one batch, padded with a command that does
+    nothing, and the location id, score and turn after every command are compared.
+
+    >>> import glob, json
+    >>> specs = [json.load(open(path, encoding='utf-8')) for path in sorted(glob.glob('walkthroughs/*.json'))]
+    >>> matches_scalar('game_data.json', 2, [spec["commands"] for spec in specs])
+    True
+    """
+    world = load_world(data_file)
+    length = max(len(script) for script in scripts)
+    padded = [list(script) + ["look"] * (length - len(script)) for script in scripts]
+    batch = GameBatch(world, len(scripts), start_location_id)
+    actions = np.array([batch.encode_all(column) for column in zip(*padded)], dtype=np.int64)
+    location_ids, scores, turns = batch.run(actions)
+    for column, script in enumerate(padded):
+        expected = AdventureGame(data_file, start_location_id).run_batch(script)
+        if (location_ids[:, column].tolist() != list(expected.location_ids)
+                or scores[:, column].tolist() != list(expected.scores)
+                or turns[:, column].tolist() != list(expected.turns)):
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': [
+            'R1705',
+            'E9998',
+            'E9999',
+            'static_type_checker',
+        ]
+    })
@@ -0,0 +1,418 @@
+"""Micro-benchmarks for the CSC111 adventure engine.
+
+Each benchmark builds synthetic worlds of increasing size and prints a small
+table, so regressions in per-command cost are easy to spot by eye.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Optional
+
+import numpy as np
+
+from adventure import AdventureGame
+from batch_engine import GameBatch
+from event_logger import CompactEventList, Event, EventList
+from progress import ProgressTracker
+from routes import RouteIndex
+from simulation import AdventureGameSimulation
+from solver import solve
+from world_loader import load_world
+
+WORLD_SIZES = (100, 1_000, 10_000, 50_000)
+
+
+def write_synthetic_world(
+    directory: str,
+    item_count: int,
+    items_per_location: int = 20,
+    gated: bool = False,
+    location_count: Optional[int] = None
+) -> str:
+    """Write a ring-shaped world with item_count items to directory and return its path.
+
+    Items are spread evenly around the ring, items_per_location to a location unless
+    location_count is given. When gated is True, every location gets a multi-item entry
+    restriction.
+    """
+    if location_count is None:
+        location_count = max(2, item_count // items_per_location)
+    locations = []
+    for loc_id in range(1, location_count + 1):
+        locations.append({
+            "id": loc_id,
+            "name": f"Room {loc_id}",
+            "brief_description": f"Room {loc_id}.",
+            "long_description": f"You are in room {loc_id}.",
+            "available_commands": {
+                "go east": loc_id % location_count + 1,
+                "go west": (loc_id - 2) % location_count + 1,
+            },
+            "items": [],
+        })
+        if gated:
+            locations[-1]["restrictions"] = {"all": [
+                f"item {loc_id % item_count}",
+                {"any": [f"item {(loc_id * 7) % item_count}", {"min_score": 5}]},
+                {"not": {"max_turn": -1}},
+            ]}
+
+    items = []
+    for index in range(item_count):
+        start = index * location_count // item_count + 1
+        locations[start - 1]["items"].append(f"item {index}")
+        items.append({
+            "name": f"item {index}",
+            "description": "A synthetic item.",
+            "hint": "It belongs somewhere else.",
+            "completion_text": "Delivered.",
+            "start_position": start,
+            "target_position": (start % location_count) + 1,
+            "target_points": 1,
+            "aliases": [f"thing {index}"],
+        })
+
+    path = os.path.join(directory, f"world_{item_count}_{location_count}.json")
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({"locations": locations, "items": items}, file)
+    return path
+
+
+def _time_per_call(action: Callable[[], object], repeats: int) -> float:
+    """Return the mean wall-clock time of action in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        action()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def bench_item_commands(repeats: int = 2_000) -> None:
+    """Print per-command cost of item lookups and take/drop as the item count grows."""
+    print(f"{'items':>8} {'get_item us':>12} {'alias us':>10} {'take+drop us':>13}")
+    with tempfile.TemporaryDirectory() as directory:
+        for item_count in WORLD_SIZES:
+            game = AdventureGame(write_synthetic_world(directory, item_count), 1)
+            last_name = f"item {item_count - 1}"
+            last_alias = f"THING {item_count - 1}"
+            local_name = "item 0"
+
+            def take_and_drop(game: AdventureGame = game, name: str = local_name) -> None:
+                game.pick_up(name)
+                game.drop(name)
+
+            lookup = _time_per_call(lambda g=game, n=last_name: g.get_item(n), repeats)
+            alias = _time_per_call(lambda g=game, n=last_alias: g.get_item(n), repeats)
+            command = _time_per_call(take_and_drop, repeats)
+            print(f"{item_count:>8} {lookup:>12.3f} {alias:>10.3f} {command:>13.3f}")
+
+
+def bench_restriction_checks(repeats: int = 5_000) -> None:
+    """Print can_enter_location cost as the number of gated locations grows."""
+    print(f"{'gated locations':>16} {'blocked us':>11} {'allowed us':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for item_count in WORLD_SIZES:
+            game = AdventureGame(write_synthetic_world(directory, item_count, gated=True), 1)
+            target = len(game.location_dict()) // 2
+            blocked = _time_per_call(lambda g=game, t=target: g.can_enter_location(t), repeats)
+            game.inventory = [game.get_item(f"item {target % item_count}"),
+                              game.get_item(f"item {(target * 7) % item_count}")]
+            allowed = _time_per_call(lambda g=game, t=target: g.can_enter_location(t), repeats)
+            print(f"{len(game.location_dict()):>16} {blocked:>11.3f} {allowed:>11.3f}")
+
+
+def bench_world_load(repeats: int = 5) -> None:
+    """Print JSON parse time against compiled-cache load time for growing worlds."""
+    print(f"{'items':>8} {'json MB':>8} {'json ms':>9} {'cache ms':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for item_count in WORLD_SIZES:
+            path = write_synthetic_world(directory, item_count, gated=True)
+            load_world(path)
+            parse = _time_per_call(lambda p=path: load_world(p, use_cache=False), repeats) / 1000
+            cached = _time_per_call(lambda p=path: load_world(p), repeats) / 1000
+            megabytes = os.path.getsize(path) / 1e6
+            print(f"{item_count:>8} {megabytes:>8.2f} {parse:>9.2f} {cached:>9.2f}")
+
+
+def bench_reset(repeats: int = 200) -> None:
+    """Print AdventureGame.reset cost after a few moves, for growing worlds."""
+    print(f"{'items':>8} {'reset us':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for item_count in WORLD_SIZES:
+            game = AdventureGame(write_synthetic_world(directory, item_count), 1)
+
+            def play_then_reset(game: AdventureGame = game) -> None:
+                game.pick_up("item 0")
+                game.current_location_id = 2
+                game.drop("item 0")
+                game.reset()
+
+            print(f"{item_count:>8} {_time_per_call(play_then_reset, repeats):>9.2f}")
+
+
+def bench_session_memory(sessions: int = 200) -> None:
+    """Print the memory each extra game session costs on worlds of growing size."""
+    print(f"{'items':>8} {'bytes/session':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for item_count in WORLD_SIZES:
+            path = write_synthetic_world(directory, item_count)
+            games = [AdventureGame(path, 1)]
+            tracemalloc.start()
+            before = tracemalloc.get_traced_memory()[0]
+            for _ in range(sessions):
+                game = AdventureGame(path, 1)
+                game.pick_up("item 0")
+                game.current_location_id = 2
+                game.drop("item 0")
+                game.mark_visited()
+                games.append(game)
+            used = tracemalloc.get_traced_memory()[0] - before
+            tracemalloc.stop()
+            print(f"{item_count:>8} {used / sessions:>14.0f}")
+
+
+def bench_headless_commands(repeats: int = 2_000) -> None:
+    """Print the cost of a take/look/drop/move command cycle with and without terminal output."""
+    print(f"{'items':>8} {'execute us':>11} {'printed us':>11}")
+    commands = ("take item 0", "look", "go east", "drop item 0", "go west", "take item 0", "drop item 0")
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, 'w', encoding='utf-8') as devnull:
+        for item_count in WORLD_SIZES:
+            game = AdventureGame(write_synthetic_world(directory, item_count), 1)
+            game.enable_unlimited_moves()
+
+            def headless(game: AdventureGame = game) -> None:
+                for command in commands:
+                    game.execute(command)
+
+            def printed(game: AdventureGame = game) -> None:
+                with contextlib.redirect_stdout(devnull):
+                    for command in commands:
+                        for message in game.execute(command).messages:
+                            print(message)
+
+            quiet = _time_per_call(headless, repeats)
+            loud = _time_per_call(printed, repeats)
+            print(f"{item_count:>8} {quiet:>11.2f} {loud:>11.2f}")
+
+
+def bench_batch_commands(command_count: int = 20_000, repeats: int = 5) -> None:
+    """Print per-command cost of run_batch against calling execute once per command."""
+    print(f"{'items':>8} {'execute us':>11} {'run_batch us':>13}")
+    script = ["take item 0", "go east", "drop item 0", "score", "go west"] * (command_count // 5)
+    with tempfile.TemporaryDirectory() as directory:
+        for item_count in WORLD_SIZES:
+            game = AdventureGame(write_synthetic_world(directory, item_count), 1)
+
+            def one_by_one(game: AdventureGame = game) -> None:
+                game.reset()
+                game.enable_unlimited_moves()
+                for command in script:
+                    game.execute(command)
+
+            def batched(game: AdventureGame = game) -> None:
+                game.reset()
+                game.enable_unlimited_moves()
+                game.run_batch(script)
+
+            single = _time_per_call(one_by_one, repeats) / len(script)
+            batch = _time_per_call(batched, repeats) / len(script)
+            print(f"{item_count:>8} {single:>11.3f} {batch:>13.3f}")
+
+
+def bench_solver(item_count: int = 6) -> None:
+    """Print solver time for collecting and delivering every item on growing ring worlds."""
+    print(f"{'locations':>10} {'moves':>7} {'states':>9} {'seconds':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for location_count in WORLD_SIZES:
+            world = load_world(write_synthetic_world(directory, item_count, location_count=location_count))
+            start = time.perf_counter()
+            solution = solve(world, 1, max_turns=10 ** 9, min_score=item_count,
+                             required_returns=(), alternative_returns=())
+            seconds = time.perf_counter() - start
+            print(f"{location_count:>10} {solution.moves:>7} {solution.states:>9} {seconds:>8.2f}")
+
+
+def bench_routes(repeats: int = 20_000) -> None:
+    """Print route index build, first-query and cached-query cost for growing gated worlds."""
+    print(f"{'locations':>10} {'build ms':>9} {'first ms':>9} {'query us':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for location_count in WORLD_SIZES:
+            world = load_world(write_synthetic_world(directory, 100, location_count=location_count, gated=True))
+            start = time.perf_counter()
+            routes = RouteIndex(world.locations, world.restrictions)
+            build = (time.perf_counter() - start) * 1000
+            mask = (1 << len(world.items)) - 1
+            target = location_count // 2
+            start = time.perf_counter()
+            routes.distance(1, target, mask, 10)
+            first = (time.perf_counter() - start) * 1000
+            query = _time_per_call(lambda r=routes, t=target, m=mask: r.distance(1, t, m, 10), repeats)
+            print(f"{location_count:>10} {build:>9.2f} {first:>9.2f} {query:>9.3f}")
+
+
+def bench_progress(repeats: int = 20_000) -> None:
+    """Print the cost of refreshing the moves-to-win bound after a move, for growing worlds.
+
+    The first query, which builds the route tables the tracker needs, is not timed.
+    """
+    print(f"{'locations':>10} {'bound us':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for location_count in WORLD_SIZES:
+            world = load_world(write_synthetic_world(directory, 100, location_count=location_count))
+            tracker = ProgressTracker(world, ["item 0", "item 50"], [["item 98", "item 99"]], 5,
+                                      lambda item: item.target_points)
+            tracker.item_moved(world.items[0], None)
+            tracker.moves_needed(1, 0)
+            locations = itertools.cycle(range(1, location_count + 1))
+            step = _time_per_call(lambda t=tracker, l=locations: t.moves_needed(next(l), 0), repeats)
+            print(f"{location_count:>10} {step:>9.2f}")
+
+
+def bench_game_batch(steps: int = 50) -> None:
+    """Print per-game-step cost of GameBatch against stepping AdventureGame objects one by one."""
+    print(f"{'games':>8} {'batch us':>9} {'scalar us':>10}")
+    world = load_world("game_data.json")
+    rng = np.random.default_rng(0)
+    for size in (1_000, 10_000, 100_000):
+        batch = GameBatch(world, size, 2)
+        actions = rng.integers(0, len(batch.actions), size=(steps, size))
+        start = time.perf_counter()
+        for row in actions:
+            batch.step(row)
+        batched = (time.perf_counter() - start) / (steps * size) * 1e6
+
+        game = AdventureGame.from_world(world, 2)
+        commands = [batch.actions[action] for action in actions[:, :200].ravel()]
+        start = time.perf_counter()
+        for command in commands:
+            if not game.ongoing:
+                game.reset()
+            game.step(command)
+        scalar = (time.perf_counter() - start) / len(commands) * 1e6
+        print(f"{size:>8} {batched:>9.3f} {scalar:>10.3f}")
+
+
+def bench_seek(seeks: int = 50) -> None:
+    """Print the latency of AdventureGameSimulation.seek against log length and checkpoint spacing.
+
+    The session takes and drops items in place, so it never runs out of moves. A spacing equal
+    to the log length keeps only the starting checkpoint, so every seek replays from the start.
+    """
+    print(f"{'events':>8} {'spacing':>8} {'seek ms':>8} {'KB':>8}")
+    cycle = ["take tcard", "take cookie", "look", "drop tcard", "drop cookie"]
+    rng = np.random.default_rng(0)
+    for length in (1_000, 10_000, 100_000):
+        script = cycle * (length // len(cycle))
+        turns = rng.integers(0, length + 1, size=seeks)
+        for spacing in sorted({spacing for spacing in (100, 1_000, 10_000) if spacing < length} | {length}):
+            tracemalloc.start()
+            sim = AdventureGameSimulation("game_data.json", 2, script, spacing)
+            used = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            start = time.perf_counter()
+            for turn in turns:
+                sim.seek(int(turn))
+            latency = (time.perf_counter() - start) / seeks * 1e3
+            print(f"{length:>8} {spacing:>8} {latency:>8.3f} {used / 1024:>8.0f}")
+
+
+def bench_event_lists(event_count: int = 100_000) -> None:
+    """Print the memory per event and id-log cost of EventList against CompactEventList."""
+    print(f"{'list':>17} {'bytes/event':>12} {'id log ms':>10}")
+    for name, events in (("EventList", EventList()), ("CompactEventList", CompactEventList())):
+        tracemalloc.start()
+        for index in range(event_count):
+            loc_id = index % 40
+            events.add_event(Event(loc_id, f"Room {loc_id}."), "go east" if index % 2 else "go west")
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        start = time.perf_counter()
+        events.get_id_log()
+        log_ms = (time.perf_counter() - start) * 1e3
+        print(f"{name:>17} {used / event_count:>12.1f} {log_ms:>10.2f}")
+
+
+def bench_ui_frames(frames: int = 120) -> None:
+    """Print the mean time to lay out and draw one frame of the main screen and the end screen,
+    and the steady-state hit rate of the shared text cache.
+
+    Frames are drawn off-screen with SDL's dummy video driver unless another driver is set.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    # Imported here so the engine benchmarks do not need pygame.
+    import pygame
+    from event_logger import EventList
+    from ui import GameUI
+    from ui_endscreen import EndScreenSpec, EndScreenView
+    from ui_primitives import TEXT_CACHE
+
+    pygame.init()
+    screen = pygame.display.set_mode((1280, 720))
+    ui = GameUI(AdventureGame("game_data.json", 2), EventList())
+    fonts = ui._create_fonts()
+    logo_image = ui._load_logo()
+    ui.begin_turn("Start")
+    ui.out(ui.location_description())
+    ui.run_command("look", "Look")
+
+    def main_frame() -> None:
+        ui._draw_frame(ui._prepare_frame(screen, fonts, logo_image, (640, 360)))
+        pygame.display.flip()
+
+    end_screen = EndScreenView(ui.game)
+    end_screen._spec = EndScreenSpec("Time's up", "Better luck next term.", ["You ran out of moves."], (200, 60, 60))
+    end_screen._lines = end_screen._summary_lines(end_screen._spec)
+
+    def end_frame() -> None:
+        end_screen._draw_frame()
+        pygame.display.flip()
+
+    print(f"{'screen':>8} {'frame ms':>9} {'text hit %':>11}")
+    for name, draw in (("main", main_frame), ("end", end_frame)):
+        draw()
+        TEXT_CACHE.hits = TEXT_CACHE.misses = 0
+        frame_ms = _time_per_call(draw, frames) / 1e3
+        print(f"{name:>8} {frame_ms:>9.3f} {TEXT_CACHE.hit_rate() * 100:>11.1f}")
+    pygame.quit()
+
+
+def bench_ui_idle(seconds: float = 3.0) -> None:
+    """Print the CPU time the main UI loop uses while nobody touches it, including startup."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    # Imported here so the engine benchmarks do not need pygame.
+    import pygame
+    from event_logger import EventList
+    from ui import GameUI
+
+    pygame.init()
+    ui = GameUI(AdventureGame("game_data.json", 2), EventList())
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+    wall, cpu = time.perf_counter(), time.process_time()
+    ui.run()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    print(f"{'wall s':>7} {'cpu s':>6} {'cpu %':>6}")
+    print(f"{wall:>7.2f} {cpu:>6.2f} {cpu / wall * 100:>6.1f}")
+
+
+if __name__ == "__main__":
+    bench_item_commands()
+    bench_restriction_checks()
+    bench_world_load()
+    bench_reset()
+    bench_session_memory()
+    bench_headless_commands()
+    bench_batch_commands()
+    bench_solver()
+    bench_routes()
+    bench_progress()
+    bench_game_batch()
+    bench_seek()
+    bench_event_lists()
+    bench_ui_frames()
+    bench_ui_idle()
@@ -21,8 +21,9 @@ please consult our Course Syllabus.
 This file is Copyright (c) 2026 CSC111 Teaching Team
 """
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterator, Optional, Union
 
 
 # Note: We have completed the Event class for you. Do NOT modify it here for A1.
@@ -189,6 +190,146 @@ class EventList:
         return ids_so_far
 
 
+class CompactEventList:
+    """
+    A game event list stored as parallel arrays, for long sessions.
+
+    Each event takes a fixed 12 bytes: its location id, the code of the command that led to it
+    and the code of its description. Commands and descriptions are interned, so each distinct
+    string is stored once however many events refer to it. The EventList methods are all
+    supported, and first, last, indexing and iteration return Event objects built on demand.
+    Those Events are copies: their next and prev are None, and changing them does not change
+    this list.
+
+    >>> events = CompactEventList()
+    >>> events.add_event(Event(1, "blah"))
+    >>> events.add_event(Event(2, "blah"), "added 2")
+    >>> events.append(3, "blah", "added 3")
+    >>> len(events), events.first.next_command, events[-1].id_num, events[1:].get_id_log()
+    (3, 'added 2', 3, [2, 3])
+    >>> events.remove_last_event()
+    >>> [event.id_num for event in events], events.last.next_command
+    ([1, 2], None)
+    """
+    # Private Instance Attributes:
+    #   - _ids: the location id of each event.
+    #   - _arrivals: the code of the command that led to each event, or -1 for none.
+    #   - _descriptions: the code of each event's description.
+    #   - _strings: the interned commands and descriptions, indexed by code. Shared with slices of
+    #               this list, and only ever appended to.
+    #   - _codes: the code of each interned string, shared along with _strings.
+    _ids: array
+    _arrivals: array
+    _descriptions: array
+    _strings: list[str]
+    _codes: dict[str, int]
+
+    def __init__(self) -> None:
+        """Initialize a new empty event list."""
+        self._ids = array('i')
+        self._arrivals = array('i')
+        self._descriptions = array('i')
+        self._strings = []
+        self._codes = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[Event]:
+        for index in range(len(self._ids)):
+            yield self._event(index)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Event, CompactEventList]:
+        """Return the event at index, or the events in a slice as a new CompactEventList.
+
+        Slices must have a step of 1 and share this list's interned strings, which are only ever
+        added to, so a slice costs time and memory in proportion to its length. Raise IndexError if
+        index is out of range.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._ids))
+            if step != 1:
+                raise ValueError("CompactEventList slices must have a step of 1")
+            part = CompactEventList()
+            part._ids = self._ids[start:stop]
+            part._arrivals = self._arrivals[start:stop]
+            part._descriptions = self._descriptions[start:stop]
+            part._strings = self._strings
+            part._codes = self._codes
+            return part
+        if index < 0:
+            index += len(self._ids)
+        if not 0 <= index < len(self._ids):
+            raise IndexError("event index out of range")
+        return self._event(index)
+
+    @property
+    def first(self) -> Optional[Event]:
+        """Return the first event, or None if there are no events."""
+        return self._event(0) if self._ids else None
+
+    @property
+    def last(self) -> Optional[Event]:
+        """Return the last event, or None if there are no events."""
+        return self._event(len(self._ids) - 1) if self._ids else None
+
+    def _event(self, index: int) -> Event:
+        """Return the event at index, a valid non-negative index."""
+        next_command = None
+        if index + 1 < len(self._arrivals) and self._arrivals[index + 1] >= 0:
+            next_command = self._strings[self._arrivals[index + 1]]
+        return Event(self._ids[index], self._strings[self._descriptions[index]], next_command)
+
+    def _intern(self, text: str) -> int:
+        """Return the code of text, interning it first if needed."""
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self._strings)
+            self._strings.append(text)
+        return code
+
+    def display_events(self) -> None:
+        """Display all events in chronological order."""
+        for event in self:
+            print(f"Location: {event.id_num}, Command: {event.next_command}")
+
+    def get_events_str(self) -> str:
+        """Get a string representation of the current event."""
+        return "".join(f"Location: {event.id_num}, Command: {event.next_command} \n" for event in self)
+
+    def is_empty(self) -> bool:
+        """Return whether this event list is empty."""
+        return not self._ids
+
+    def add_event(self, event: Event, command: str = None) -> None:
+        """
+        Add the given new event to the end of this event list.
+        The given command is the command which was used to reach this new event, or None if this is the first
+        event in the game.
+        """
+        self.append(event.id_num, event.description, command)
+
+    def append(self, id_num: int, description: str, command: Optional[str] = None) -> None:
+        """Add an event at location id_num with description, reached by command, without building an Event."""
+        self._arrivals.append(-1 if command is None or not self._ids else self._intern(command))
+        self._ids.append(id_num)
+        self._descriptions.append(self._intern(description))
+
+    def remove_last_event(self) -> None:
+        """
+        Remove the last event from this event list.
+        If the list is empty, do nothing.
+        """
+        if self._ids:
+            self._ids.pop()
+            self._arrivals.pop()
+            self._descriptions.pop()
+
+    def get_id_log(self) -> list[int]:
+        """Return a list of all location IDs visited for each event in this list, in sequence."""
+        return self._ids.tolist()
+
+
 if __name__ == '__main__':
     # pass
     # When you are ready to check your work with python_ta, uncomment the following lines.
@@ -197,6 +338,6 @@ if __name__ == '__main__':
     import python_ta
     python_ta.check_all(config={
         'max-line-length': 120,
-        'allowed-io': ['EventList.display_events'],
+        'allowed-io': ['EventList.display_events', 'CompactEventList.display_events'],
         'disable': ['R1705', 'E9998', 'E9999', 'static_type_checker']
     })
@@ -18,8 +18,12 @@ please consult our Course Syllabus.
 
 This file is Copyright (c) 2026 CSC111 Teaching Team
 """
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from restrictions import Restriction
+    from routes import RouteIndex
 
 
 @dataclass
@@ -32,9 +36,10 @@ class Location:
           ``name``, ``brief_description``, and ``long_description``.
         - available_commands: mapping of valid movement commands at this location
           to destination location ids.
-        - items: names of items currently present at this location.
-        - restrictions: optional restriction payload describing required items
-          to enter this location.
+        - items: names of items present at this location. Locations are shared by every
+          session on a world, so this is a tuple; each session's changes live in its own overlay.
+        - restrictions: optional restriction payload describing what is required
+          to enter this location (see the ``restrictions`` module for the format).
         - rewards: optional reward payload describing item trades or attribute
           rewards available at this location.
         - visited: whether this location has been visited by the player in the
@@ -51,8 +56,8 @@ class Location:
     id_num: int
     description: dict[str, str]
     available_commands: dict[str, int]
-    items: list[str]
-    restrictions: str
+    items: tuple[str, ...]
+    restrictions: Any
     rewards: Any
     visited: bool = False
 
@@ -69,6 +74,7 @@ class Item:
         - start_position: id of the starting location containing this item.
         - target_position: id of the location where this item should be returned.
         - target_points: points awarded for returning this item to target_position.
+        - aliases: alternative names the player may use to refer to this item.
 
     Representation Invariants:
         - self.name != ''
@@ -87,12 +93,66 @@ class Item:
     start_position: int
     target_position: int
     target_points: int
+    aliases: tuple[str, ...] = ()
 
     def __str__(self) -> str:
         """Return a user-friendly item label."""
         return self.name.capitalize() + " - " + self.description
 
 
+@dataclass(frozen=True)
+class RewardEffect:
+    """A ready-to-apply reward triggered by dropping an item at a location.
+
+    Instance Attributes:
+        - reward_id: compact integer id used to record that this reward was claimed.
+        - kind: ``'item'`` for an item trade, or ``'attribute'`` for a named effect.
+        - value: the lower-cased granted item name, or the attribute effect text.
+
+    Representation Invariants:
+        - self.reward_id >= 0
+        - self.kind in {'item', 'attribute'}
+    """
+
+    reward_id: int
+    kind: str
+    value: str
+
+
+@dataclass(frozen=True)
+class GameWorld:
+    """Static world data compiled once from a game data file.
+
+    A world may be shared by several game sessions, so neither it nor any of the
+    objects it holds may be mutated after loading; per-session changes live in each
+    game's own overlay.
+
+    Instance Attributes:
+        - locations: mapping from location id to Location object.
+        - items: all items in the game, in data-file order.
+        - item_index: mapping from lower-cased item names and aliases to Item objects.
+        - rewards: compiled reward effects keyed by (location id, lower-cased trigger item name).
+        - item_bits: mapping from lower-cased item names and aliases to the item's bit index,
+          which is its position in items.
+        - restrictions: compiled entry rules for every location that has one.
+        - routes: shortest-route index over the location graph.
+        - location_ids: mapping from lower-cased location names to location ids.
+
+    Representation Invariants:
+        - all(name == name.lower() for name in self.item_index)
+        - all(item.name.lower() in self.item_index for item in self.items)
+    """
+
+    locations: dict[int, Location]
+    items: list[Item]
+    item_index: dict[str, Item] = field(default_factory=dict)
+    rewards: dict[tuple[int, str], tuple[RewardEffect, ...]] = field(default_factory=dict)
+    item_bits: dict[str, int] = field(default_factory=dict)
+    restrictions: dict[int, 'Restriction'] = field(default_factory=dict)
+    routes: Optional['RouteIndex'] = field(default=None, compare=False)
+    location_ids: dict[str, int] = field(default_factory=dict)
+
+
 if __name__ == "__main__":
     # pass
     # When you are ready to check your work with python_ta, uncomment the following lines.
@@ -0,0 +1,229 @@
+"""Live win-progress tracking for the CSC111 adventure game.
+
+ProgressTracker keeps a lower bound on the moves a player still needs to win:
+return every required item, at least one item of each alternative group, and
+reach the minimum score. Each outstanding objective needs at least a walk to the
+item (unless it is carried) and then on to its target. An item that a location
+reward can hand out may instead be collected at that location. Distances ignore
+entry restrictions, which can only make real routes longer, so the bound never
+overestimates.
+
+The tracker is told when items move, so the item-to-target part of each
+objective is computed only then. A query after an ordinary move is one
+distance lookup per outstanding objective.
+"""
+
+from __future__ import annotations
+
+import copy
+from typing import Callable, Iterable, Optional
+
+from game_entities import GameWorld, Item
+
+
+class ProgressTracker:
+    """A lower bound on the moves still needed to win one game session.
+
+    >>> from world_loader import load_world
+    >>> world = load_world('game_data.json')
+    >>> goals = (["lucky mug", "laptop charger"], [["usb drive", "spare usb cable"]])
+    >>> tracker = ProgressTracker(world, *goals, 60, lambda item: item.target_points)
+    >>> tracker.moves_needed(2, 0)
+    13
+    >>> tracker.item_moved(world.item_index["laptop charger"], None)
+    >>> tracker.moves_needed(21, 0)
+    19
+    """
+    # Private Instance Attributes:
+    #   - _world: the world being played.
+    #   - _goals: groups of items of which at least one must be returned. Required items
+    #             are groups of one, and a group with no items in this world can never be met.
+    #   - _min_score: the score needed to win.
+    #   - _max_points: returns the most points returning an item could ever be worth.
+    #   - _positions: the location of each item that has moved, or None if it is carried.
+    #                 Items not listed are at their start position.
+    #   - _returned: names of the items returned so far.
+    #   - _legs: cached moves from an item's position to its target, or None if unreachable,
+    #            keyed by item name.
+    #   - _scoring: items worth points that are not in any goal group, or None until the
+    #               score objective is first checked.
+    #   - _points_left: the most points still available from unreturned items, or None until
+    #                   the score objective is first checked.
+    #   - _lying_floor: the fewest moves from any unreturned scoring item that is not carried to
+    #                   its target (-1 if none can get there), or None until next needed.
+    #   - _grants: the locations whose rewards can hand out each item, keyed by item name, or
+    #              None until first needed.
+    _world: GameWorld
+    _goals: list[tuple[Item, ...]]
+    _min_score: int
+    _max_points: Callable[[Item], int]
+    _positions: dict[str, Optional[int]]
+    _returned: set[str]
+    _legs: dict[str, Optional[int]]
+    _scoring: Optional[list[Item]]
+    _points_left: Optional[int]
+    _lying_floor: Optional[int]
+    _grants: Optional[dict[str, list[int]]]
+
+    def __init__(
+        self,
+        world: GameWorld,
+        required_returns: Iterable[str],
+        alternative_returns: Iterable[Iterable[str]],
+        min_score: int,
+        max_points: Callable[[Item], int]
+    ) -> None:
+        """Initialize a tracker for a fresh game on world.
+
+        max_points returns the most points returning an item could ever be worth.
+        """
+        self._world = world
+        groups = [[name] for name in required_returns] + [list(group) for group in alternative_returns]
+        self._goals = [tuple(world.item_index[name.lower()] for name in group if name.lower() in world.item_index)
+                       for group in groups]
+        self._min_score = min_score
+        self._max_points = max_points
+        self._positions = {}
+        self._returned = set()
+        self._legs = {}
+        self._scoring = None
+        self._points_left = None
+        self._lying_floor = None
+        self._grants = None
+
+    def copy(self) -> ProgressTracker:
+        """Return a tracker for the same game that changes independently of this one."""
+        other = copy.copy(self)
+        other._positions = dict(self._positions)
+        other._returned = set(self._returned)
+        other._legs = dict(self._legs)
+        return other
+
+    def item_moved(self, item: Item, location_id: Optional[int]) -> None:
+        """Record that item now lies at location_id, or is carried if location_id is None."""
+        self._positions[item.name] = location_id
+        self._legs.pop(item.name, None)
+        self._lying_floor = None
+
+    def item_returned(self, item: Item) -> None:
+        """Record that item has been returned to its target."""
+        if item.name not in self._returned:
+            self._returned.add(item.name)
+            self._lying_floor = None
+            if self._points_left is not None:
+                self._points_left -= self._max_points(item)
+
+    def item_unreturned(self, item: Item) -> None:
+        """Record that item is no longer returned, as when the return is undone."""
+        if item.name in self._returned:
+            self._returned.remove(item.name)
+            self._lying_floor = None
+            if self._points_left is not None:
+                self._points_left += self._max_points(item)
+
+    def position(self, item: Item) -> Optional[int]:
+        """Return the location id where item lies, or None if it is carried."""
+        return self._positions.get(item.name, item.start_position)
+
+    def moves_needed(self, location_id: int, score: int) -> Optional[int]:
+        """Return a lower bound on the moves needed to win from location_id with score.
+
+        Return None if winning is no longer possible at all. Another scoring item is only
+        counted as needed if the goal items could not reach the minimum score even at the
+        most points each could be worth, so the bound never overshoots.
+        """
+        bound = 0
+        goal_points = 0
+        for group in self._goals:
+            if any(item.name in self._returned for item in group):
+                continue
+            costs = [cost for cost in (self._cost(item, location_id) for item in group) if cost is not None]
+            if not costs:
+                return None
+            bound = max(bound, min(costs))
+            goal_points += sum(self._max_points(item) for item in group)
+
+        if score + goal_points < self._min_score:
+            extra = self._extra_item_moves(location_id, score)
+            if extra is None:
+                return None
+            bound = max(bound, extra)
+        return bound
+
+    def _extra_item_moves(self, location_id: int, score: int) -> Optional[int]:
+        """Return a lower bound on the moves to return one more scoring item, or None if the
+        minimum score is out of reach.
+
+        Items lying somewhere count only their own walk to their target, which is cached until
+        an item changes, so this stays cheap however many scoring items there are.
+        """
+        if self._scoring is None or self._points_left is None:
+            goal_items = {item.name for group in self._goals for item in group}
+            self._scoring = [item for item in self._world.items
+                             if item.target_points > 0 and item.name not in goal_items]
+            self._points_left = sum(self._max_points(item) for item in self._world.items
+                                    if item.name not in self._returned)
+        if score + self._points_left < self._min_score:
+            return None
+
+        if self._lying_floor is None:
+            legs = [self._cost(item, None) for item in self._scoring
+                    if item.name not in self._returned and self._positions.get(item.name, 0) is not None]
+            self._lying_floor = min((leg for leg in legs if leg is not None), default=-1)
+        costs = [self._cost(self._world.item_index[name.lower()], location_id)
+                 for name, position in self._positions.items() if position is None and name not in self._returned]
+        costs = [cost for cost in costs if cost is not None]
+        if self._lying_floor >= 0:
+            costs.append(self._lying_floor)
+        return min(costs) if costs else None
+
+    def _cost(self, item: Item, location_id: Optional[int]) -> Optional[int]:
+        """Return the fewest moves to bring item from where it is to its target, or None.
+
+        When location_id is None, only the moves from the item (or from where a reward hands it
+        out) to its target are counted.
+        """
+        routes = self._world.routes
+        position = self._positions.get(item.name, item.start_position)
+        if position is None:
+            return None if location_id is None else routes.open_distance(location_id, item.target_position)
+
+        starts = [position] if position in self._world.locations else []
+        starts.extend(self._grant_locations(item))
+        totals = []
+        for start in starts:
+            if start == position:
+                if item.name not in self._legs:
+                    self._legs[item.name] = routes.open_distance(position, item.target_position)
+                leg = self._legs[item.name]
+            else:
+                leg = routes.open_distance(start, item.target_position)
+            to_start = 0 if location_id is None else routes.open_distance(location_id, start)
+            if leg is not None and to_start is not None:
+                totals.append(to_start + leg)
+        return min(totals) if totals else None
+
+    def _grant_locations(self, item: Item) -> list[int]:
+        """Return the locations whose rewards can hand out item."""
+        if self._grants is None:
+            self._grants = {}
+            for (loc_id, _), effects in self._world.rewards.items():
+                for effect in effects:
+                    granted = self._world.item_index.get(effect.value) if effect.kind == "item" else None
+                    if granted is not None and loc_id not in self._grants.setdefault(granted.name, []):
+                        self._grants[granted.name].append(loc_id)
+        return self._grants.get(item.name, [])
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': [
+            'R1705',
+            'E9998',
+            'E9999',
+            'static_type_checker',
+        ]
+    })
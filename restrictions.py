@@ -0,0 +1,190 @@
+"""Location entry rules for the CSC111 adventure game.
+
+A location's ``restrictions`` payload in ``game_data.json`` is compiled once at
+load time into a small Restriction tree whose item checks are bitmask tests
+over the player's inventory bitset. Supported payloads:
+
+- ``""``, ``{}`` or ``null``: no restriction
+- ``"dorm key"``: the player must carry that item
+- ``["tcard", "dorm key"]``: shorthand for ``{"all": [...]}``
+- ``{"item": "tcard"}``: the player must carry that item
+- ``{"all": [rule, ...]}``: every rule must hold
+- ``{"any": [rule, ...]}``: at least one rule must hold
+- ``{"not": rule}``: the rule must not hold
+- ``{"min_score": 40}``: the score must be at least 40
+- ``{"min_turn": 10}`` / ``{"max_turn": 50}``: the number of moves already made
+  must be at least / at most the given value
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from game_entities import Item
+
+RULE_KEYS = ("item", "all", "any", "not", "min_score", "min_turn", "max_turn")
+
+
+@dataclass(frozen=True)
+class Restriction:
+    """A compiled entry rule.
+
+    Instance Attributes:
+        - op: one of ``'all'``, ``'any'``, ``'not'``, ``'min_score'``, ``'min_turn'`` or ``'max_turn'``.
+        - mask: for ``'all'``/``'any'``, the bitset of items that must all / may any be carried.
+        - threshold: the bound used by score and turn rules.
+        - children: nested rules combined by ``'all'``, ``'any'`` or ``'not'``.
+
+    Representation Invariants:
+        - self.op != 'not' or len(self.children) == 1
+        - self.mask >= 0
+
+    >>> rule = compile_restriction({"any": ["tcard", {"min_score": 30}]}, {"tcard": 0, "dorm key": 1})
+    >>> rule.allows(0b01, 0, 0), rule.allows(0b10, 0, 0), rule.allows(0b10, 30, 0)
+    (True, False, True)
+    """
+
+    op: str
+    mask: int = 0
+    threshold: int = 0
+    children: tuple[Restriction, ...] = ()
+
+    def allows(self, item_mask: int, score: int, turn: int) -> bool:
+        """Return whether a player carrying item_mask with the given score and turn satisfies this rule."""
+        if self.op == "all":
+            return item_mask & self.mask == self.mask and all(
+                child.allows(item_mask, score, turn) for child in self.children
+            )
+        if self.op == "any":
+            return item_mask & self.mask != 0 or any(child.allows(item_mask, score, turn) for child in self.children)
+        if self.op == "not":
+            return not self.children[0].allows(item_mask, score, turn)
+        if self.op == "min_score":
+            return score >= self.threshold
+        if self.op == "min_turn":
+            return turn >= self.threshold
+        return turn <= self.threshold
+
+    def unmet(self, item_mask: int, score: int, turn: int, items: Sequence[Item]) -> list[str]:
+        """Return short descriptions of the parts of this rule the player does not satisfy.
+
+        items is the world item list, indexed by item bit.
+        """
+        if self.allows(item_mask, score, turn):
+            return []
+        if self.op == "all":
+            missing = sorted(items[bit].name for bit in mask_bits(self.mask & ~item_mask))
+            for child in self.children:
+                missing.extend(child.unmet(item_mask, score, turn, items))
+            return missing
+        if self.op == "any":
+            options = sorted(items[bit].name for bit in mask_bits(self.mask))
+            options.extend(" and ".join(child.requirements(items)) for child in self.children)
+            return ["one of " + " or ".join(options)] if len(options) > 1 else options
+        if self.op == "not":
+            return ["to not have " + " and ".join(self.children[0].requirements(items))]
+        return self.requirements(items)
+
+    def requirements(self, items: Sequence[Item]) -> list[str]:
+        """Return short descriptions of everything this rule asks for."""
+        if self.op == "min_score":
+            return [f"a score of at least {self.threshold}"]
+        if self.op == "min_turn":
+            return [f"to wait until move {self.threshold}"]
+        if self.op == "max_turn":
+            return [f"to arrive within {self.threshold} moves"]
+        if self.op == "not":
+            return ["to not have " + " and ".join(self.children[0].requirements(items))]
+        names = sorted(items[bit].name for bit in mask_bits(self.mask))
+        for child in self.children:
+            names.extend(child.requirements(items))
+        if self.op == "any" and len(names) > 1:
+            return ["one of " + " or ".join(names)]
+        return names
+
+
+def mask_bits(mask: int) -> list[int]:
+    """Return the indices of the set bits in mask, lowest first."""
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+
+def compile_restriction(payload: Any, item_bits: dict[str, int]) -> Optional[Restriction]:
+    """Compile a restriction payload into a Restriction, or None if it restricts nothing.
+
+    item_bits maps lower-cased item names and aliases to item bit indices.
+    Raise ValueError if the payload is malformed or names an unknown item.
+
+    >>> bits = {"tcard": 0, "dorm key": 1}
+    >>> compile_restriction("Dorm Key", bits)
+    Restriction(op='all', mask=2, threshold=0, children=())
+    >>> compile_restriction(["tcard", "dorm key"], bits).mask
+    3
+    >>> compile_restriction({}, bits) is None
+    True
+    """
+    if payload in ({}, None, "", []):
+        return None
+    return _compile(payload, item_bits)
+
+
+def _compile(payload: Any, item_bits: dict[str, int]) -> Restriction:
+    """Compile one non-empty restriction expression."""
+    if isinstance(payload, str):
+        return Restriction("all", mask=_item_bit(payload, item_bits))
+    if isinstance(payload, list):
+        return _combine("all", [_compile(part, item_bits) for part in payload])
+    if not isinstance(payload, dict) or len(payload) != 1 or next(iter(payload)) not in RULE_KEYS:
+        raise ValueError(f"Restriction must be an item name, a list, or one of {RULE_KEYS}: {payload!r}")
+
+    key, value = next(iter(payload.items()))
+    if key == "item":
+        return _compile(str(value), item_bits)
+    if key in ("all", "any"):
+        if not isinstance(value, list) or not value:
+            raise ValueError(f"Restriction {key!r} needs a non-empty list: {payload!r}")
+        return _combine(key, [_compile(part, item_bits) for part in value])
+    if key == "not":
+        return Restriction("not", children=(_compile(value, item_bits),))
+    if not isinstance(value, int):
+        raise ValueError(f"Restriction {key!r} needs an integer: {payload!r}")
+    return Restriction(key, threshold=value)
+
+
+def _combine(op: str, parts: list[Restriction]) -> Restriction:
+    """Fold plain item parts of an all/any rule into one bitmask and keep the rest as children."""
+    mask = 0
+    children = []
+    for part in parts:
+        if part.op == "all" and not part.children and (op == "all" or part.mask & (part.mask - 1) == 0):
+            mask |= part.mask
+        else:
+            children.append(part)
+    return Restriction(op, mask=mask, children=tuple(children))
+
+
+def _item_bit(name: str, item_bits: dict[str, int]) -> int:
+    """Return the single-bit mask for the item called name."""
+    key = name.strip().lower()
+    if key not in item_bits:
+        raise ValueError(f"Restriction names unknown item {name!r}.")
+    return 1 << item_bits[key]
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': [
+            'R1705',
+            'E9998',
+            'E9999',
+            'static_type_checker',
+        ]
+    })
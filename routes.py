@@ -0,0 +1,270 @@
+"""Shortest-route index over the location graph of the CSC111 adventure game.
+
+RouteIndex answers "how many moves from A to B" and "which command goes
+towards B" for a given inventory. The graph is stored once per world as
+compressed reverse adjacency arrays over dense location indices. Distances
+and next hops are computed per target, with one reverse breadth-first search,
+the first time a (layer, target) pair is asked for. After that a query is a
+single array lookup.
+
+A layer is the set of restricted locations the player may not enter, stored
+as one flag per entry rule. It depends only on the carried items that some
+entry restriction mentions (such as ``dorm key`` or ``lab access form``), plus
+the score or move count when a restriction tests them, but every player state
+that blocks the same locations shares one layer and its tables. Restrictions
+on the move count are evaluated at the move count given to the query. Layers,
+the layer of each recently queried player state and the per-target tables are
+all kept in least-recently-used caches, so memory stays bounded however many
+scores and move counts are queried.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+from game_entities import Location
+from restrictions import Restriction
+
+DEFAULT_ROUTE_CAPACITY = 1024
+
+
+class RouteIndex:
+    """Restriction-aware distances and next hops between locations.
+
+    >>> from world_loader import load_world
+    >>> world = load_world('game_data.json')
+    >>> dorm_key = 1 << world.item_bits["dorm key"]
+    >>> world.routes.distance(2, 1), world.routes.distance(2, 1, dorm_key)
+    (None, 1)
+    >>> world.routes.path(4, 1, dorm_key)
+    ['go east', 'go east', 'go east']
+    """
+    # Private Instance Attributes:
+    #   - _ids: location ids, indexed by dense location index.
+    #   - _index: a mapping from location id to dense location index.
+    #   - _commands: the movement commands of each location, in data-file order.
+    #   - _destinations: the destination index of each command in _commands.
+    #   - _offsets, _sources, _source_commands: reverse adjacency in compressed rows. The
+    #     edges into location v are at positions _offsets[v] to _offsets[v + 1] - 1, giving
+    #     the source location and the index of the command in that source's _commands.
+    #   - _rules: entry rules keyed by dense location index.
+    #   - _key_mask: every item bit that some entry rule mentions.
+    #   - _uses_score, _uses_turn: whether some entry rule tests the score or the move count.
+    #   - _states: least-recently-used layers keyed by (key items carried, score, move count), where
+    #              the score and move count are 0 unless some rule tests them.
+    #   - _layers: least-recently-used blocked-location flags keyed by layer, where a layer holds one
+    #              flag per rule in _rules, set if that rule blocks its location, and the layer None
+    #              ignores restrictions.
+    #   - _routes: least-recently-used (distance, next command) arrays keyed by (layer, target).
+    #   - _capacity: the most entries kept in each of _states, _layers and _routes.
+    _ids: list[int]
+    _index: dict[int, int]
+    _commands: list[list[str]]
+    _destinations: list[list[int]]
+    _offsets: array
+    _sources: array
+    _source_commands: array
+    _rules: dict[int, Restriction]
+    _key_mask: int
+    _uses_score: bool
+    _uses_turn: bool
+    _states: OrderedDict[tuple[int, int, int], bytes]
+    _layers: OrderedDict[Optional[bytes], bytearray]
+    _routes: OrderedDict[tuple[Optional[bytes], int], tuple[array, array]]
+    _capacity: int
+
+    def __init__(
+        self,
+        locations: dict[int, Location],
+        restrictions: dict[int, Restriction],
+        capacity: int = DEFAULT_ROUTE_CAPACITY
+    ) -> None:
+        self._ids = list(locations)
+        self._index = {loc_id: index for index, loc_id in enumerate(self._ids)}
+        self._commands = []
+        self._destinations = []
+        counts = [0] * (len(self._ids) + 1)
+        for location in locations.values():
+            commands = [command for command, dest in location.available_commands.items() if dest in self._index]
+            destinations = [self._index[location.available_commands[command]] for command in commands]
+            self._commands.append(commands)
+            self._destinations.append(destinations)
+            for dest in destinations:
+                counts[dest + 1] += 1
+
+        for index in range(len(self._ids)):
+            counts[index + 1] += counts[index]
+        self._offsets = array('i', counts)
+        self._sources = array('i', bytes(4 * counts[-1]))
+        self._source_commands = array('i', bytes(4 * counts[-1]))
+        fill = counts[:-1]
+        for source, destinations in enumerate(self._destinations):
+            for command_index, dest in enumerate(destinations):
+                self._sources[fill[dest]] = source
+                self._source_commands[fill[dest]] = command_index
+                fill[dest] += 1
+
+        self._rules = {self._index[loc_id]: rule for loc_id, rule in restrictions.items() if loc_id in self._index}
+        self._key_mask = 0
+        ops = set()
+        pending = list(self._rules.values())
+        while pending:
+            rule = pending.pop()
+            self._key_mask |= rule.mask
+            ops.add(rule.op)
+            pending.extend(rule.children)
+        self._uses_score = "min_score" in ops
+        self._uses_turn = "min_turn" in ops or "max_turn" in ops
+        self._states = OrderedDict()
+        self._layers = OrderedDict()
+        self._routes = OrderedDict()
+        self._capacity = capacity
+
+    def distance(self, source_id: int, target_id: int, item_mask: int = 0, score: int = 0,
+                 turn: int = 0) -> Optional[int]:
+        """Return the fewest moves from source_id to target_id, or None if target_id cannot be reached.
+
+        item_mask is the bitset of carried items, using the world's item bits.
+        """
+        distances, _ = self._table(target_id, self._layer(item_mask, score, turn))
+        moves = distances[self._index[source_id]]
+        return None if moves < 0 else moves
+
+    def open_distance(self, source_id: int, target_id: int) -> Optional[int]:
+        """Return the fewest moves from source_id to target_id ignoring entry restrictions, or None."""
+        distances, _ = self._table(target_id, None)
+        moves = distances[self._index[source_id]]
+        return None if moves < 0 else moves
+
+    def next_command(self, source_id: int, target_id: int, item_mask: int = 0, score: int = 0,
+                     turn: int = 0) -> Optional[str]:
+        """Return the command that starts a shortest route from source_id to target_id.
+
+        Return None if the two are the same or target_id cannot be reached.
+        """
+        _, hops = self._table(target_id, self._layer(item_mask, score, turn))
+        source = self._index[source_id]
+        return None if hops[source] < 0 else self._commands[source][hops[source]]
+
+    def path(self, source_id: int, target_id: int, item_mask: int = 0, score: int = 0, turn: int = 0) -> list[str]:
+        """Return the commands of a shortest route from source_id to target_id.
+
+        Return an empty list if the two are the same or target_id cannot be reached.
+        """
+        _, hops = self._table(target_id, self._layer(item_mask, score, turn))
+        return self._follow(source_id, hops)
+
+    def open_path(self, source_id: int, target_id: int) -> list[str]:
+        """Return the commands of a shortest route from source_id to target_id ignoring entry restrictions.
+
+        Return an empty list if the two are the same or target_id cannot be reached.
+
+        >>> from world_loader import load_world
+        >>> routes = load_world('game_data.json').routes
+        >>> routes.path(2, 1), routes.open_path(2, 1)
+        ([], ['go east'])
+        """
+        _, hops = self._table(target_id, None)
+        return self._follow(source_id, hops)
+
+    def _follow(self, source_id: int, hops: array) -> list[str]:
+        """Return the commands that follow the next-command array hops from source_id to its target."""
+        commands = []
+        current = self._index[source_id]
+        while hops[current] >= 0:
+            commands.append(self._commands[current][hops[current]])
+            current = self._destinations[current][hops[current]]
+        return commands
+
+    def _layer(self, item_mask: int, score: int, turn: int) -> bytes:
+        """Return the layer of a player with the given items, score and move count.
+
+        Every score or move count that blocks the same locations gives the same layer.
+
+        >>> from world_loader import load_world
+        >>> world = load_world('game_data.json')
+        >>> routes = RouteIndex(world.locations, {1: Restriction("min_score", 0, 50, ())})
+        >>> [routes.distance(2, 1, 0, score) for score in (10, 49, 50, 99)]
+        [None, None, 1, 1]
+        >>> routes._layer(0, 10, 0) == routes._layer(0, 49, 0) != routes._layer(0, 50, 0)
+        True
+        """
+        state = (item_mask & self._key_mask, score if self._uses_score else 0, turn if self._uses_turn else 0)
+        layer = self._states.get(state)
+        if layer is None:
+            layer = bytes(not rule.allows(*state) for rule in self._rules.values())
+            _remember(self._states, state, layer, self._capacity)
+        else:
+            self._states.move_to_end(state)
+        return layer
+
+    def _table(self, target_id: int, layer: Optional[bytes]) -> tuple[array, array]:
+        """Return the distance and next-command arrays towards target_id in layer.
+
+        The layer None ignores every entry restriction.
+        """
+        key = (layer, self._index[target_id])
+        table = self._routes.get(key)
+        if table is not None:
+            self._routes.move_to_end(key)
+            return table
+
+        blocked = self._layers.get(layer)
+        if blocked is None:
+            blocked = bytearray(len(self._ids))
+            if layer is not None:
+                for index, flag in zip(self._rules, layer):
+                    blocked[index] = flag
+            _remember(self._layers, layer, blocked, self._capacity)
+        else:
+            self._layers.move_to_end(layer)
+
+        table = self._search(key[1], blocked)
+        _remember(self._routes, key, table, self._capacity)
+        return table
+
+    def _search(self, target: int, blocked: bytearray) -> tuple[array, array]:
+        """Return the distance and next-command arrays of a reverse breadth-first search from target."""
+        distances = array('i', [-1]) * len(self._ids)
+        hops = array('i', [-1]) * len(self._ids)
+        offsets, sources, source_commands = self._offsets, self._sources, self._source_commands
+        distances[target] = 0
+        frontier = [target]
+        moves = 0
+        while frontier:
+            moves += 1
+            next_frontier = []
+            for dest in frontier:
+                if blocked[dest]:
+                    continue
+                for edge in range(offsets[dest], offsets[dest + 1]):
+                    source = sources[edge]
+                    if distances[source] < 0:
+                        distances[source] = moves
+                        hops[source] = source_commands[edge]
+                        next_frontier.append(source)
+            frontier = next_frontier
+        return distances, hops
+
+
+def _remember(cache: OrderedDict, key: object, value: object, capacity: int) -> None:
+    """Store value under key in a least-recently-used cache, evicting the oldest entry past capacity."""
+    cache[key] = value
+    if len(cache) > capacity:
+        cache.popitem(last=False)
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': [
+            'R1705',
+            'E9998',
+            'E9999',
+            'static_type_checker',
+        ]
+    })
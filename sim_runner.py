@@ -0,0 +1,222 @@
+"""Parallel walkthrough runner for the CSC111 adventure game.
+
+A walkthrough file is a JSON object such as::
+
+    {"start": 2, "commands": ["go west", "take dorm key"], "expected_log": [2, 3, 3]}
+
+``start`` defaults to the game's start location and ``expected_log`` is the id log
+AdventureGameSimulation.get_id_log should produce. Run every walkthrough under one
+or more files or directories with::
+
+    python3 sim_runner.py walkthroughs/ --workers 8 --report report.json
+
+Walkthroughs are split into chunks and spread over a process pool. Each worker
+loads the world once and reuses it for every walkthrough it runs. Results are
+printed as chunks finish. A JSON report lists every failure with a diff of its
+id log.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterable, Optional
+
+from adventure import DEFAULT_START_LOCATION
+from simulation import AdventureGameSimulation
+from world_loader import load_world
+
+DIFF_CONTEXT = 3
+
+# The game data file used by this worker process, set by _init_worker.
+_worker_data_file = "game_data.json"
+
+
+@dataclass
+class WalkthroughResult:
+    """The outcome of replaying one walkthrough file.
+
+    Instance Attributes:
+        - path: the walkthrough file.
+        - passed: whether the id log matched the expected log.
+        - error: why the walkthrough could not be run, if it could not.
+        - first_mismatch: the index of the first differing id log entry, if any.
+        - expected: the expected id log entries around first_mismatch.
+        - actual: the produced id log entries around first_mismatch.
+    """
+    path: str
+    passed: bool
+    error: Optional[str] = None
+    first_mismatch: Optional[int] = None
+    expected: list[int] = field(default_factory=list)
+    actual: list[int] = field(default_factory=list)
+
+
+def find_walkthroughs(paths: Iterable[str]) -> list[str]:
+    """Return the walkthrough files named by paths, expanding directories to their .json files."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                found.extend(os.path.join(root, name) for name in files if name.endswith(".json"))
+        else:
+            found.append(path)
+    return sorted(found)
+
+
+def id_log_diff(expected: list[int], actual: list[int]) -> Optional[tuple[int, list[int], list[int]]]:
+    """Return (index, expected window, actual window) around the first difference, or None if equal.
+
+    >>> id_log_diff([2, 3, 4], [2, 3, 4]) is None
+    True
+    >>> id_log_diff([2, 3, 4, 5], [2, 3, 3])
+    (2, [2, 3, 4, 5], [2, 3, 3])
+    """
+    if expected == actual:
+        return None
+    index = next((i for i, (a, b) in enumerate(zip(expected, actual)) if a != b), min(len(expected), len(actual)))
+    low = max(0, index - DIFF_CONTEXT)
+    high = index + DIFF_CONTEXT + 1
+    return index, expected[low:high], actual[low:high]
+
+
+def parse_walkthrough(spec: Any) -> tuple[int, list[str], list[int]]:
+    """Return the start location, commands and expected id log of a parsed walkthrough file.
+
+    Raise ValueError if spec does not have the shape of a walkthrough.
+
+    >>> parse_walkthrough({"commands": ["go west"], "expected_log": [2, 3]})
+    (2, ['go west'], [2, 3])
+    >>> parse_walkthrough([1, 2])
+    Traceback (most recent call last):
+    ...
+    ValueError: a walkthrough must be a JSON object, not list
+    """
+    if not isinstance(spec, dict):
+        raise ValueError(f"a walkthrough must be a JSON object, not {type(spec).__name__}")
+    start = spec.get("start", DEFAULT_START_LOCATION)
+    commands = spec.get("commands")
+    expected = spec.get("expected_log")
+    if not isinstance(start, int) or isinstance(start, bool):
+        raise ValueError("'start' must be a location id")
+    if not isinstance(commands, list) or not commands or not all(isinstance(command, str) for command in commands):
+        raise ValueError("'commands' must be a non-empty list of strings")
+    if not isinstance(expected, list) or not all(isinstance(loc_id, int) and not isinstance(loc_id, bool)
+                                                 for loc_id in expected):
+        raise ValueError("'expected_log' must be a list of location ids")
+    return start, commands, expected
+
+
+def run_walkthrough(path: str, data_file: str) -> WalkthroughResult:
+    """Replay the walkthrough in path against data_file and compare its id log.
+
+    A file that cannot be read, parsed or replayed gives a failed result with its error.
+    """
+    try:
+        with open(path, encoding='utf-8') as file:
+            start, commands, expected = parse_walkthrough(json.load(file))
+        simulation = AdventureGameSimulation(data_file, start, commands)
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        return WalkthroughResult(path, False, error=f"{type(error).__name__}: {error}")
+
+    diff = id_log_diff(expected, simulation.get_id_log())
+    if diff is None:
+        return WalkthroughResult(path, True)
+    index, expected_window, actual_window = diff
+    return WalkthroughResult(path, False, first_mismatch=index, expected=expected_window, actual=actual_window)
+
+
+def _init_worker(data_file: str) -> None:
+    """Load the world once in a new worker process."""
+    global _worker_data_file
+    _worker_data_file = data_file
+    load_world(data_file)
+
+
+def _run_chunk(paths: list[str]) -> list[WalkthroughResult]:
+    """Replay a chunk of walkthroughs in a worker process."""
+    return [run_walkthrough(path, _worker_data_file) for path in paths]
+
+
+def _chunks(paths: list[str], workers: int) -> list[list[str]]:
+    """Split paths into about four chunks per worker, so fast workers can pick up more."""
+    size = max(1, len(paths) // (workers * 4))
+    return [paths[start:start + size] for start in range(0, len(paths), size)]
+
+
+def run_walkthroughs(
+    paths: list[str],
+    data_file: str = "game_data.json",
+    workers: Optional[int] = None,
+    verbose: bool = False
+) -> list[WalkthroughResult]:
+    """Replay every walkthrough in paths over a process pool and return the results in path order.
+
+    Failures are printed as soon as their chunk finishes, and so is every result when
+    verbose is True.
+    """
+    workers = workers or os.cpu_count() or 1
+    results = []
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(data_file,)) as executor:
+        futures = [executor.submit(_run_chunk, chunk) for chunk in _chunks(paths, workers)]
+        for future in as_completed(futures):
+            for result in future.result():
+                if verbose or not result.passed:
+                    print(f"{'PASS' if result.passed else 'FAIL'} {result.path}", flush=True)
+                results.append(result)
+    results.sort(key=lambda result: result.path)
+    return results
+
+
+def build_report(results: list[WalkthroughResult], seconds: float) -> dict[str, Any]:
+    """Return the aggregate report for results."""
+    failures = [asdict(result) for result in results if not result.passed]
+    return {
+        "total": len(results),
+        "passed": len(results) - len(failures),
+        "failed": len(failures),
+        "seconds": round(seconds, 3),
+        "failures": failures,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the command-line interface and return the process exit status."""
+    parser = argparse.ArgumentParser(description="Replay walkthrough files in parallel and check their id logs.")
+    parser.add_argument("paths", nargs="+", help="walkthrough JSON files or directories containing them")
+    parser.add_argument("--data", default="game_data.json", help="game data JSON file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--report", default=None, help="write the JSON report to this file")
+    parser.add_argument("--verbose", action="store_true", help="print passing walkthroughs too")
+    args = parser.parse_args(argv)
+
+    paths = find_walkthroughs(args.paths)
+    start = time.perf_counter()
+    results = run_walkthroughs(paths, args.data, args.workers, args.verbose)
+    report = build_report(results, time.perf_counter() - start)
+
+    if args.report is not None:
+        with open(args.report, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    print(f"{report['passed']}/{report['total']} walkthroughs passed in {report['seconds']:.2f}s")
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    # import python_ta
+    #
+    # python_ta.check_all(config={
+    #     'max-line-length': 120,
+    #     'disable': [
+    #         'R1705',
+    #         'E9998',
+    #         'E9999',
+    #         'static_type_checker',
+    #     ]
+    # })
+    sys.exit(main())
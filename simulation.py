@@ -22,10 +22,13 @@ please consult our Course Syllabus.
 This file is Copyright (c) 2026 CSC111 Teaching Team
 """
 from __future__ import annotations
-from event_logger import Event, EventList
-from adventure import AdventureGame
+from bisect import bisect_right
+from event_logger import CompactEventList
+from adventure import REWIND_PREFIX, AdventureGame, GameCheckpoint
 from game_entities import Location
 
+DEFAULT_CHECKPOINT_EVERY = 1_000
+
 
 class AdventureGameSimulation:
     """A simulation of an adventure game playthrough.
@@ -33,21 +36,46 @@ class AdventureGameSimulation:
     # Private Instance Attributes:
     #   - _game: The AdventureGame instance that this simulation uses.
     #   - _events: A collection of the events to process during the simulation.
+    #   - _commands: every command simulated so far, in order.
+    #   - _checkpoint_every: the most commands run between two checkpoints.
+    #   - _checkpoint_turns: the number of commands run before each checkpoint was taken, ascending.
+    #   - _checkpoints: the game state saved after the matching number of commands in _checkpoint_turns.
+    #   - _position: the number of commands whose effects _game currently reflects.
+    #   - _record_undo: whether commands are journaled so they can be undone, which is only done once
+    #                   some simulated command is an undo or rewind, since the journal costs memory per command.
     _game: AdventureGame
-    _events: EventList
-
-    def __init__(self, game_data_file: str, initial_location_id: int, commands: list[str]) -> None:
+    _events: CompactEventList
+    _commands: list[str]
+    _checkpoint_every: int
+    _checkpoint_turns: list[int]
+    _checkpoints: list[GameCheckpoint]
+    _position: int
+    _record_undo: bool
+
+    def __init__(self, game_data_file: str, initial_location_id: int, commands: list[str],
+                 checkpoint_every: int = DEFAULT_CHECKPOINT_EVERY) -> None:
         """
         Initialize a new game simulation based on the given game data, that runs through the given commands.
 
+        The game state is saved every checkpoint_every commands so seek never replays more than that
+        many. Smaller spacings make seeking faster and use more memory.
+
         Preconditions:
         - len(commands) > 0
         - all commands in the given list are valid commands when starting from the location at initial_location_id
+        - checkpoint_every > 0
         """
-        self._events = EventList()
+        self._events = CompactEventList()
         self._game = AdventureGame(game_data_file, initial_location_id)
+        self._commands = []
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_turns = []
+        self._checkpoints = []
+        self._position = 0
+        self._record_undo = False
+        self._save_checkpoint()
         initial_location = self._game.get_location()
-        self._events.add_event(Event(initial_location.id_num, initial_location.description['brief_description']))
+        self._events.append(initial_location.id_num, initial_location.description['brief_description'])
         self.generate_events(commands, self._game.get_location())
 
     def generate_events(self, commands: list[str], current_location: Location) -> None:
@@ -60,40 +88,65 @@ class AdventureGameSimulation:
           OR are non-movement commands (e.g., "inventory", "score"), which keep the player
           in the same location for simulation logging purposes.
         """
-        curr_location = current_location
-
-        for command in commands:
-            normalized = command.strip().lower()
-            next_location = curr_location
-
-            if normalized in curr_location.available_commands:
-                next_location_id = curr_location.available_commands[normalized]
-                can_enter, _ = self._game.can_enter_location(next_location_id)
-                if can_enter:
-                    self._game.current_location_id = next_location_id
-                    next_location = self._game.get_location(next_location_id)
-            else:
-                self._process_non_movement_command(normalized)
-                next_location = self._game.get_location()
-
-            new_event = Event(next_location.id_num, next_location.description['brief_description'])
-            self._events.add_event(new_event)
-            curr_location = next_location
-
-        self._game.current_location_id = curr_location.id_num
-
-    def _process_non_movement_command(self, command: str) -> None:
-        """Apply non-movement commands to simulation game state."""
-        parts = command.split(maxsplit=1)
-        if len(parts) != 2:
-            return
-
-        verb, item_name = parts
-        if verb == "take":
-            self._game.pick_up(item_name)
-        elif verb == "drop" and self._game.drop(item_name):
-            self._game.check_quest(item_name)
-            self._game.apply_location_rewards(item_name)
+        if not self._record_undo and any(_takes_back(command) for command in commands):
+            self._start_recording_undo()
+        self.seek(len(self._commands))
+        self._game.current_location_id = current_location.id_num
+        self._commands.extend(commands)
+        for start in range(self._position, len(self._commands), self._checkpoint_every):
+            self._save_checkpoint()
+            chunk = self._commands[start:start + self._checkpoint_every]
+            for command, loc_id in zip(chunk, self._game.run_batch(chunk, self._record_undo).location_ids):
+                self._events.append(loc_id, self._game.get_location(loc_id).description['brief_description'], command)
+            self._position += len(chunk)
+
+    def _start_recording_undo(self) -> None:
+        """Journal every command from now on, replaying those simulated so far so they can be undone too.
+
+        Only the checkpoints are rebuilt; the events these commands logged stay the same.
+        """
+        self._record_undo = True
+        del self._checkpoint_turns[1:], self._checkpoints[1:]
+        self._game.restore(self._checkpoints[0])
+        self._position = 0
+        for start in range(0, len(self._commands), self._checkpoint_every):
+            self._save_checkpoint()
+            chunk = self._commands[start:start + self._checkpoint_every]
+            self._game.run_batch(chunk, record_undo=True)
+            self._position += len(chunk)
+
+    def _save_checkpoint(self) -> None:
+        """Save the game's current state as the checkpoint for its position, replacing any saved there."""
+        if self._checkpoint_turns and self._checkpoint_turns[-1] == self._position:
+            self._checkpoints[-1] = self._game.checkpoint()
+        else:
+            self._checkpoint_turns.append(self._position)
+            self._checkpoints.append(self._game.checkpoint())
+
+    def seek(self, turn: int) -> AdventureGame:
+        """
+        Put the simulated game in its state after the first turn commands and return it.
+
+        The nearest checkpoint at or before turn is restored and only the commands after it are
+        replayed, unless the game is already between that checkpoint and turn, in which case it just
+        runs forward. The returned game is the simulation's own; commands run on it directly are not
+        recorded, and are overwritten by the next seek.
+
+        Preconditions:
+        - 0 <= turn <= the number of commands simulated so far
+
+        >>> sim = AdventureGameSimulation('game_data.json', 2, ["take tcard", "go west", "go west"], 2)
+        >>> sim.seek(1).current_location_id, sim.seek(3).current_location_id, sim.seek(0).inventory
+        (2, 4, Inventory([]))
+        """
+        index = bisect_right(self._checkpoint_turns, turn) - 1
+        start = self._checkpoint_turns[index]
+        if not start <= self._position <= turn:
+            self._game.restore(self._checkpoints[index])
+            self._position = start
+        self._game.run_batch(self._commands[self._position:turn], self._record_undo)
+        self._position = turn
+        return self._game
 
     def get_id_log(self) -> list[int]:
         """
@@ -116,15 +169,17 @@ class AdventureGameSimulation:
         Run the game simulation and print location descriptions.
         """
 
-        current_event = self._events.first  # Start from the first event in the list
-
-        while current_event:
+        last_index = len(self._events) - 1
+        for index, current_event in enumerate(self._events):
             print(current_event.description)
-            if current_event is not self._events.last:
+            if index != last_index:
                 print("You choose:", current_event.next_command)
 
-            # Move to the next event in the linked list
-            current_event = current_event.next
+
+def _takes_back(command: str) -> bool:
+    """Return whether command is an undo or rewind command."""
+    choice = command.strip().lower()
+    return choice == "undo" or choice.startswith(REWIND_PREFIX)
 
 
 if __name__ == "__main__":
@@ -189,3 +244,8 @@ if __name__ == "__main__":
     expected_log = [2, 2, 3, 3, 4, 4, 3, 2, 1, 9, 10, 11, 13, 14, 32, 32]
     sim = AdventureGameSimulation('game_data.json', 2, enhancement1_demo)
     assert expected_log == sim.get_id_log()
+
+    # The vectorized engine must agree with AdventureGame on every walkthrough above.
+    from batch_engine import matches_scalar
+    assert matches_scalar('game_data.json', 2, [win_walkthrough, lose_demo, inventory_demo, scores_demo,
+                                                enhancement1_demo])
@@ -0,0 +1,388 @@
+"""Optimal walkthrough search for the CSC111 adventure game.
+
+solve searches the game's state space for a winning command list that uses as
+few moves as possible. Taking and dropping items is free, and every move costs
+one turn, so the search is a 0-1 breadth-first search. Each state is packed into
+a single int (location, carried items, picked-up items, returned items, claimed
+rewards and score), and a transposition table keeps the fewest moves that reached it.
+
+Only items that can change the outcome are tracked. These are the items needed
+by entry restrictions, reward triggers that do something useful, the items the
+player must return, and scoring items, but only when their points are needed to
+reach the minimum score. The search also makes some simplifying choices:
+
+- items used only for points are picked up as soon as they are reached and
+  dropped as soon as their target is reached;
+- other items are only dropped at their target or where they trigger a reward;
+- an item is never picked up again after it has been dropped.
+
+Run ``python3 solver.py [game_data.json] [start location]`` to print the
+optimal walkthrough for a data file.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from adventure import (DEFAULT_MAX_TURNS, DEFAULT_MIN_SCORE, DEFAULT_START_LOCATION, EXTENSION_BONUS_TURNS,
+                       REQUIRED_RETURN_ITEMS, USB_EQUIVALENT_ITEMS, quest_points)
+from game_entities import GameWorld, Item, RewardEffect
+from restrictions import Restriction, mask_bits
+from world_loader import load_world
+
+EXTENSION_EFFECT = "extra time granted"
+
+
+@dataclass
+class Solution:
+    """A winning walkthrough found by solve.
+
+    Instance Attributes:
+        - commands: the commands to enter, ending with 'submit early'.
+        - moves: the number of moves the commands use.
+        - states: the number of distinct search states reached.
+    """
+    commands: list[str]
+    moves: int
+    states: int
+
+
+def solve(
+    world: GameWorld,
+    start_location_id: int = DEFAULT_START_LOCATION,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    min_score: int = DEFAULT_MIN_SCORE,
+    required_returns: Iterable[str] = REQUIRED_RETURN_ITEMS,
+    alternative_returns: Iterable[Iterable[str]] = (USB_EQUIVALENT_ITEMS,),
+    extension_bonus_turns: int = EXTENSION_BONUS_TURNS
+) -> Optional[Solution]:
+    """Return a winning walkthrough with the fewest moves, or None if the game cannot be won.
+
+    The player wins by submitting early while fewer than max_turns moves have been made,
+    with every item in required_returns returned, at least one item of each group in
+    alternative_returns returned, and a score of at least min_score.
+
+    >>> solution = solve(load_world('game_data.json'))
+    >>> solution.moves, solution.commands[-1]
+    (53, 'submit early')
+    """
+    search = _Search(world, max_turns, min_score, required_returns, alternative_returns, extension_bonus_turns)
+    return search.run(start_location_id)
+
+
+class _Search:
+    """Precomputed tables and the search loop for one call to solve."""
+    # Private Instance Attributes:
+    #   - _items: the tracked items, indexed by local item bit.
+    #   - _loc_ids: location ids, indexed by dense location index.
+    #   - _moves: (command, destination index) pairs for each location index.
+    #   - _rules: entry rules over local item bits, keyed by location index.
+    #   - _items_at: the tracked items each location starts with, as local bitsets.
+    #   - _auto_take: the items that are picked up as soon as they are reached.
+    #   - _auto_drop_at: the items dropped as soon as the player reaches each location.
+    #   - _drops_at: the items worth dropping at each location.
+    #   - _rewards: (claim bit, granted local bit or -1) effects keyed by (location, local bit).
+    #   - _extension_mask: the claim bits of deadline extensions.
+    _world: GameWorld
+    _max_turns: int
+    _extension_bonus_turns: int
+    _min_score: int
+    _required_mask: int
+    _alternative_masks: list[int]
+    _items: list[Item]
+    _loc_ids: list[int]
+    _moves: list[list[tuple[str, int]]]
+    _rules: dict[int, Restriction]
+    _items_at: list[int]
+    _auto_take: int
+    _auto_drop_at: list[int]
+    _drops_at: list[int]
+    _rewards: dict[tuple[int, int], list[tuple[int, int]]]
+    _extension_mask: int
+
+    def __init__(
+        self,
+        world: GameWorld,
+        max_turns: int,
+        min_score: int,
+        required_returns: Iterable[str],
+        alternative_returns: Iterable[Iterable[str]],
+        extension_bonus_turns: int
+    ) -> None:
+        self._world = world
+        self._max_turns = max_turns
+        self._extension_bonus_turns = extension_bonus_turns
+        self._min_score = min_score
+        self._loc_ids = list(world.locations)
+        loc_index = {loc_id: index for index, loc_id in enumerate(self._loc_ids)}
+        self._moves = [
+            [(command, loc_index[dest]) for command, dest in location.available_commands.items() if dest in loc_index]
+            for location in world.locations.values()
+        ]
+
+        required = {world.item_bits[name.lower()] for name in required_returns}
+        alternatives = [{world.item_bits[name.lower()] for name in group} for group in alternative_returns]
+        keys: set[int] = set()
+        avoided: set[int] = set()
+        score_rules = [False]
+        for rule in world.restrictions.values():
+            _collect_rule_items(rule, False, keys, avoided, score_rules)
+
+        triggers = _reward_triggers(world, loc_index)
+        relevant = keys | avoided | required | set().union(*alternatives)
+        guaranteed = sum(world.items[bit].target_points for bit in required)
+        guaranteed += sum(min(world.items[bit].target_points for bit in group) for group in alternatives)
+        if score_rules[0] or guaranteed < min_score:
+            relevant |= {bit for bit, item in enumerate(world.items) if item.target_points > 0}
+        _add_useful_triggers(world, triggers, relevant)
+
+        world_bits = sorted(relevant)
+        local = {bit: index for index, bit in enumerate(world_bits)}
+        self._items = [world.items[bit] for bit in world_bits]
+        self._required_mask = _local_mask(required, local)
+        self._alternative_masks = [_local_mask(group, local) for group in alternatives]
+        self._rules = {loc_index[loc_id]: _localize(rule, local)
+                       for loc_id, rule in world.restrictions.items() if loc_id in loc_index}
+
+        location_count = len(self._loc_ids)
+        self._items_at = [0] * location_count
+        for loc_id, location in world.locations.items():
+            for name in location.items:
+                bit = world.item_bits.get(name.lower())
+                if bit in local:
+                    self._items_at[loc_index[loc_id]] |= 1 << local[bit]
+
+        self._rewards = {}
+        self._extension_mask = 0
+        claim_bits: dict[int, int] = {}
+        for (loc, bit), effects in triggers.items():
+            if bit not in local:
+                continue
+            for effect in effects:
+                granted = world.item_bits.get(effect.value) if effect.kind == "item" else None
+                is_extension = effect.kind == "attribute" and effect.value == EXTENSION_EFFECT
+                if granted not in local and not is_extension:
+                    continue
+                claim = 1 << claim_bits.setdefault(effect.reward_id, len(claim_bits))
+                if is_extension:
+                    self._extension_mask |= claim
+                granted_index = local[granted] if granted in local else -1
+                self._rewards.setdefault((loc, local[bit]), []).append((claim, granted_index))
+
+        special = keys | avoided | {world_bits[index] for _, index in self._rewards}
+        self._auto_take = (1 << len(world_bits)) - 1 - _local_mask(avoided, local)
+        self._auto_drop_at = [0] * location_count
+        self._drops_at = [0] * location_count
+        for index, item in enumerate(self._items):
+            target = loc_index.get(item.target_position)
+            if target is None:
+                continue
+            if world_bits[index] in special:
+                self._drops_at[target] |= 1 << index
+            else:
+                self._auto_drop_at[target] |= 1 << index
+        for loc, index in self._rewards:
+            self._drops_at[loc] |= 1 << index
+
+        self._loc_bits = max(1, location_count - 1).bit_length()
+        self._item_count = len(world_bits)
+        self._claim_count = len(claim_bits)
+
+    def _pack(self, loc: int, inventory: int, taken: int, returned: int, claimed: int, score: int) -> int:
+        """Return the state fields packed into one int."""
+        n = self._item_count
+        state = (score << self._claim_count | claimed) << n
+        state = ((state | returned) << n | taken) << n
+        return (state | inventory) << self._loc_bits | loc
+
+    def _unpack(self, state: int) -> tuple[int, int, int, int, int, int]:
+        """Return the fields of a packed state."""
+        n = self._item_count
+        item_mask = (1 << n) - 1
+        loc = state & ((1 << self._loc_bits) - 1)
+        state >>= self._loc_bits
+        inventory = state & item_mask
+        taken = (state >> n) & item_mask
+        returned = (state >> 2 * n) & item_mask
+        state >>= 3 * n
+        return loc, inventory, taken, returned, state & ((1 << self._claim_count) - 1), state >> self._claim_count
+
+    def _settle(self, loc: int, inventory: int, taken: int, returned: int, claimed: int,
+                score: int) -> tuple[int, tuple[str, ...]]:
+        """Apply the automatic takes and drops at loc and return the packed state and their commands."""
+        commands = []
+        for index in mask_bits(self._items_at[loc] & self._auto_take & ~taken):
+            taken |= 1 << index
+            inventory |= 1 << index
+            commands.append("take " + self._items[index].name)
+        for index in mask_bits(self._auto_drop_at[loc] & inventory & ~returned):
+            inventory &= ~(1 << index)
+            score += self._quest_points(index, returned)
+            returned |= 1 << index
+            commands.append("drop " + self._items[index].name)
+        return self._pack(loc, inventory, taken, returned, claimed, score), tuple(commands)
+
+    def _quest_points(self, index: int, returned: int) -> int:
+        """Return the points for returning tracked item index after the items in returned."""
+        names = {self._items[bit].name for bit in mask_bits(returned)}
+        return quest_points(self._items[index], names, self._world.item_index)
+
+    def _drop(self, state: int, index: int) -> tuple[int, tuple[str, ...]]:
+        """Return the state after dropping tracked item index, with the commands that lead to it."""
+        loc, inventory, taken, returned, claimed, score = self._unpack(state)
+        inventory &= ~(1 << index)
+        item = self._items[index]
+        if item.target_position == self._loc_ids[loc] and not returned >> index & 1:
+            score += self._quest_points(index, returned)
+            returned |= 1 << index
+        for claim, granted in self._rewards.get((loc, index), ()):
+            if claimed & claim:
+                continue
+            claimed |= claim
+            if granted >= 0:
+                inventory |= 1 << granted
+                taken |= 1 << granted
+        successor, commands = self._settle(loc, inventory, taken, returned, claimed, score)
+        return successor, ("drop " + item.name,) + commands
+
+    def _won(self, returned: int, score: int) -> bool:
+        """Return whether submitting now wins."""
+        return (score >= self._min_score and returned & self._required_mask == self._required_mask
+                and all(returned & mask for mask in self._alternative_masks))
+
+    def run(self, start_location_id: int) -> Optional[Solution]:
+        """Search from start_location_id and return the best solution, or None."""
+        start, commands = self._settle(self._loc_ids.index(start_location_id), 0, 0, 0, 0, 0)
+        best = {start: 0}
+        parents: dict[int, tuple[Optional[int], tuple[str, ...]]] = {start: (None, commands)}
+        queue = deque([(0, start)])
+
+        def relax(successor: int, turn: int, parent: int, commands: tuple[str, ...], free: bool) -> None:
+            if best.get(successor, turn + 1) > turn:
+                best[successor] = turn
+                parents[successor] = (parent, commands)
+                if free:
+                    queue.appendleft((turn, successor))
+                else:
+                    queue.append((turn, successor))
+
+        while queue:
+            turn, state = queue.popleft()
+            if best[state] != turn:
+                continue
+            loc, inventory, taken, returned, claimed, score = self._unpack(state)
+            if self._won(returned, score):
+                return Solution(self._commands(state, parents) + ["submit early"], turn, len(best))
+
+            for index in mask_bits(self._items_at[loc] & ~taken & ~self._auto_take):
+                successor = self._pack(loc, inventory | 1 << index, taken | 1 << index, returned, claimed, score)
+                relax(successor, turn, state, ("take " + self._items[index].name,), True)
+            for index in mask_bits(self._drops_at[loc] & inventory):
+                successor, commands = self._drop(state, index)
+                relax(successor, turn, state, commands, True)
+
+            limit = self._max_turns + (self._extension_bonus_turns if claimed & self._extension_mask else 0)
+            if turn + 1 >= limit:
+                continue
+            for command, dest in self._moves[loc]:
+                rule = self._rules.get(dest)
+                if rule is not None and not rule.allows(inventory, score, turn):
+                    continue
+                if self._items_at[dest] & self._auto_take & ~taken or self._auto_drop_at[dest] & inventory:
+                    successor, commands = self._settle(dest, inventory, taken, returned, claimed, score)
+                    relax(successor, turn + 1, state, (command,) + commands, False)
+                else:
+                    # The location index is the lowest field, so nothing else needs repacking.
+                    relax(state - loc + dest, turn + 1, state, (command,), False)
+        return None
+
+    @staticmethod
+    def _commands(state: int, parents: dict[int, tuple[Optional[int], tuple[str, ...]]]) -> list[str]:
+        """Return the commands that lead from the start to state."""
+        steps = []
+        current: Optional[int] = state
+        while current is not None:
+            current, commands = parents[current]
+            steps.append(commands)
+        return [command for commands in reversed(steps) for command in commands]
+
+
+def _collect_rule_items(rule: Restriction, negated: bool, keys: set[int], avoided: set[int],
+                        score_rules: list[bool]) -> None:
+    """Add the item bits rule needs to keys, and those it forbids to avoided.
+
+    score_rules[0] is set if rule depends on the score.
+    """
+    (avoided if negated else keys).update(mask_bits(rule.mask))
+    if rule.op == "min_score":
+        score_rules[0] = True
+    for child in rule.children:
+        _collect_rule_items(child, negated != (rule.op == "not"), keys, avoided, score_rules)
+
+
+def _reward_triggers(world: GameWorld, loc_index: dict[int, int]) -> dict[tuple[int, int], tuple]:
+    """Return reward effects keyed by (location index, trigger item bit), with aliases merged."""
+    triggers = {}
+    for (loc_id, name), effects in world.rewards.items():
+        bit = world.item_bits.get(name)
+        if bit is not None and loc_id in loc_index:
+            triggers[(loc_index[loc_id], bit)] = effects
+    return triggers
+
+
+def _add_useful_triggers(world: GameWorld, triggers: dict[tuple[int, int], tuple], relevant: set[int]) -> None:
+    """Add to relevant every trigger item whose reward extends the deadline or grants a relevant item."""
+    changed = True
+    while changed:
+        changed = False
+        for (_, bit), effects in triggers.items():
+            if bit not in relevant and any(_is_useful(world, effect, relevant) for effect in effects):
+                relevant.add(bit)
+                changed = True
+
+
+def _is_useful(world: GameWorld, effect: RewardEffect, relevant: set[int]) -> bool:
+    """Return whether effect extends the deadline or grants a relevant item."""
+    if effect.kind == "attribute":
+        return effect.value == EXTENSION_EFFECT
+    return world.item_bits.get(effect.value) in relevant
+
+
+def _local_mask(world_bits: Iterable[int], local: dict[int, int]) -> int:
+    """Return the local bitset for the given world item bits."""
+    mask = 0
+    for bit in world_bits:
+        mask |= 1 << local[bit]
+    return mask
+
+
+def _localize(rule: Restriction, local: dict[int, int]) -> Restriction:
+    """Return rule with its item masks translated to local item bits."""
+    return Restriction(rule.op, _local_mask(mask_bits(rule.mask), local), rule.threshold,
+                       tuple(_localize(child, local) for child in rule.children))
+
+
+if __name__ == "__main__":
+    # import python_ta
+    #
+    # python_ta.check_all(config={
+    #     'max-line-length': 120,
+    #     'disable': [
+    #         'R1705',
+    #         'E9998',
+    #         'E9999',
+    #         'static_type_checker',
+    #     ]
+    # })
+    data_file = sys.argv[1] if len(sys.argv) > 1 else "game_data.json"
+    start_id = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_START_LOCATION
+    result = solve(load_world(data_file), start_id)
+    if result is None:
+        print("No winning walkthrough exists.")
+    else:
+        print(json.dumps(result.commands))
+        print(f"{result.moves} moves, {result.states} states searched")
@@ -8,7 +8,7 @@ from typing import Callable, Optional, TypedDict
 import pygame
 
 from game_entities import Location
-from adventure import AdventureGame, DEFAULT_START_LOCATION
+from adventure import AdventureGame, CommandResult, DEFAULT_START_LOCATION
 from event_logger import Event, EventList
 from ui_endscreen import EndScreenSpec, EndScreenView
 from ui_primitives import (
@@ -17,6 +17,7 @@ from ui_primitives import (
     BORDER_SOFT,
     CARD,
     CARD_2,
+    DEFAULT_MAX_FPS,
     LOGO_FILE,
     PANEL,
     TEXT,
@@ -31,11 +32,14 @@ from ui_primitives import (
     MiniMap,
     ModalPicker,
     ScrollArea,
+    background_layer,
     draw_card,
     draw_chip,
     draw_uoft_logo,
     end_clip,
-    vertical_gradient,
+    needs_redraw,
+    render_text,
+    wait_for_events,
     wrap_text,
 )
 
@@ -95,20 +99,32 @@ class UIFrame(TypedDict):
 
 
 class GameUI:
-    """Main Pygame UI loop and rendering."""
+    """Main Pygame UI loop and rendering.
+
+    The loop sleeps until input arrives and redraws only after input, a change in which
+    button is hovered, or the end of a game, at most max_fps times a second.
+    """
     game: AdventureGame
     log: EventList
+    max_fps: int
     modal: Optional[ModalPicker]
     minimap: MiniMap
     output_lines: list[str]
     output_scroll: Optional[ScrollArea]
     actions_scroll: Optional[ScrollArea]
-
-    def __init__(self, game: AdventureGame, log: EventList) -> None:
+    # Private Instance Attributes:
+    #   - _output_version: a number changed whenever begin_turn or out changes output_lines.
+    #   - _output_wrap_key: the (version, font, width) that _output_wrapped was wrapped for.
+    #   - _output_wrapped: output_lines wrapped to the output panel's width.
+    _output_version: int
+    _output_wrap_key: Optional[tuple[int, pygame.font.Font, int]]
+    _output_wrapped: list[str]
+
+    def __init__(self, game: AdventureGame, log: EventList, max_fps: int = DEFAULT_MAX_FPS) -> None:
         self.game = game
         self.log = log
+        self.max_fps = max_fps
 
-        self.game.inventory = list(getattr(self.game, "inventory", []))
         self.game.score = int(getattr(self.game, "score", 0))
 
         self.modal = None
@@ -116,10 +132,14 @@ class GameUI:
         self.output_lines = []
         self.output_scroll = None
         self.actions_scroll = None
+        self._output_version = 0
+        self._output_wrap_key = None
+        self._output_wrapped = []
 
     def begin_turn(self, label: str) -> None:
         """Clear output and begin a new action."""
         self.output_lines = [f"You chose: {label}"]
+        self._output_version += 1
         if self.output_scroll is not None:
             self.output_scroll.offset = 0
 
@@ -129,22 +149,29 @@ class GameUI:
             stripped = line.strip()
             if stripped:
                 self.output_lines.append(stripped)
+        self._output_version += 1
 
     def location_description(self) -> str:
         """Return the correct location description and update visited."""
         location = self.game.get_location()
-        if getattr(location, "visited", False):
+        if self.game.mark_visited():
             return location.description['brief_description']
-        location.visited = True
         return location.description['long_description']
 
+    def _wrapped_output(self, body_font: pygame.font.Font, inner_width: int) -> list[str]:
+        """Return output_lines wrapped to inner_width, rewrapping only after the text or width changes."""
+        key = (self._output_version, body_font, inner_width)
+        if key != self._output_wrap_key:
+            self._output_wrapped = []
+            for raw in self.output_lines:
+                self._output_wrapped.extend(wrap_text(raw, body_font, inner_width))
+            self._output_wrap_key = key
+        return self._output_wrapped
+
     def _compute_output_content_height(self, body_font: pygame.font.Font, inner_width: int) -> int:
         """Compute the pixel height of output content (wrapped)."""
         line_height = body_font.get_height() + 4
-        wrapped: list[str] = []
-        for raw in self.output_lines:
-            wrapped.extend(wrap_text(raw, body_font, inner_width))
-        return max(1, len(wrapped) * line_height)
+        return max(1, len(self._wrapped_output(body_font, inner_width)) * line_height)
 
     def draw_output(
         self,
@@ -155,7 +182,7 @@ class GameUI:
     ) -> None:
         """Draw a scrollable output card with proper clipping."""
         draw_card(surface, rect, CardStyle(fill=CARD, radius=16))
-        label = label_font.render("OUTPUT", True, TEXT_DIM)
+        label = render_text(label_font, "OUTPUT", True, TEXT_DIM)
         surface.blit(label, (rect.x + 18, rect.y + 10))
 
         header_height = 34
@@ -175,15 +202,33 @@ class GameUI:
         y = inner.y - self.output_scroll.offset
         line_height = body_font.get_height() + 4
 
-        for raw in self.output_lines:
-            for line in wrap_text(raw, body_font, inner.width - 10):
-                if y + body_font.get_height() >= inner.y - line_height and y <= inner.bottom + line_height:
-                    surface.blit(body_font.render(line, True, TEXT), (inner.x, y))
-                y += line_height
+        for line in self._wrapped_output(body_font, inner.width - 10):
+            if y + body_font.get_height() >= inner.y - line_height and y <= inner.bottom + line_height:
+                surface.blit(render_text(body_font, line, True, TEXT), (inner.x, y))
+            y += line_height
 
         end_clip(surface, previous_clip)
         self.output_scroll.draw_scrollbar(surface)
 
+    def run_command(self, command: str, label: str) -> CommandResult:
+        """Run command through the game engine and show its output as a new turn."""
+        departed = self.game.get_location()
+        self.begin_turn(label)
+        result = self.game.execute(command)
+        for message in result.messages:
+            self.out(message)
+        for _ in range(result.undone_moves):
+            self.log.remove_last_event()
+        previous = departed
+        for command, loc_id in result.steps:
+            self.log.add_event(Event(previous.id_num, previous.description['brief_description']), command)
+            previous = self.game.get_location(loc_id)
+        if result.moved:
+            items_here = self.game.get_location().items
+            if self.game.ongoing and items_here:
+                self.out("Items here: " + ", ".join(items_here))
+        return result
+
     def open_take_modal(self) -> None:
         """Show a modal list of items in the current location."""
         location = self.game.get_location()
@@ -194,11 +239,7 @@ class GameUI:
             return
 
         def pick(item_name: str) -> None:
-            self.begin_turn(f"Take {item_name}")
-            if self.game.pick_up(item_name):
-                self.out(f"Picked up: {item_name}")
-            else:
-                self.out(f"Could not take: {item_name}")
+            self.run_command(f"take {item_name}", f"Take {item_name}")
 
         self.modal = ModalPicker("Take which item?", options, pick)
 
@@ -211,25 +252,7 @@ class GameUI:
             return
 
         def pick(item_name: str) -> None:
-            self.begin_turn(f"Drop {item_name}")
-            if not self.game.drop(item_name):
-                self.out(f"Could not drop: {item_name}")
-                return
-
-            completed = self.game.check_quest(item_name)
-            reward_messages = self.game.apply_location_rewards(item_name)
-
-            if completed:
-                dropped_item = self.game.get_item(item_name)
-                completion_text = dropped_item.completion_text if dropped_item is not None else ""
-                self.out(completion_text)
-                self.out(f"Your score is now {self.game.score}")
-
-            if reward_messages:
-                for reward_message in reward_messages:
-                    self.out(reward_message)
-            elif not completed:
-                self.out(f"Dropped: {item_name}")
+            self.run_command(f"drop {item_name}", f"Drop {item_name}")
 
         self.modal = ModalPicker("Drop which item?", options, pick)
 
@@ -242,39 +265,38 @@ class GameUI:
             return
 
         def pick(item_name: str) -> None:
-            self.begin_turn(f"Inspect {item_name}")
-            item = self.game.get_item(item_name)
-            if item is None:
-                self.out("That item could not be inspected.")
-                return
-            self.out(item.hint)
-            target_location = self.game.get_location(item.target_position).description['name']
-            self.out(f"..... It needs to go to {target_location}")
+            self.run_command(f"inspect {item_name}", f"Inspect {item_name}")
 
         self.modal = ModalPicker("Inspect which item?", options, pick)
 
+    def open_travel_modal(self) -> None:
+        """Show a modal list of visited locations to travel to."""
+        current_id = self.game.current_location_id
+        options = sorted(
+            location.description['name'] for location in self.game.location_dict().values()
+            if location.visited and location.id_num != current_id
+        )
+        if not options:
+            self.begin_turn("Travel")
+            self.out("You haven't visited anywhere else yet.")
+            return
+
+        def pick(location_name: str) -> None:
+            self.run_command(f"travel to {location_name}", f"Travel to {location_name}")
+
+        self.modal = ModalPicker("Travel where?", options, pick)
+
     def do_look(self) -> None:
         """Show long description and items."""
-        self.begin_turn("Look")
-        location = self.game.get_location()
-        self.out(location.description['long_description'])
-        self.out("Items here: " + (", ".join(location.items) if location.items else "(none)"))
+        self.run_command("look", "Look")
 
     def do_inventory(self) -> None:
         """Show inventory contents."""
-        self.begin_turn("Inventory")
-        if self.game.inventory:
-            self.out("You are carrying:")
-            for item in self.game.inventory:
-                self.out(f"- {item.name}")
-            return
-        self.out("Your inventory is empty.")
+        self.run_command("inventory", "Inventory")
 
     def do_score(self) -> None:
         """Show score."""
-        self.begin_turn("Score")
-        grade_percent = (min(self.game.score, self.game.MAX_SCORE) / self.game.MAX_SCORE) * 100
-        self.out(f"Score: {self.game.score}/{self.game.MAX_SCORE} ({grade_percent:.1f}%)")
+        self.run_command("score", "Score")
 
     def do_log(self) -> None:
         """Print log to console and note it in UI."""
@@ -282,53 +304,27 @@ class GameUI:
         self.out(self.log.get_events_str())
         self.log.display_events()
 
+    def do_undo(self) -> None:
+        """Take back the last command."""
+        self.run_command("undo", "Undo")
+
     def do_quit(self) -> None:
         """Quit the game."""
-        self.begin_turn("Quit")
-        self.out("Quitting...")
         self.modal = None
-        self.game.request_quit()
-        self.game.ongoing = False
+        self.run_command("quit", "Quit")
+        self.out("Quitting...")
 
     def do_submit(self) -> None:
         """Attempt early submission."""
-        self.begin_turn("Submit Early")
-        if self.game.submit_early():
-            self.out("Submission sent. Ending run...")
-        else:
-            self.out("Submission already finalized. Keep exploring.")
+        self.run_command("submit early", "Submit Early")
 
     def do_move(self, command_key: str) -> None:
         """Perform a location command (moves location)."""
-        current_location = self.game.get_location()
-        if command_key not in current_location.available_commands:
+        if command_key not in self.game.get_location().available_commands:
             self.begin_turn(command_key)
             self.out("That action isn't available here.")
             return
-
-        next_location_id = current_location.available_commands[command_key]
-        can_enter, reason = self.game.can_enter_location(next_location_id)
-        if not can_enter:
-            self.begin_turn(command_key)
-            if reason is not None:
-                self.out(reason)
-            return
-
-        self.begin_turn(command_key)
-        self.game.current_location_id = next_location_id
-        event = Event(current_location.id_num, current_location.description['brief_description'])
-        self.log.add_event(event, command_key)
-
-        if not self.game.is_unlimited_moves():
-            self.game.turn += 1
-            if self.game.MAX_TURNS <= self.game.turn:
-                self.game.ongoing = False
-                return
-
-        new_location = self.game.get_location()
-        self.out(self.location_description())
-        if new_location.items:
-            self.out("Items here: " + ", ".join(new_location.items))
+        self.run_command(command_key, command_key)
 
     def _reset_ui_after_restart(self) -> None:
         """Reset transient UI state after a game restart."""
@@ -370,7 +366,7 @@ class GameUI:
             accent=UOFT_LIGHT_BLUE,
             allow_keep_playing=True,
         )
-        action = EndScreenView(self.game).show(spec)
+        action = EndScreenView(self.game, self.max_fps).show(spec)
         self._apply_end_action(action, can_keep=True)
 
     def lose(self) -> None:
@@ -394,7 +390,7 @@ class GameUI:
             accent=(180, 60, 60),
             allow_keep_playing=False,
         )
-        action = EndScreenView(self.game).show(spec)
+        action = EndScreenView(self.game, self.max_fps).show(spec)
         self._apply_end_action(action, can_keep=False)
 
     def _create_fonts(self) -> UIFonts:
@@ -512,7 +508,9 @@ class GameUI:
         return y + 5
 
     def _add_menu_buttons(self, buttons: list[Button], area: ActionArea, y: int) -> int:
-        """Add Look/Inventory/Score/Log/Submit/Quit section buttons."""
+        """Add Travel/Look/Inventory/Score/Log/Undo/Submit/Quit section buttons."""
+        self._append_ghost_button(buttons, pygame.Rect(area.x, y, area.width, 34), "Travel", self.open_travel_modal)
+        y += 43
         self._append_ghost_button(buttons, pygame.Rect(area.x, y, area.width, 34), "Look", self.do_look)
         y += 43
         self._append_ghost_button(buttons, pygame.Rect(area.x, y, area.width, 34), "Inventory", self.do_inventory)
@@ -521,6 +519,16 @@ class GameUI:
         y += 43
         self._append_ghost_button(buttons, pygame.Rect(area.x, y, area.width, 34), "Log", self.do_log)
         y += 43
+        buttons.append(
+            Button(
+                pygame.Rect(area.x, y, area.width, 34),
+                "Undo",
+                self.do_undo,
+                kind="ghost",
+                enabled=self.game.can_undo(),
+            )
+        )
+        y += 43
 
         submit_enabled = self.game.can_submit_early()
         submit_label = "Submit Early" if submit_enabled else "Already Submitted"
@@ -636,10 +644,22 @@ class GameUI:
         if self.actions_scroll is not None:
             self.actions_scroll.handle_wheel(mouse_pos, wheel_y, speed=36)
 
-    def _process_events(self, buttons: list[Button], mouse_pos: tuple[int, int]) -> bool:
+    def _hovered(self, buttons: list[Button], mouse_pos: tuple[int, int]) -> tuple[tuple[int, ...], tuple[int, ...]]:
+        """Return the indices of the action buttons and modal buttons drawn as hovered at mouse_pos."""
+        y_offset = 0 if self.actions_scroll is None else -self.actions_scroll.offset
+        actions = tuple(index for index, button in enumerate(buttons)
+                        if button.enabled and button.rect.move(0, y_offset).collidepoint(mouse_pos))
+        return actions, () if self.modal is None else self.modal.hovered(mouse_pos)
+
+    def _process_events(
+        self,
+        buttons: list[Button],
+        mouse_pos: tuple[int, int],
+        events: list[pygame.event.Event]
+    ) -> bool:
         """Process frame events and return whether the loop should continue."""
         running = True
-        for event in pygame.event.get():
+        for event in events:
             if event.type == EVENT_QUIT:
                 running = False
             elif event.type == EVENT_KEYDOWN:
@@ -684,8 +704,8 @@ class GameUI:
         else:
             draw_uoft_logo(surface, (layout["pad"] + 34, topbar.centery), WHITE, UOFT_GOLD, fonts["logo"])
 
-        brand = fonts["topbar_title"].render("University of Toronto", True, WHITE)
-        subtitle = fonts["topbar_sub"].render("CSC111 Adventure Portal", True, (226, 236, 250))
+        brand = render_text(fonts["topbar_title"], "University of Toronto", True, WHITE)
+        subtitle = render_text(fonts["topbar_sub"], "CSC111 Adventure Portal", True, (226, 236, 250))
         surface.blit(brand, (pad + 84, 28))
         surface.blit(subtitle, (pad + 84, 58))
 
@@ -700,7 +720,7 @@ class GameUI:
         accent = pygame.Rect(rect.x + 2, rect.y + 2, 8, rect.height - 4)
         pygame.draw.rect(surface, UOFT_LIGHT_BLUE, accent, border_radius=6)
 
-        title = fonts["title"].render(location.description['name'], True, TEXT)
+        title = render_text(fonts["title"], location.description['name'], True, TEXT)
         surface.blit(title, (rect.x + 20, rect.y + 12))
 
         turns_left = self.game.MAX_TURNS - self.game.turn
@@ -728,6 +748,17 @@ class GameUI:
             fonts["chip"],
             ChipStyle(fill=(255, 247, 233), text_color=(128, 78, 17)),
         )
+        if not self.game.is_unlimited_moves():
+            self._draw_win_chip(surface, pygame.Rect(rect.x + 416, chips_y, 156, 24), fonts["chip"])
+
+    def _draw_win_chip(self, surface: pygame.Surface, rect: pygame.Rect, font: pygame.font.Font) -> None:
+        """Draw a chip showing the fewest moves a win still needs, or that the run is lost."""
+        needed = self.game.moves_to_win()
+        if needed is None or not self.game.can_still_win():
+            draw_chip(surface, rect, "Can't win now", font, ChipStyle(fill=(253, 236, 236), text_color=(160, 40, 40)))
+        else:
+            draw_chip(surface, rect, f"Win needs {needed}+ moves", font,
+                      ChipStyle(fill=(235, 244, 255), text_color=TEXT_DIM))
 
     def _description_text(self, location: Location) -> str:
         """Return long or brief description based on visited flag."""
@@ -745,14 +776,14 @@ class GameUI:
         body_font = fonts["body"]
 
         draw_card(surface, rect, CardStyle(fill=CARD, radius=16))
-        surface.blit(label_font.render("DESCRIPTION", True, TEXT_DIM), (rect.x + 18, rect.y + 10))
+        surface.blit(render_text(label_font, "DESCRIPTION", True, TEXT_DIM), (rect.x + 18, rect.y + 10))
 
         lines = wrap_text(self._description_text(location), body_font, rect.width - 36)
         y = rect.y + 36
         for line in lines:
             if y > rect.bottom - 22:
                 break
-            surface.blit(body_font.render(line, True, TEXT), (rect.x + 18, y))
+            surface.blit(render_text(body_font, line, True, TEXT), (rect.x + 18, y))
             y += 22
 
     def _draw_items_card(self, frame: UIFrame, location: Location) -> None:
@@ -765,7 +796,7 @@ class GameUI:
         body_font = fonts["body"]
 
         draw_card(surface, rect, CardStyle(fill=CARD, radius=16))
-        surface.blit(label_font.render("ITEMS HERE", True, TEXT_DIM), (rect.x + 18, rect.y + 10))
+        surface.blit(render_text(label_font, "ITEMS HERE", True, TEXT_DIM), (rect.x + 18, rect.y + 10))
 
         if not location.items:
             items_text = "(None)"
@@ -774,7 +805,7 @@ class GameUI:
             items_text = ", ".join(shown).capitalize()
             if len(location.items) > 3:
                 items_text += ", ..."
-        surface.blit(body_font.render(items_text, True, TEXT), (rect.x + 18, rect.y + 32))
+        surface.blit(render_text(body_font, items_text, True, TEXT), (rect.x + 18, rect.y + 32))
 
     def _draw_left_panel(self, frame: UIFrame, location: Location) -> None:
         """Draw left-side cards."""
@@ -802,7 +833,7 @@ class GameUI:
         actions_inner = layout["actions_inner"]
 
         draw_card(surface, actions_card, CardStyle(fill=CARD, radius=16))
-        surface.blit(fonts["label"].render("ACTIONS", True, TEXT_DIM), (actions_card.x + 18, actions_card.y + 10))
+        surface.blit(render_text(fonts["label"], "ACTIONS", True, TEXT_DIM), (actions_card.x + 18, actions_card.y + 10))
 
         if self.actions_scroll is None:
             return
@@ -833,12 +864,32 @@ class GameUI:
         draw_card(surface, right_panel, CardStyle(fill=PANEL, radius=16))
 
         draw_card(surface, map_rect, CardStyle(fill=CARD, radius=16))
-        surface.blit(fonts["label"].render("MINIMAP", True, TEXT_DIM), (map_rect.x + 18, map_rect.y + 10))
+        surface.blit(render_text(fonts["label"], "MINIMAP", True, TEXT_DIM), (map_rect.x + 18, map_rect.y + 10))
         map_inner = pygame.Rect(map_rect.x + 14, map_rect.y + 36, map_rect.width - 28, map_rect.height - 50)
         self.minimap.draw(surface, map_inner, location.id_num)
 
         self._draw_actions(frame)
 
+    def _prepare_frame(
+        self,
+        screen: pygame.Surface,
+        fonts: UIFonts,
+        logo_image: Optional[pygame.Surface],
+        mouse_pos: tuple[int, int]
+    ) -> UIFrame:
+        """Lay out the screen and build this frame's action buttons."""
+        layout = self._build_layout(screen)
+        actions_inner = layout["actions_inner"]
+        self._ensure_actions_scroll(actions_inner)
+        return {
+            "surface": screen,
+            "layout": layout,
+            "fonts": fonts,
+            "logo_image": logo_image,
+            "buttons": self._build_action_buttons(actions_inner),
+            "mouse_pos": mouse_pos,
+        }
+
     def _draw_frame(self, frame: UIFrame) -> None:
         """Draw one main-loop frame."""
         surface = frame["surface"]
@@ -846,7 +897,7 @@ class GameUI:
         mouse_pos = frame["mouse_pos"]
 
         location = self.game.get_location()
-        surface.blit(vertical_gradient(surface.get_size(), BG_TOP, BG_BOTTOM), (0, 0))
+        surface.blit(background_layer(surface.get_size(), BG_TOP, BG_BOTTOM), (0, 0))
         self._draw_topbar(frame)
         self._draw_left_panel(frame, location)
         self._draw_right_panel(frame, location)
@@ -893,43 +944,44 @@ class GameUI:
         self.begin_turn("Start")
         self.out(self.location_description())
 
+        frame = self._prepare_frame(screen, fonts, logo_image, pygame.mouse.get_pos())
+        dirty = True
         running = True
         while running:
-            clock.tick(60)
+            if dirty:
+                self._draw_frame(frame)
+                pygame.display.flip()
+                dirty = False
+            hovered = self._hovered(frame["buttons"], frame["mouse_pos"])
+            clock.tick(self.max_fps)
+            events = wait_for_events()
             mouse_pos = pygame.mouse.get_pos()
 
-            layout = self._build_layout(screen)
-            actions_inner = layout["actions_inner"]
-            self._ensure_actions_scroll(actions_inner)
-            buttons = self._build_action_buttons(actions_inner)
-            frame: UIFrame = {
-                "surface": screen,
-                "layout": layout,
-                "fonts": fonts,
-                "logo_image": logo_image,
-                "buttons": buttons,
-                "mouse_pos": mouse_pos,
-            }
-
-            running = self._process_events(buttons, mouse_pos)
+            running = self._process_events(frame["buttons"], mouse_pos, events)
             if not running or self.game.is_quit_requested():
                 break
             self._cleanup_modal()
-            self._draw_frame(frame)
-            pygame.display.flip()
+            dirty = needs_redraw(events) or not self.game.ongoing
 
             running = self._resolve_end_state(running)
             if not running:
                 break
+            if dirty or self._hovered(frame["buttons"], mouse_pos) != hovered:
+                frame = self._prepare_frame(screen, fonts, logo_image, mouse_pos)
+                dirty = True
 
         PYGAME_QUIT()
 
 
-def run_pygame_ui(game_data_json: str = "game_data.json", initial_location_id: int = DEFAULT_START_LOCATION) -> None:
-    """Create the game + UI and start the window."""
+def run_pygame_ui(
+    game_data_json: str = "game_data.json",
+    initial_location_id: int = DEFAULT_START_LOCATION,
+    max_fps: int = DEFAULT_MAX_FPS
+) -> None:
+    """Create the game + UI and start the window, redrawing at most max_fps times a second."""
     game_log = EventList()
     game = AdventureGame(game_data_json, initial_location_id)
-    ui = GameUI(game, game_log)
+    ui = GameUI(game, game_log, max_fps)
     ui.run()
 
 
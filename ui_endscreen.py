@@ -11,13 +11,17 @@ from adventure import AdventureGame
 from ui_primitives import (
     BG_BOTTOM,
     BG_TOP,
+    DEFAULT_MAX_FPS,
     PANEL,
     TEXT,
     TEXT_DIM,
     Button,
     CardStyle,
+    background_layer,
     draw_card,
-    vertical_gradient,
+    needs_redraw,
+    render_text,
+    wait_for_events,
     wrap_text,
 )
 
@@ -39,16 +43,22 @@ class EndScreenSpec:
 
 
 class EndScreenView:
-    """Display and manage end-screen interactions."""
+    """Display and manage end-screen interactions.
+
+    Like the main UI, the screen is redrawn only after input or a hover change, at most
+    max_fps times a second.
+    """
     game: AdventureGame
+    max_fps: int
     _screen: pygame.Surface
     _fonts: dict[str, pygame.font.Font]
     _spec: Optional[EndScreenSpec]
     _lines: list[str]
     _mouse_pos: tuple[int, int]
 
-    def __init__(self, game: AdventureGame) -> None:
+    def __init__(self, game: AdventureGame, max_fps: int = DEFAULT_MAX_FPS) -> None:
         self.game = game
+        self.max_fps = max_fps
         self._screen = self._ensure_screen()
         self._fonts = self._create_fonts()
         self._spec = None
@@ -104,7 +114,7 @@ class EndScreenView:
         x_and_top: tuple[int, int],
     ) -> int:
         """Draw centered text and return the text bottom y-coordinate."""
-        image = font.render(text, True, color)
+        image = render_text(font, text, True, color)
         rect = image.get_rect(midtop=x_and_top)
         self._screen.blit(image, rect)
         return rect.bottom
@@ -119,7 +129,7 @@ class EndScreenView:
                 y += 10
                 continue
             for line in wrap_text(paragraph, body_font, max_width):
-                image = body_font.render(line, True, TEXT)
+                image = render_text(body_font, line, True, TEXT)
                 rect = image.get_rect(midtop=(center_x, y))
                 self._screen.blit(image, rect)
                 y += 24
@@ -158,7 +168,7 @@ class EndScreenView:
         """Draw one end-screen frame and return clickable button areas."""
         assert self._spec is not None
 
-        self._screen.blit(vertical_gradient(self._screen.get_size(), BG_TOP, BG_BOTTOM), (0, 0))
+        self._screen.blit(background_layer(self._screen.get_size(), BG_TOP, BG_BOTTOM), (0, 0))
         card = pygame.Rect(0, 0, 860, 620)
         card.center = (self._screen.get_width() // 2, self._screen.get_height() // 2)
         draw_card(self._screen, card, CardStyle(fill=PANEL, radius=18))
@@ -179,7 +189,7 @@ class EndScreenView:
         body_bottom = self._draw_body(card, center_x, y)
         restart_rect, keep_rect = self._draw_buttons(card, body_bottom)
 
-        hint = self._fonts["hint"].render("ESC / Q to quit", True, TEXT_DIM)
+        hint = render_text(self._fonts["hint"], "ESC / Q to quit", True, TEXT_DIM)
         self._screen.blit(hint, hint.get_rect(midbottom=(card.centerx, card.bottom - 18)))
         return restart_rect, keep_rect
 
@@ -196,9 +206,19 @@ class EndScreenView:
             return "keep"
         return None
 
-    def _process_events(self, restart_rect: pygame.Rect, keep_rect: Optional[pygame.Rect]) -> Optional[str]:
+    def _hovered(self, restart_rect: pygame.Rect, keep_rect: Optional[pygame.Rect]) -> tuple[bool, bool]:
+        """Return whether the restart and keep buttons are under the mouse."""
+        return (restart_rect.collidepoint(self._mouse_pos),
+                keep_rect is not None and keep_rect.collidepoint(self._mouse_pos))
+
+    def _process_events(
+        self,
+        restart_rect: pygame.Rect,
+        keep_rect: Optional[pygame.Rect],
+        events: list[pygame.event.Event]
+    ) -> Optional[str]:
         """Process events and return end-screen action when chosen."""
-        for event in pygame.event.get():
+        for event in events:
             if event.type == EVENT_QUIT:
                 return "quit"
             if event.type == EVENT_KEYDOWN and event.key in {KEY_ESCAPE, KEY_Q}:
@@ -214,15 +234,21 @@ class EndScreenView:
         self._spec = spec
         self._lines = self._summary_lines(spec)
         clock = pygame.time.Clock()
+        self._mouse_pos = pygame.mouse.get_pos()
+        restart_rect, keep_rect = self._draw_frame()
+        pygame.display.flip()
 
         while True:
-            clock.tick(60)
+            hovered = self._hovered(restart_rect, keep_rect)
+            clock.tick(self.max_fps)
+            events = wait_for_events()
             self._mouse_pos = pygame.mouse.get_pos()
-            restart_rect, keep_rect = self._draw_frame()
-            action = self._process_events(restart_rect, keep_rect)
-            pygame.display.flip()
+            action = self._process_events(restart_rect, keep_rect, events)
             if action is not None:
                 return action
+            if needs_redraw(events) or self._hovered(restart_rect, keep_rect) != hovered:
+                restart_rect, keep_rect = self._draw_frame()
+                pygame.display.flip()
 
         return None
 
@@ -5,7 +5,7 @@ This module stores theme constants, drawing helpers, and reusable tools.
 
 from __future__ import annotations
 
-from collections import deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, Optional, Sequence
@@ -16,6 +16,11 @@ from adventure import AdventureGame
 from game_entities import Location
 
 FLAG_SRCALPHA = getattr(pygame, "SRCALPHA", 0)
+EVENT_NOEVENT = getattr(pygame, "NOEVENT", 0)
+EVENT_MOUSEMOTION = getattr(pygame, "MOUSEMOTION", 0)
+
+DEFAULT_MAX_FPS = 60
+IDLE_WAIT_MS = 500
 
 # Theme colours
 UOFT_BLUE = (9, 48, 102)
@@ -43,6 +48,11 @@ HOVER_SHADOW = (30, 56, 95, 42)
 
 LOGO_FILE = Path(__file__).resolve().parent / "assets" / "uoft_coa.png"
 
+SPRITE_CACHE_SIZE = 256
+TEXT_CACHE_BYTES = 8 * 1024 * 1024
+WRAP_CACHE_SIZE = 1024
+WORD_WIDTH_CACHE_SIZE = 1 << 14
+
 
 @dataclass()
 class CardStyle:
@@ -62,6 +72,19 @@ class ChipStyle:
 
 DEFAULT_CARD_STYLE = CardStyle()
 
+# Surfaces returned by rounded_sprite, keyed by its arguments, least recently used first.
+_sprites: OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+# Lines returned by wrap_text, keyed by (font, text, width), least recently used first.
+_wrapped: OrderedDict[tuple[pygame.font.Font, str, int], tuple[str, ...]] = OrderedDict()
+
+# Rendered widths of single words, keyed by (font, word). Cleared when it reaches WORD_WIDTH_CACHE_SIZE entries.
+_word_widths: dict[tuple[pygame.font.Font, str], int] = {}
+
+# The background last returned by background_layer, keyed by (size, top, bottom). Holds at most one
+# entry, so a resize or colour change replaces it.
+_background_layer: dict[tuple[tuple[int, int], tuple[int, int, int], tuple[int, int, int]], pygame.Surface] = {}
+
 
 def vertical_gradient(
     size: tuple[int, int],
@@ -80,19 +103,164 @@ def vertical_gradient(
     return surface
 
 
+class TextCache:
+    """Rendered text surfaces, reused while the same font, text, colour and antialiasing are drawn.
+
+    Least recently used surfaces are evicted once their pixel data passes max_bytes.
+
+    Instance Attributes:
+        - max_bytes: the most pixel data kept, in bytes.
+        - hits: the number of renders answered from the cache.
+        - misses: the number of renders that had to rasterise the text.
+    """
+    max_bytes: int
+    hits: int
+    misses: int
+    # Private Instance Attributes:
+    #   - _surfaces: the rendered surfaces keyed by (font, text, colour, antialias), least recently used first.
+    #   - _bytes: the pixel data held in _surfaces, in bytes.
+    _surfaces: OrderedDict[tuple[pygame.font.Font, str, tuple[int, ...], bool], pygame.Surface]
+    _bytes: int
+
+    def __init__(self, max_bytes: int = TEXT_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._surfaces = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def render(
+        self,
+        font: pygame.font.Font,
+        text: str,
+        antialias: bool,
+        color: tuple[int, ...]
+    ) -> pygame.Surface:
+        """Return font.render(text, antialias, color), reusing an earlier surface when possible.
+
+        The returned surface is shared and must not be drawn on.
+        """
+        key = (font, text, tuple(color), antialias)
+        image = self._surfaces.get(key)
+        if image is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return image
+
+        self.misses += 1
+        image = font.render(text, antialias, color)
+        self._surfaces[key] = image
+        self._bytes += _surface_bytes(image)
+        while self._bytes > self.max_bytes and len(self._surfaces) > 1:
+            _, evicted = self._surfaces.popitem(last=False)
+            self._bytes -= _surface_bytes(evicted)
+        return image
+
+    def hit_rate(self) -> float:
+        """Return the fraction of renders answered from the cache, or 0.0 before any render."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self) -> None:
+        """Drop every cached surface and reset the counters."""
+        self._surfaces.clear()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+TEXT_CACHE = TextCache()
+
+
+def _surface_bytes(surface: pygame.Surface) -> int:
+    """Return the size of surface's pixel data in bytes."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+def render_text(
+    font: pygame.font.Font,
+    text: str,
+    antialias: bool,
+    color: tuple[int, ...]
+) -> pygame.Surface:
+    """Return font.render(text, antialias, color) through the shared TEXT_CACHE.
+
+    The returned surface is shared and must not be drawn on.
+    """
+    return TEXT_CACHE.render(font, text, antialias, color)
+
+
+def background_layer(
+    size: tuple[int, int],
+    top: tuple[int, int, int],
+    bottom: tuple[int, int, int]
+) -> pygame.Surface:
+    """Return a vertical gradient like vertical_gradient, reusing the last one while size and colours match.
+
+    The returned surface is shared and must not be drawn on. It is converted to the display's
+    pixel format when a display is open, so blitting it is a straight copy.
+    """
+    key = (tuple(size), top, bottom)
+    layer = _background_layer.get(key)
+    if layer is None:
+        _background_layer.clear()
+        layer = vertical_gradient(size, top, bottom)
+        if pygame.display.get_surface() is not None:
+            layer = layer.convert()
+        _background_layer[key] = layer
+    return layer
+
+
+def rounded_sprite(
+    size: tuple[int, int],
+    radius: int,
+    fill: tuple[int, ...],
+    border: Optional[tuple[tuple[int, int, int], int]] = None,
+    shadow: Optional[tuple[tuple[int, int, int, int], int, tuple[int, int], int]] = None
+) -> pygame.Surface:
+    """Return a surface showing a rounded rectangle of size at its top-left corner.
+
+    border is (colour, width) and shadow is (colour, grow, offset, radius): a rounded rectangle
+    grow pixels wider and taller than size, drawn offset pixels right and down, behind the
+    rectangle. Blitting the surface gives the same pixels as drawing these parts one by one.
+    Surfaces are cached, evicting the least recently used beyond SPRITE_CACHE_SIZE; the returned
+    surface is shared and must not be drawn on.
+    """
+    key = (tuple(size), radius, fill, border, shadow)
+    sprite = _sprites.get(key)
+    if sprite is not None:
+        _sprites.move_to_end(key)
+        return sprite
+
+    width, height = size
+    rect = pygame.Rect(0, 0, width, height)
+    if shadow is None:
+        sprite = pygame.Surface(size, FLAG_SRCALPHA)
+    else:
+        shadow_color, grow, (dx, dy), shadow_radius = shadow
+        sprite = pygame.Surface((width + grow + dx, height + grow + dy), FLAG_SRCALPHA)
+        pygame.draw.rect(sprite, shadow_color, pygame.Rect(dx, dy, width + grow, height + grow),
+                         border_radius=shadow_radius)
+    pygame.draw.rect(sprite, fill, rect, border_radius=radius)
+    if border is not None:
+        pygame.draw.rect(sprite, border[0], rect, width=border[1], border_radius=radius)
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()
+
+    _sprites[key] = sprite
+    if len(_sprites) > SPRITE_CACHE_SIZE:
+        _sprites.popitem(last=False)
+    return sprite
+
+
 def draw_card(surface: pygame.Surface, rect: pygame.Rect, style: CardStyle = DEFAULT_CARD_STYLE) -> None:
     """Draw a rounded card with a subtle drop shadow and border."""
-    shadow = pygame.Surface((rect.width + 8, rect.height + 8), FLAG_SRCALPHA)
-    pygame.draw.rect(shadow, SHADOW, shadow.get_rect(), border_radius=style.radius + 2)
-    surface.blit(shadow, (rect.x + 2, rect.y + 3))
-    pygame.draw.rect(surface, style.fill, rect, border_radius=style.radius)
-    pygame.draw.rect(
-        surface,
-        style.border,
-        rect,
-        width=style.border_width,
-        border_radius=style.radius
-    )
+    sprite = rounded_sprite(rect.size, style.radius, style.fill, (style.border, style.border_width),
+                            (SHADOW, 8, (2, 3), style.radius + 2))
+    surface.blit(sprite, rect.topleft)
 
 
 def draw_chip(
@@ -103,10 +271,8 @@ def draw_chip(
     style: ChipStyle
 ) -> None:
     """Draw a pill-style status chip."""
-    border_radius = rect.height // 2
-    pygame.draw.rect(surface, style.fill, rect, border_radius=border_radius)
-    pygame.draw.rect(surface, BORDER, rect, width=1, border_radius=border_radius)
-    label = font.render(text, True, style.text_color)
+    surface.blit(rounded_sprite(rect.size, rect.height // 2, style.fill, (BORDER, 1)), rect.topleft)
+    label = render_text(font, text, True, style.text_color)
     surface.blit(label, label.get_rect(center=rect.center))
 
 
@@ -127,28 +293,91 @@ def draw_uoft_logo(
     pygame.draw.polygon(surface, ring_color, [(cx - 5, cy - 9), (cx + 5, cy - 9), (cx, cy - 14)])
     pygame.draw.rect(surface, ring_color, pygame.Rect(cx - 7, cy - 3, 3, 8))
     pygame.draw.rect(surface, ring_color, pygame.Rect(cx + 4, cy - 3, 3, 8))
-    glyph = glyph_font.render("U", True, ring_color)
+    glyph = render_text(glyph_font, "U", True, ring_color)
     surface.blit(glyph, glyph.get_rect(center=(cx, cy + 6)))
 
 
 def wrap_text(text: str, font: pygame.font.Font, width: int) -> list[str]:
-    """Wrap text into lines that fit within a given pixel width."""
-    words = text.split()
+    """Wrap text into lines that fit within a given pixel width.
+
+    Each line break is estimated from cached word widths and then checked by measuring the
+    joined line, so wrapping takes time linear in the length of text, and results are cached
+    by font, text and width.
+    """
+    key = (font, text, width)
+    lines = _wrapped.get(key)
+    if lines is not None:
+        _wrapped.move_to_end(key)
+        return list(lines)
+
+    lines = tuple(_wrap_words(text.split(), font, width))
+    _wrapped[key] = lines
+    if len(_wrapped) > WRAP_CACHE_SIZE:
+        _wrapped.popitem(last=False)
+    return list(lines)
+
+
+def _wrap_words(words: list[str], font: pygame.font.Font, width: int) -> list[str]:
+    """Greedily group words into lines no wider than width, breaking only between words.
+
+    A line gets as many words as fit when measured together with font.size; a word wider
+    than width gets a line of its own. Summed word widths drift from font.size through
+    kerning and rounding, so the estimated break is confirmed by measuring the line and
+    the line with the next word, and moved a word at a time if either is wrong.
+    """
+    space = _word_width(font, " ")
     lines: list[str] = []
-    current = ""
-    for word in words:
-        test = (current + " " + word).strip()
-        if font.size(test)[0] <= width:
-            current = test
+    start = 0
+    while start < len(words):
+        end = start + 1
+        estimate = _word_width(font, words[start])
+        while end < len(words):
+            estimate += space + _word_width(font, words[end])
+            if estimate > width:
+                break
+            end += 1
+        if end - start > 1 and font.size(" ".join(words[start:end]))[0] > width:
+            end -= 1
+            while end - start > 1 and font.size(" ".join(words[start:end]))[0] > width:
+                end -= 1
         else:
-            if current:
-                lines.append(current)
-            current = word
-    if current:
-        lines.append(current)
+            while end < len(words) and font.size(" ".join(words[start:end + 1]))[0] <= width:
+                end += 1
+        lines.append(" ".join(words[start:end]))
+        start = end
     return lines
 
 
+def _word_width(font: pygame.font.Font, word: str) -> int:
+    """Return the rendered width of word in font."""
+    key = (font, word)
+    width = _word_widths.get(key)
+    if width is None:
+        if len(_word_widths) >= WORD_WIDTH_CACHE_SIZE:
+            _word_widths.clear()
+        width = _word_widths[key] = font.size(word)[0]
+    return width
+
+
+def wait_for_events(timeout_ms: int = IDLE_WAIT_MS) -> list[pygame.event.Event]:
+    """Return the pending events, first sleeping until one arrives or timeout_ms passes if there are none."""
+    events = pygame.event.get()
+    if events:
+        return events
+    event = pygame.event.wait(timeout_ms)
+    if event.type == EVENT_NOEVENT:
+        return []
+    return [event] + pygame.event.get()
+
+
+def needs_redraw(events: list[pygame.event.Event]) -> bool:
+    """Return whether any of events can change what is on screen by itself.
+
+    Mouse motion only matters when it changes what is hovered, which callers check separately.
+    """
+    return any(event.type != EVENT_MOUSEMOTION for event in events)
+
+
 def end_clip(surface: pygame.Surface, previous_clip: pygame.Rect) -> None:
     """Restore previous clip."""
     surface.set_clip(previous_clip)
@@ -192,15 +421,11 @@ class Button:
         hovered = self.enabled and rect.collidepoint(mouse_pos)
         fill, text_color = self._palette(hovered)
 
-        shadow = pygame.Surface((rect.width + 6, rect.height + 6), FLAG_SRCALPHA)
         shadow_color = HOVER_SHADOW if hovered else SHADOW
-        pygame.draw.rect(shadow, shadow_color, shadow.get_rect(), border_radius=13)
-        surface.blit(shadow, (rect.x + 1, rect.y + 2))
+        sprite = rounded_sprite(rect.size, 12, fill, (BORDER_SOFT, 2), (shadow_color, 6, (1, 2), 13))
+        surface.blit(sprite, rect.topleft)
 
-        pygame.draw.rect(surface, fill, rect, border_radius=12)
-        pygame.draw.rect(surface, BORDER_SOFT, rect, width=2, border_radius=12)
-
-        text_image = font.render(self.label, True, text_color)
+        text_image = render_text(font, self.label, True, text_color)
         surface.blit(text_image, text_image.get_rect(center=rect.center))
 
     def handle_click(self, pos: tuple[int, int], y_offset: int = 0) -> None:
@@ -353,12 +578,10 @@ class ModalPicker:
         mouse_pos: tuple[int, int]
     ) -> None:
         """Render the modal with a dark overlay and clipped list."""
-        overlay = pygame.Surface(surface.get_size(), FLAG_SRCALPHA)
-        overlay.fill((14, 40, 86, 88))
-        surface.blit(overlay, (0, 0))
+        surface.blit(rounded_sprite(surface.get_size(), 0, (14, 40, 86, 88)), (0, 0))
 
         draw_card(surface, self.panel, CardStyle(fill=CARD, border=BORDER, radius=16, border_width=2))
-        title = title_font.render(self.title, True, TEXT)
+        title = render_text(title_font, self.title, True, TEXT)
         surface.blit(title, (self.panel.x + 18, self.panel.y + 16))
 
         if self.scroll is not None:
@@ -376,6 +599,15 @@ class ModalPicker:
         cancel_button = Button(self._cancel_rect(self.panel), "Cancel", self.close, kind="ghost")
         cancel_button.draw(surface, button_font, mouse_pos)
 
+    def hovered(self, mouse_pos: tuple[int, int]) -> tuple[int, ...]:
+        """Return the indices of the option buttons under mouse_pos as drawn, with -1 for Cancel."""
+        y_offset = 0 if self.scroll is None else -self.scroll.offset
+        hovered = tuple(index for index, button in enumerate(self.option_buttons)
+                        if button.rect.move(0, y_offset).collidepoint(mouse_pos))
+        if self._cancel_rect(self.panel).collidepoint(mouse_pos):
+            hovered += (-1,)
+        return hovered
+
     def handle_wheel(self, mouse_pos: tuple[int, int], wheel_y: int) -> None:
         """Scroll the modal list if mouse is over it."""
         if self.scroll is not None:
@@ -403,11 +635,16 @@ class MiniMap:
     game: AdventureGame
     pos: dict[int, tuple[int, int]]
     edges: set[tuple[int, int]]
+    # Private Instance Attributes:
+    #   - _label_font: the font of the direction labels, or None until first drawn. Loading a
+    #                  system font is slow, and a fresh font object would also miss the text cache.
+    _label_font: Optional[pygame.font.Font]
 
     def __init__(self, game: AdventureGame) -> None:
         self.game = game
         self.pos = {}
         self.edges = set()
+        self._label_font = None
         self._build_cardinal_layout()
 
     def _parse_dir(self, command: str) -> Optional[str]:
@@ -489,11 +726,13 @@ class MiniMap:
 
     def _draw_direction_labels(self, surface: pygame.Surface, rect: pygame.Rect) -> None:
         """Draw N/E/S/W guides around a minimap card."""
-        label_font = pygame.font.SysFont("arial", 14, bold=True)
-        north = label_font.render("N", True, TEXT_DIM)
-        east = label_font.render("E", True, TEXT_DIM)
-        south = label_font.render("S", True, TEXT_DIM)
-        west = label_font.render("W", True, TEXT_DIM)
+        if self._label_font is None:
+            self._label_font = pygame.font.SysFont("arial", 14, bold=True)
+        label_font = self._label_font
+        north = render_text(label_font, "N", True, TEXT_DIM)
+        east = render_text(label_font, "E", True, TEXT_DIM)
+        south = render_text(label_font, "S", True, TEXT_DIM)
+        west = render_text(label_font, "W", True, TEXT_DIM)
         surface.blit(north, (rect.centerx - north.get_width() // 2, rect.y + 6))
         surface.blit(south, (rect.centerx - south.get_width() // 2, rect.bottom - 6 - south.get_height()))
         surface.blit(west, (rect.x + 6, rect.centery - west.get_height() // 2))
@@ -0,0 +1,312 @@
+"""World loading for the CSC111 adventure game.
+
+This module turns a game data JSON file into a compiled GameWorld (item
+registry, reward table, entry rules and route index) and keeps a binary cache of the
+compiled world next to the JSON file. The terminal game, the Pygame UI and
+the simulation all load worlds through load_world, and sessions in the same
+process share one read-only world per data file.
+
+The cache file is ``<data file>.worldcache``. It holds a length-prefixed
+``marshal`` header (format version, source size, modification time and SHA-256
+digest) followed by the compiled world laid out as flat columns of strings and ints,
+which rebuild into objects much faster than re-parsing and re-compiling the
+JSON. A cache is reused while its header matches the source file and is
+rebuilt automatically when the JSON changes.
+"""
+
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import marshal
+import os
+import struct
+from typing import Any, Optional
+
+from game_entities import GameWorld, Item, Location, RewardEffect
+from restrictions import Restriction, compile_restriction
+from routes import RouteIndex
+
+CACHE_SUFFIX = ".worldcache"
+CACHE_MAGIC = "acorn-world"
+CACHE_VERSION = 1
+HEADER_LENGTH = struct.Struct(">I")
+
+# Worlds already loaded in this process, keyed by real path: (size, mtime_ns, world).
+_shared_worlds: dict[str, tuple[int, int, GameWorld]] = {}
+
+
+def load_world(filename: str, use_cache: bool = True) -> GameWorld:
+    """Return the compiled world for the game data JSON file filename.
+
+    When use_cache is True, a world already loaded in this process from the same
+    unchanged file is returned as-is, so every session shares it. Otherwise a valid
+    cache file is loaded instead of parsing the JSON, and a stale or missing cache is
+    rewritten after parsing. Failure to write the cache (for example, a read-only
+    directory) is ignored. When use_cache is False, the JSON is always parsed and a
+    new world is returned.
+    """
+    if not use_cache:
+        with open(filename, 'rb') as file:
+            return build_world(json.loads(file.read()))
+
+    stat = os.stat(filename)
+    key = os.path.realpath(filename)
+    shared = _shared_worlds.get(key)
+    if shared is not None and shared[0] == stat.st_size and shared[1] == stat.st_mtime_ns:
+        return shared[2]
+
+    world = _load_cached_world(filename, stat)
+    _shared_worlds[key] = (stat.st_size, stat.st_mtime_ns, world)
+    return world
+
+
+def _load_cached_world(filename: str, stat: os.stat_result) -> GameWorld:
+    """Return the world for filename from its cache file, rebuilding the cache if it is stale."""
+    cache_file = filename + CACHE_SUFFIX
+    header = _read_header(cache_file)
+    if header is not None and header["size"] == stat.st_size and header["mtime_ns"] == stat.st_mtime_ns:
+        world = _read_payload(cache_file)
+        if world is not None:
+            return world
+
+    with open(filename, 'rb') as file:
+        source = file.read()
+    digest = hashlib.sha256(source).hexdigest()
+    if header is not None and header["sha256"] == digest:
+        world = _read_payload(cache_file)
+        if world is not None:
+            _write_cache(cache_file, stat, digest, world)
+            return world
+
+    world = build_world(json.loads(source))
+    _write_cache(cache_file, stat, digest, world)
+    return world
+
+
+def _read_header(cache_file: str) -> Optional[dict[str, Any]]:
+    """Return the cache header in cache_file, or None if it is missing, unreadable or another version."""
+    try:
+        with open(cache_file, 'rb') as file:
+            (length,) = HEADER_LENGTH.unpack(file.read(HEADER_LENGTH.size))
+            header = marshal.loads(file.read(length))
+    except (OSError, EOFError, ValueError, TypeError, struct.error):
+        return None
+    if not isinstance(header, dict) or header.get("magic") != CACHE_MAGIC or header.get("version") != CACHE_VERSION:
+        return None
+    return header
+
+
+def _read_payload(cache_file: str) -> Optional[GameWorld]:
+    """Return the world stored after the header in cache_file, or None if it cannot be read.
+
+    Cyclic garbage collection is paused while decoding, since decoding only allocates
+    long-lived objects and collector passes would otherwise dominate on large worlds.
+    """
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(cache_file, 'rb') as file:
+            (length,) = HEADER_LENGTH.unpack(file.read(HEADER_LENGTH.size))
+            file.seek(length, os.SEEK_CUR)
+            return _decode_world(marshal.loads(file.read()))
+    except (OSError, EOFError, ValueError, TypeError, KeyError, IndexError, struct.error):
+        return None
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _write_cache(cache_file: str, stat: os.stat_result, digest: str, world: GameWorld) -> None:
+    """Atomically write world and its source fingerprint to cache_file, ignoring I/O errors."""
+    header = {
+        "magic": CACHE_MAGIC,
+        "version": CACHE_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+    }
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        header_bytes = marshal.dumps(header)
+        with open(temp_file, 'wb') as file:
+            file.write(HEADER_LENGTH.pack(len(header_bytes)))
+            file.write(header_bytes)
+            file.write(marshal.dumps(_encode_world(world)))
+        os.replace(temp_file, cache_file)
+    except (OSError, ValueError):
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def _encode_world(world: GameWorld) -> tuple:
+    """Return world as nested tuples/lists of marshal-able values."""
+    locations = [
+        (loc.id_num, loc.description, loc.available_commands, loc.items, loc.restrictions, loc.rewards)
+        for loc in world.locations.values()
+    ]
+    item_columns = tuple(list(column) for column in zip(*(
+        (item.name, item.description, item.hint, item.completion_text,
+         item.start_position, item.target_position, item.target_points, item.aliases)
+        for item in world.items
+    )))
+    rewards = [(key, tuple((e.reward_id, e.kind, e.value) for e in effects)) for key, effects in world.rewards.items()]
+    restrictions = [(loc_id, _encode_rule(rule)) for loc_id, rule in world.restrictions.items()]
+    return locations, item_columns, rewards, restrictions
+
+
+def _decode_world(payload: tuple) -> GameWorld:
+    """Rebuild a world from the output of _encode_world."""
+    location_rows, item_columns, reward_rows, restriction_rows = payload
+    locations = {row[0]: Location(row[0], row[1], row[2], tuple(row[3]), *row[4:]) for row in location_rows}
+    items = list(map(Item, *item_columns))
+    item_index = {}
+    item_bits = {}
+    for bit, item in enumerate(items):
+        for name in (item.name, *item.aliases):
+            key = name.strip().lower()
+            item_index[key] = item
+            item_bits[key] = bit
+    effects = {}
+    rewards = {}
+    for key, effect_rows in reward_rows:
+        rewards[key] = tuple(effects.setdefault(row, RewardEffect(*row)) for row in effect_rows)
+    restrictions = {loc_id: _decode_rule(encoded) for loc_id, encoded in restriction_rows}
+    return GameWorld(locations, items, item_index, rewards, item_bits, restrictions,
+                     RouteIndex(locations, restrictions), _location_ids(locations))
+
+
+def _encode_rule(rule: Restriction) -> tuple:
+    """Return rule as nested (op, mask, threshold, children) tuples."""
+    return rule.op, rule.mask, rule.threshold, tuple(_encode_rule(child) for child in rule.children)
+
+
+def _decode_rule(encoded: tuple) -> Restriction:
+    """Rebuild a Restriction from the output of _encode_rule."""
+    op, mask, threshold, children = encoded
+    return Restriction(op, mask, threshold, tuple(_decode_rule(child) for child in children))
+
+
+def build_world(data: dict[str, Any]) -> GameWorld:
+    """Return the compiled world described by parsed game data."""
+    locations = {}
+    for loc_data in data['locations']:
+        location_obj = Location(
+            loc_data['id'],
+            {
+                'name': loc_data['name'],
+                'brief_description': loc_data['brief_description'],
+                'long_description': loc_data['long_description']
+            },
+            loc_data['available_commands'],
+            tuple(loc_data['items']),
+            loc_data['restrictions'] if 'restrictions' in loc_data else {},
+            loc_data['rewards'] if 'rewards' in loc_data else {}
+        )
+        locations[loc_data['id']] = location_obj
+
+    items = []
+    for item_data in data['items']:
+        item_obj = Item(
+            item_data['name'],
+            item_data['description'],
+            item_data['hint'],
+            item_data['completion_text'],
+            item_data['start_position'],
+            item_data['target_position'],
+            item_data['target_points'],
+            tuple(item_data.get('aliases', ()))
+        )
+        items.append(item_obj)
+
+    item_index = _build_item_index(items)
+    rewards = _compile_rewards(locations, item_index)
+    bit_of = {item.name: bit for bit, item in enumerate(items)}
+    item_bits = {name: bit_of[item.name] for name, item in item_index.items()}
+    restrictions = {}
+    for location in locations.values():
+        rule = compile_restriction(location.restrictions, item_bits)
+        if rule is not None:
+            restrictions[location.id_num] = rule
+    return GameWorld(locations, items, item_index, rewards, item_bits, restrictions,
+                     RouteIndex(locations, restrictions), _location_ids(locations))
+
+
+def _location_ids(locations: dict[int, Location]) -> dict[str, int]:
+    """Return a mapping from lower-cased location names to ids; the first location wins a shared name."""
+    names: dict[str, int] = {}
+    for loc_id, location in locations.items():
+        names.setdefault(location.description['name'].strip().lower(), loc_id)
+    return names
+
+
+def _build_item_index(items: list[Item]) -> dict[str, Item]:
+    """Return a case-insensitive name/alias registry for items.
+
+    Raise ValueError if two items share a name or alias.
+    """
+    index: dict[str, Item] = {}
+    for item in items:
+        for name in (item.name, *item.aliases):
+            key = name.strip().lower()
+            if key in index and index[key] is not item:
+                raise ValueError(f"Item name {name!r} is used by more than one item.")
+            index[key] = item
+    return index
+
+
+def _reward_mapping(rewards_data: object, section: str) -> dict[str, str]:
+    """Return lower-cased trigger -> effect pairs for one section of a reward payload.
+
+    Pairs nested under a ``rewards`` key override top-level pairs for the same trigger.
+    """
+    mapping: dict[str, str] = {}
+    if not isinstance(rewards_data, dict):
+        return mapping
+
+    for source in (rewards_data, rewards_data.get("rewards")):
+        if isinstance(source, dict) and isinstance(source.get(section), dict):
+            for trigger, effect in source[section].items():
+                mapping[trigger.strip().lower()] = effect.strip().lower()
+    return mapping
+
+
+def _compile_rewards(
+    locations: dict[int, Location],
+    item_index: dict[str, Item]
+) -> dict[tuple[int, str], tuple[RewardEffect, ...]]:
+    """Compile location reward payloads into a (location_id, trigger_name) -> effects table.
+
+    Item trades come before attribute effects for the same trigger. Each effect gets a
+    unique integer reward id, and triggers are also keyed by their item aliases.
+    """
+    table: dict[tuple[int, str], tuple[RewardEffect, ...]] = {}
+    next_id = 0
+    for location in locations.values():
+        effects: dict[str, list[RewardEffect]] = {}
+        for kind, section in (("item", "items"), ("attribute", "attributes")):
+            for trigger, value in _reward_mapping(location.rewards, section).items():
+                effects.setdefault(trigger, []).append(RewardEffect(next_id, kind, value))
+                next_id += 1
+
+        for trigger, trigger_effects in effects.items():
+            trigger_item = item_index.get(trigger)
+            names = (trigger_item.name, *trigger_item.aliases) if trigger_item is not None else (trigger,)
+            for name in names:
+                table[(location.id_num, name.strip().lower())] = tuple(trigger_effects)
+    return table
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': [
+            'R1705',
+            'E9998',
+            'E9999',
+            'static_type_checker',
+        ]
+    })
@@ -0,0 +1,49 @@
+"""Zobrist keys for fingerprinting CSC111 adventure game states.
+
+A state fingerprint is the xor of one 64-bit key per fact that holds in the state,
+such as "the tcard is carried" or "two lucky mugs lie at location 5". Adding or
+removing a fact is a single xor, so a game can keep its fingerprint up to date as
+it changes. Keys are taken from a BLAKE2b digest of the fact rather than from a
+random generator, so they are the same in every process and every run, and
+fingerprints can be stored and compared across runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+KEY_CACHE_SIZE = 1 << 16
+
+# Keys already computed, keyed by fact. Cleared when it reaches KEY_CACHE_SIZE entries.
+_keys: dict[tuple, int] = {}
+
+
+def zobrist_key(*fact: object) -> int:
+    """Return the 64-bit key of fact, a tuple of strings and ints.
+
+    >>> zobrist_key("carried", "tcard") == zobrist_key("carried", "tcard")
+    True
+    >>> zobrist_key("carried", "tcard") == zobrist_key("returned", "tcard")
+    False
+    """
+    key = _keys.get(fact)
+    if key is None:
+        if len(_keys) >= KEY_CACHE_SIZE:
+            _keys.clear()
+        digest = hashlib.blake2b(repr(fact).encode(), digest_size=8, person=b"acorn-zobrist")
+        key = _keys[fact] = int.from_bytes(digest.digest(), "little")
+    return key
+
+
+if __name__ == "__main__":
+    import python_ta
+
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': [
+            'R1705',
+            'E9998',
+            'E9999',
+            'static_type_checker',
+        ]
+    })